@@ -5,7 +5,11 @@ from albumentations.check_version import check_for_updates
 from ._version import __version__  # noqa: F401
 from .augmentations import *
 from .core.composition import *
+from .core.image_source import *
+from .core.instance_masks import *
+from .core.reference_cache import *
 from .core.serialization import *
+from .core.tiling import *
 from .core.transforms_interface import *
 
 # Perform the version check after all other initializations
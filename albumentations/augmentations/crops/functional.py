@@ -9,13 +9,17 @@ from albucore.utils import maybe_process_in_chunks, preserve_channel_dim
 from albumentations.augmentations.geometric import functional as fgeometric
 from albumentations.augmentations.utils import handle_empty_array
 from albumentations.core.bbox_utils import denormalize_bboxes, normalize_bboxes
-from albumentations.core.types import ColorType
+from albumentations.core.image_source import ImageSource
+from albumentations.core.instance_masks import InstanceMasks
+from albumentations.core.types import NUM_MULTI_CHANNEL_DIMENSIONS, ColorType
 
 __all__ = [
     "get_crop_coords",
     "crop_bboxes_by_coords",
     "crop_keypoints_by_coords",
+    "crop_instance_masks",
     "get_center_crop_coords",
+    "get_foreground_indices",
     "crop",
     "crop_and_pad",
     "crop_and_pad_bboxes",
@@ -112,6 +116,49 @@ def crop_keypoints_by_coords(
     return cropped_keypoints
 
 
+def crop_instance_masks(instance_masks: InstanceMasks, crop_coords: tuple[int, int, int, int]) -> InstanceMasks:
+    """Crop sparse instance masks by the provided coordinates.
+
+    Instances outside of the crop are dropped and instances fully inside of it are shifted, both
+    without touching their pixels. Only instances crossing the crop border are sliced.
+
+    Args:
+        instance_masks (InstanceMasks): Instance masks to crop.
+        crop_coords (tuple): Crop box coords (x1, y1, x2, y2).
+
+    Returns:
+        InstanceMasks: Cropped instance masks of the crop shape.
+    """
+    x_min, y_min, x_max, y_max = crop_coords
+    crop_shape = (y_max - y_min, x_max - x_min)
+    bboxes = instance_masks.bboxes
+
+    overlaps = (bboxes[:, 0] < x_max) & (bboxes[:, 2] > x_min) & (bboxes[:, 1] < y_max) & (bboxes[:, 3] > y_min)
+    inside = (bboxes[:, 0] >= x_min) & (bboxes[:, 2] <= x_max) & (bboxes[:, 1] >= y_min) & (bboxes[:, 3] <= y_max)
+    shifted_bboxes = bboxes - np.array([x_min, y_min, x_min, y_min], dtype=bboxes.dtype)
+
+    masks = []
+    kept = []
+    for idx in np.flatnonzero(overlaps):
+        if inside[idx]:
+            masks.append(instance_masks.masks[idx])
+            kept.append(idx)
+            continue
+
+        clipped = InstanceMasks.from_rois(
+            [instance_masks.masks[idx]],
+            shifted_bboxes[idx : idx + 1],
+            crop_shape,
+            instance_masks.ids[idx : idx + 1],
+        )
+        if len(clipped):
+            masks.append(clipped.masks[0])
+            shifted_bboxes[idx] = clipped.bboxes[0]
+            kept.append(idx)
+
+    return InstanceMasks(masks, shifted_bboxes[kept], crop_shape, instance_masks.ids[kept])
+
+
 def get_center_crop_coords(image_shape: tuple[int, int], crop_shape: tuple[int, int]) -> tuple[int, int, int, int]:
     height, width = image_shape[:2]
     crop_height, crop_width = crop_shape[:2]
@@ -123,7 +170,19 @@ def get_center_crop_coords(image_shape: tuple[int, int], crop_shape: tuple[int,
     return x_min, y_min, x_max, y_max
 
 
-def crop(img: np.ndarray, x_min: int, y_min: int, x_max: int, y_max: int) -> np.ndarray:
+def get_foreground_indices(mask: np.ndarray) -> np.ndarray:
+    """Return the flat indices of the non-zero pixels of a mask summed over its channels, in row-major order.
+
+    Indices are stored as uint32 if the mask has at most 2**32 pixels, which takes half the memory of
+    the (y, x) coordinates returned by `np.argwhere` for single channel masks.
+    """
+    if mask.ndim == NUM_MULTI_CHANNEL_DIMENSIONS:
+        mask = mask.sum(axis=-1)
+    indices = np.flatnonzero(mask)
+    return indices.astype(np.uint32) if mask.size <= np.iinfo(np.uint32).max + 1 else indices
+
+
+def crop(img: np.ndarray | ImageSource, x_min: int, y_min: int, x_max: int, y_max: int) -> np.ndarray:
     height, width = img.shape[:2]
     if x_max <= x_min or y_max <= y_min:
         raise ValueError(
@@ -138,6 +197,8 @@ def crop(img: np.ndarray, x_min: int, y_min: int, x_max: int, y_max: int) -> np.
             f"height = {height}, width = {width})",
         )
 
+    if isinstance(img, ImageSource):
+        return img.read_region(x_min, y_min, x_max, y_max)
     return img[y_min:y_max, x_min:x_max]
 
 
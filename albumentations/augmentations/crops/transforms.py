@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import math
 import random
-from typing import Any, Sequence, Tuple, cast
+from collections import OrderedDict
+from typing import Any, Hashable, Sequence, Tuple, cast
 from warnings import warn
 
 import cv2
@@ -11,7 +12,9 @@ from pydantic import AfterValidator, Field, field_validator, model_validator
 from typing_extensions import Annotated, Self
 
 from albumentations.augmentations.geometric import functional as fgeometric
+from albumentations.augmentations.utils import hash_arrays
 from albumentations.core.bbox_utils import union_of_bboxes
+from albumentations.core.instance_masks import InstanceMasks
 from albumentations.core.pydantic import (
     BorderModeType,
     InterpolationType,
@@ -63,6 +66,7 @@ class CropInitSchema(BaseTransformInitSchema):
 
 class _BaseCrop(DualTransform):
     _targets = (Targets.IMAGE, Targets.MASK, Targets.BBOXES, Targets.KEYPOINTS)
+    _supports_image_source = True
 
     def __init__(self, p: float = 1.0, always_apply: bool | None = None):
         super().__init__(p, always_apply)
@@ -74,6 +78,14 @@ class _BaseCrop(DualTransform):
         y_max = crop_coords[3]
         return fcrops.crop(img, x_min=x_min, y_min=y_min, x_max=x_max, y_max=y_max)
 
+    def apply_to_instance_masks(
+        self,
+        instance_masks: InstanceMasks,
+        crop_coords: tuple[int, int, int, int],
+        **params: Any,
+    ) -> InstanceMasks:
+        return fcrops.crop_instance_masks(instance_masks, crop_coords)
+
     def apply_to_bboxes(
         self,
         bboxes: np.ndarray,
@@ -258,6 +270,10 @@ class CropNonEmptyMaskIfExists(_BaseCrop):
             (e.g. if background value is 5 set `ignore_values=[5]` to ignore)
         ignore_channels (list of int): channels to ignore in mask
             (e.g. if background is a first channel set `ignore_channels=[0]` to ignore)
+        foreground_cache_size (int): number of masks whose foreground pixels are cached, so that the mask of
+            a sample that is cropped again is not scanned. Default: 0, nothing is cached.
+        mask_id_key (str, optional): key of the data with an id of the mask, e.g. the index of the sample,
+            that identifies cached masks. If None, masks are identified by a hash of their content. Default: None.
         p: probability of applying the transform. Default: 1.0.
 
     Targets:
@@ -266,6 +282,10 @@ class CropNonEmptyMaskIfExists(_BaseCrop):
     Image types:
         uint8, float32
 
+    Example:
+        >>> transform = A.Compose([A.CropNonEmptyMaskIfExists(512, 512, foreground_cache_size=1000, mask_id_key="idx")])
+        >>> cropped = transform(image=image, mask=mask, idx=sample_index)
+
     """
 
     class InitSchema(CropInitSchema):
@@ -274,6 +294,8 @@ class CropNonEmptyMaskIfExists(_BaseCrop):
             description="Values to ignore in mask, `0` values are always ignored",
         )
         ignore_channels: list[int] | None = Field(default=None, description="Channels to ignore in mask")
+        foreground_cache_size: int = Field(default=0, ge=0, description="Number of masks with cached foreground")
+        mask_id_key: str | None = Field(default=None, description="Key of the data with an id of the mask")
 
     def __init__(
         self,
@@ -281,6 +303,8 @@ class CropNonEmptyMaskIfExists(_BaseCrop):
         width: int,
         ignore_values: list[int] | None = None,
         ignore_channels: list[int] | None = None,
+        foreground_cache_size: int = 0,
+        mask_id_key: str | None = None,
         always_apply: bool | None = None,
         p: float = 1.0,
     ):
@@ -290,10 +314,15 @@ class CropNonEmptyMaskIfExists(_BaseCrop):
         self.width = width
         self.ignore_values = ignore_values
         self.ignore_channels = ignore_channels
+        self.foreground_cache_size = foreground_cache_size
+        self.mask_id_key = mask_id_key
+        self._foreground_cache: OrderedDict[Hashable, tuple[tuple[int, int], np.ndarray]] = OrderedDict()
 
-    def _preprocess_mask(self, mask: np.ndarray) -> np.ndarray:
-        mask_height, mask_width = mask.shape[:2]
+    @property
+    def targets_as_params(self) -> list[str]:
+        return [] if self.mask_id_key is None else [self.mask_id_key]
 
+    def _preprocess_mask(self, mask: np.ndarray) -> np.ndarray:
         if self.ignore_values is not None:
             ignore_values_np = np.array(self.ignore_values)
             mask = np.where(np.isin(mask, ignore_values_np), 0, mask)
@@ -302,19 +331,14 @@ class CropNonEmptyMaskIfExists(_BaseCrop):
             target_channels = np.array([ch for ch in range(mask.shape[-1]) if ch not in self.ignore_channels])
             mask = np.take(mask, target_channels, axis=-1)
 
-        if self.height > mask_height or self.width > mask_width:
-            raise ValueError(
-                f"Crop size ({self.height},{self.width}) is larger than image ({mask_height},{mask_width})",
-            )
-
         return mask
 
-    def update_params(self, params: dict[str, Any], **kwargs: Any) -> dict[str, Any]:
-        super().update_params(params, **kwargs)
-        if "mask" in kwargs:
-            mask = self._preprocess_mask(kwargs["mask"])
-        elif "masks" in kwargs and len(kwargs["masks"]):
-            masks = kwargs["masks"]
+    def _get_foreground(self, data: dict[str, Any]) -> tuple[tuple[int, int], np.ndarray]:
+        """Return the size of the mask and the flat indices of its foreground pixels."""
+        if "mask" in data:
+            mask = self._preprocess_mask(data["mask"])
+        elif "masks" in data and len(data["masks"]):
+            masks = data["masks"]
             mask = self._preprocess_mask(np.copy(masks[0]))  # need copy as we perform in-place mod afterwards
             for m in masks[1:]:
                 mask |= self._preprocess_mask(m)
@@ -322,12 +346,39 @@ class CropNonEmptyMaskIfExists(_BaseCrop):
             msg = "Can not find mask for CropNonEmptyMaskIfExists"
             raise RuntimeError(msg)
 
-        mask_height, mask_width = mask.shape[:2]
+        return mask.shape[:2], fcrops.get_foreground_indices(mask)
+
+    def _get_cached_foreground(self, data: dict[str, Any]) -> tuple[tuple[int, int], np.ndarray]:
+        if self.mask_id_key is not None:
+            key = data[self.mask_id_key]
+        else:
+            key = hash_arrays([data["mask"]] if "mask" in data else data.get("masks", []))
+        cached = self._foreground_cache.get(key)
+        if cached is not None:
+            self._foreground_cache.move_to_end(key)
+            return cached
+
+        cached = self._get_foreground(data)
+        self._foreground_cache[key] = cached
+        if len(self._foreground_cache) > self.foreground_cache_size:
+            self._foreground_cache.popitem(last=False)
+        return cached
 
-        if mask.any():
-            mask = mask.sum(axis=-1) if mask.ndim == NUM_MULTI_CHANNEL_DIMENSIONS else mask
-            non_zero_yx = np.argwhere(mask)
-            y, x = random.choice(non_zero_yx)
+    def update_params(self, params: dict[str, Any], **kwargs: Any) -> dict[str, Any]:
+        super().update_params(params, **kwargs)
+        if self.foreground_cache_size:
+            (mask_height, mask_width), foreground = self._get_cached_foreground(kwargs)
+        else:
+            (mask_height, mask_width), foreground = self._get_foreground(kwargs)
+
+        if self.height > mask_height or self.width > mask_width:
+            raise ValueError(
+                f"Crop size ({self.height},{self.width}) is larger than image ({mask_height},{mask_width})",
+            )
+
+        if len(foreground):
+            # Draws the same random number as random.choice of the foreground pixels
+            y, x = divmod(int(foreground[random.randrange(len(foreground))]), mask_width)
             x_min = x - random.randint(0, self.width - 1)
             y_min = y - random.randint(0, self.height - 1)
             x_min = np.clip(x_min, 0, mask_width - self.width)
@@ -345,7 +396,7 @@ class CropNonEmptyMaskIfExists(_BaseCrop):
         return params
 
     def get_transform_init_args_names(self) -> tuple[str, ...]:
-        return "height", "width", "ignore_values", "ignore_channels"
+        return "height", "width", "ignore_values", "ignore_channels", "foreground_cache_size", "mask_id_key"
 
 
 class BaseRandomSizedCropInitSchema(BaseTransformInitSchema):
@@ -361,6 +412,7 @@ class BaseRandomSizedCropInitSchema(BaseTransformInitSchema):
 
 class _BaseRandomSizedCrop(DualTransform):
     # Base class for RandomSizedCrop and RandomResizedCrop
+    _supports_image_source = True
 
     class InitSchema(BaseRandomSizedCropInitSchema):
         interpolation: InterpolationType = cv2.INTER_LINEAR
@@ -386,6 +438,15 @@ class _BaseRandomSizedCrop(DualTransform):
         crop = fcrops.crop(img, *crop_coords)
         return fgeometric.resize(crop, self.size, interpolation)
 
+    def apply_to_instance_masks(
+        self,
+        instance_masks: InstanceMasks,
+        crop_coords: tuple[int, int, int, int],
+        **params: Any,
+    ) -> InstanceMasks:
+        crop = fcrops.crop_instance_masks(instance_masks, crop_coords)
+        return fgeometric.resize_instance_masks(crop, self.size, cv2.INTER_NEAREST)
+
     def apply_to_bboxes(
         self,
         bboxes: np.ndarray,
@@ -875,6 +936,15 @@ class RandomSizedBBoxSafeCrop(BBoxSafeRandomCrop):
         crop = fcrops.crop(img, *crop_coords)
         return fgeometric.resize(crop, (self.height, self.width), self.interpolation)
 
+    def apply_to_instance_masks(
+        self,
+        instance_masks: InstanceMasks,
+        crop_coords: tuple[int, int, int, int],
+        **params: Any,
+    ) -> InstanceMasks:
+        crop = fcrops.crop_instance_masks(instance_masks, crop_coords)
+        return fgeometric.resize_instance_masks(crop, (self.height, self.width), cv2.INTER_NEAREST)
+
     def apply_to_keypoint(
         self,
         keypoints: np.ndarray,
@@ -1,33 +1,131 @@
 from __future__ import annotations
 
 import random
-from typing import Any, Callable, Literal, Sequence, Tuple, cast
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Literal, Sequence, Tuple, cast
 
-import cv2
 import numpy as np
 from pydantic import AfterValidator, field_validator
 from typing_extensions import Annotated
 
 from albumentations.augmentations.domain_adaptation_functional import (
-    adapt_pixel_distribution,
-    apply_histogram,
-    fourier_domain_adaptation,
+    Fingerprint,
+    adapt_pixel_distribution_with_fingerprint,
+    apply_histogram_with_fingerprint,
+    fourier_domain_adaptation_with_fingerprint,
+    get_fda_fingerprint,
+    get_histogram_fingerprint,
+    get_pixel_distribution_fingerprint,
 )
 from albumentations.augmentations.utils import read_rgb_image
 from albumentations.core.pydantic import ZeroOneRangeType, check_01, nondecreasing
+from albumentations.core.reference_cache import (
+    DEFAULT_REFERENCE_CACHE,
+    ReferenceBank,
+    ReferenceCache,
+    write_fingerprints,
+)
 from albumentations.core.transforms_interface import BaseTransformInitSchema, ImageOnlyTransform
 from albumentations.core.types import ScaleFloatType
 
+if TYPE_CHECKING:
+    from pathlib import Path
+
 __all__ = [
     "HistogramMatching",
     "FDA",
     "PixelDistributionAdaptation",
+    "write_reference_fingerprints",
 ]
 
 MAX_BETA_LIMIT = 0.5
 
 
-class HistogramMatching(ImageOnlyTransform):
+class _BaseDomainAdaptation(ImageOnlyTransform):
+    """Base class for transforms that adapt images to reference images.
+
+    Transforms compute a fingerprint of the reference, the statistics they need from it, once per reference and
+    image size, and keep it in `reference_cache`, so that only the input image is processed on every call.
+
+    References of a `ReferenceBank` are the indices of its items, which are read from the bank.
+    """
+
+    reference_images: Sequence[Any]
+    read_fn: Callable[[Any], np.ndarray]
+    reference_cache: ReferenceCache | None
+
+    def get_references(self) -> Sequence[Any]:
+        """Return the references that are read with `get_read_fn()`."""
+        if isinstance(self.reference_images, ReferenceBank):
+            return range(len(self.reference_images))
+        return self.reference_images
+
+    def get_read_fn(self) -> Callable[[Any], np.ndarray]:
+        """Return the function that reads references, the bank itself for a `ReferenceBank`."""
+        if isinstance(self.reference_images, ReferenceBank):
+            return self.reference_images
+        return self.read_fn
+
+    def get_fingerprint_name(self, image_shape: tuple[int, int]) -> str:
+        """Return the name under which the fingerprint for images of `image_shape` is cached."""
+        raise NotImplementedError
+
+    def compute_fingerprint(self, reference_image: np.ndarray, image_shape: tuple[int, int]) -> Fingerprint:
+        """Compute the fingerprint of a decoded reference image for images of `image_shape`."""
+        raise NotImplementedError
+
+    def get_reference_fingerprint(self, reference: Any, image_shape: tuple[int, int]) -> Fingerprint:
+        def compute(reference_image: np.ndarray) -> Fingerprint:
+            return self.compute_fingerprint(reference_image, image_shape)
+
+        if self.reference_cache is None:
+            return compute(self.get_read_fn()(reference))
+        return self.reference_cache.get_fingerprint(
+            reference,
+            self.get_read_fn(),
+            self.get_fingerprint_name(image_shape),
+            compute,
+        )
+
+
+def write_reference_fingerprints(
+    path: str | Path,
+    transforms: Sequence[_BaseDomainAdaptation],
+    image_shape: tuple[int, int],
+) -> int:
+    """Precompute fingerprints of the reference images of transforms for images of `image_shape`.
+
+    The fingerprints are written into a single file that `ReferenceCache.load_fingerprints` memory-maps,
+    so that the transforms never decode their reference images. References should be paths or integers.
+
+    Args:
+        path: Path of the file.
+        transforms: `HistogramMatching`, `FDA` or `PixelDistributionAdaptation` transforms.
+        image_shape: Size (height, width) of the images the transforms are applied to.
+
+    Returns:
+        int: Number of written fingerprints.
+
+    Example:
+        >>> fda = A.FDA(reference_paths, beta_limit=(0, 0.1))
+        >>> A.write_reference_fingerprints("fingerprints.bin", [fda], image_shape=(512, 512))
+        >>> fda.reference_cache.load_fingerprints("fingerprints.bin")
+
+    """
+
+    def iter_fingerprints() -> Iterator[tuple[Any, str, Fingerprint]]:
+        written = set()
+        for transform in transforms:
+            name = transform.get_fingerprint_name(image_shape)
+            read_fn = transform.get_read_fn()
+            for reference in transform.get_references():
+                if (reference, name) not in written:
+                    written.add((reference, name))
+                    yield reference, name, transform.compute_fingerprint(read_fn(reference), image_shape)
+
+    return write_fingerprints(path, iter_fingerprints())
+
+
+class HistogramMatching(_BaseDomainAdaptation):
     """Adjust the pixel values of an input image to match the histogram of a reference image.
 
     This transform applies histogram matching, a technique that modifies the distribution of pixel
@@ -43,7 +141,8 @@ class HistogramMatching(ImageOnlyTransform):
 
     Args:
         reference_images (Sequence[Any]): A sequence of reference image sources. These can be
-            file paths, URLs, or any objects that can be converted to images by the `read_fn`.
+            file paths, URLs, or any objects that can be converted to images by the `read_fn`,
+            or a `ReferenceBank` of images.
         blend_ratio (tuple[float, float]): Range for the blending factor between the original
             and the matched image. Must be two floats between 0 and 1, where:
             - 0 means no blending (original image is returned)
@@ -53,6 +152,9 @@ class HistogramMatching(ImageOnlyTransform):
         read_fn (Callable[[Any], np.ndarray]): A function that takes an element from
             `reference_images` and returns a numpy array representing the image.
             Default: read_rgb_image (reads image file from disk)
+        reference_cache (ReferenceCache | None): Cache of decoded reference images. By default, a cache shared
+            by all reference-based transforms is used, so every reference is decoded once per process.
+            If None, references are read with `read_fn` on every call.
         p (float): Probability of applying the transform. Default: 0.5
 
     Targets:
@@ -89,44 +191,56 @@ class HistogramMatching(ImageOnlyTransform):
         reference_images: Sequence[Any]
         blend_ratio: Annotated[tuple[float, float], AfterValidator(nondecreasing), AfterValidator(check_01)]
         read_fn: Callable[[Any], np.ndarray]
+        reference_cache: ReferenceCache | None
 
     def __init__(
         self,
         reference_images: Sequence[Any],
         blend_ratio: tuple[float, float] = (0.5, 1.0),
         read_fn: Callable[[Any], np.ndarray] = read_rgb_image,
+        reference_cache: ReferenceCache | None = DEFAULT_REFERENCE_CACHE,
         always_apply: bool | None = None,
         p: float = 0.5,
     ):
         super().__init__(p=p, always_apply=always_apply)
         self.reference_images = reference_images
         self.read_fn = read_fn
+        self.reference_cache = reference_cache
         self.blend_ratio = blend_ratio
 
     def apply(
-        self: np.ndarray,
+        self,
         img: np.ndarray,
-        reference_image: np.ndarray,
+        reference_fingerprint: Fingerprint,
         blend_ratio: float,
         **params: Any,
     ) -> np.ndarray:
-        return apply_histogram(img, reference_image, blend_ratio)
+        return apply_histogram_with_fingerprint(img, reference_fingerprint, blend_ratio)
 
-    def get_params(self) -> dict[str, np.ndarray]:
+    def get_params(self) -> dict[str, Any]:
         return {
-            "reference_image": self.read_fn(random.choice(self.reference_images)),
+            "reference": random.choice(self.get_references()),
             "blend_ratio": random.uniform(*self.blend_ratio),
         }
 
+    def get_params_dependent_on_data(self, params: dict[str, Any], data: dict[str, Any]) -> dict[str, Fingerprint]:
+        return {"reference_fingerprint": self.get_reference_fingerprint(params["reference"], params["shape"][:2])}
+
+    def get_fingerprint_name(self, image_shape: tuple[int, int]) -> str:
+        return f"histogram_{image_shape[0]}x{image_shape[1]}"
+
+    def compute_fingerprint(self, reference_image: np.ndarray, image_shape: tuple[int, int]) -> Fingerprint:
+        return get_histogram_fingerprint(reference_image, image_shape)
+
     def get_transform_init_args_names(self) -> tuple[str, ...]:
-        return "reference_images", "blend_ratio", "read_fn"
+        return "reference_images", "blend_ratio", "read_fn", "reference_cache"
 
     def to_dict_private(self) -> dict[str, Any]:
         msg = "HistogramMatching can not be serialized."
         raise NotImplementedError(msg)
 
 
-class FDA(ImageOnlyTransform):
+class FDA(_BaseDomainAdaptation):
     """Fourier Domain Adaptation (FDA) for simple "style transfer" in the context of unsupervised domain adaptation
     (UDA). FDA manipulates the frequency components of images to reduce the domain gap between source
     and target datasets, effectively adapting images from one domain to closely resemble those from another without
@@ -145,13 +259,17 @@ class FDA(ImageOnlyTransform):
 
     Args:
         reference_images (Sequence[Any]): Sequence of objects to be converted into images by `read_fn`. This typically
-            involves paths to images that serve as target domain examples for adaptation.
+            involves paths to images that serve as target domain examples for adaptation. Can also be a `ReferenceBank`
+            of images.
         beta_limit (tuple[float, float] | float): Coefficient beta from the paper, controlling the swapping extent of
             frequency components. If one value is provided beta will be sampled from uniform
             distribution [0, beta_limit]. Values should be less than 0.5.
         read_fn (Callable): User-defined function for reading images. It takes an element from `reference_images` and
             returns a numpy array of image pixels. By default, it is expected to take a path to an image and return a
             numpy array.
+        reference_cache (ReferenceCache | None): Cache of decoded reference images. By default, a cache shared
+            by all reference-based transforms is used, so every reference is decoded once per process.
+            If None, references are read with `read_fn` on every call.
 
     Targets:
         image
@@ -180,6 +298,7 @@ class FDA(ImageOnlyTransform):
     class InitSchema(BaseTransformInitSchema):
         reference_images: Sequence[Any]
         read_fn: Callable[[Any], np.ndarray]
+        reference_cache: ReferenceCache | None
         beta_limit: ZeroOneRangeType
 
         @field_validator("beta_limit")
@@ -195,41 +314,47 @@ class FDA(ImageOnlyTransform):
         reference_images: Sequence[Any],
         beta_limit: ScaleFloatType = (0, 0.1),
         read_fn: Callable[[Any], np.ndarray] = read_rgb_image,
+        reference_cache: ReferenceCache | None = DEFAULT_REFERENCE_CACHE,
         always_apply: bool | None = None,
         p: float = 0.5,
     ):
         super().__init__(p=p, always_apply=always_apply)
         self.reference_images = reference_images
         self.read_fn = read_fn
+        self.reference_cache = reference_cache
         self.beta_limit = cast(Tuple[float, float], beta_limit)
 
     def apply(
         self,
         img: np.ndarray,
-        target_image: np.ndarray,
+        target_fingerprint: Fingerprint,
         beta: float,
         **params: Any,
     ) -> np.ndarray:
-        return fourier_domain_adaptation(img, target_image, beta)
+        return fourier_domain_adaptation_with_fingerprint(img, target_fingerprint, beta)
+
+    def get_params_dependent_on_data(self, params: dict[str, Any], data: dict[str, Any]) -> dict[str, Fingerprint]:
+        reference = random.choice(self.get_references())
+        return {"target_fingerprint": self.get_reference_fingerprint(reference, (params["rows"], params["cols"]))}
 
-    def get_params_dependent_on_data(self, params: dict[str, Any], data: dict[str, Any]) -> dict[str, np.ndarray]:
-        target_img = self.read_fn(random.choice(self.reference_images))
-        target_img = cv2.resize(target_img, dsize=(params["cols"], params["rows"]))
+    def get_fingerprint_name(self, image_shape: tuple[int, int]) -> str:
+        return f"fda_{image_shape[0]}x{image_shape[1]}_{self.beta_limit[1]}"
 
-        return {"target_image": target_img}
+    def compute_fingerprint(self, reference_image: np.ndarray, image_shape: tuple[int, int]) -> Fingerprint:
+        return get_fda_fingerprint(reference_image, image_shape, self.beta_limit[1])
 
     def get_params(self) -> dict[str, float]:
         return {"beta": random.uniform(*self.beta_limit)}
 
-    def get_transform_init_args_names(self) -> tuple[str, str, str]:
-        return "reference_images", "beta_limit", "read_fn"
+    def get_transform_init_args_names(self) -> tuple[str, str, str, str]:
+        return "reference_images", "beta_limit", "read_fn", "reference_cache"
 
     def to_dict_private(self) -> dict[str, Any]:
         msg = "FDA can not be serialized."
         raise NotImplementedError(msg)
 
 
-class PixelDistributionAdaptation(ImageOnlyTransform):
+class PixelDistributionAdaptation(_BaseDomainAdaptation):
     """Performs pixel-level domain adaptation by aligning the pixel value distribution of an input image
     with that of a reference image. This process involves fitting a simple statistical transformation
     (such as PCA, StandardScaler, or MinMaxScaler) to both the original and the reference images,
@@ -248,7 +373,8 @@ class PixelDistributionAdaptation(ImageOnlyTransform):
 
     Args:
         reference_images (Sequence[Any]): A sequence of objects (typically image paths) that will be
-            converted into images by `read_fn`. These images serve as references for the domain adaptation.
+            converted into images by `read_fn`, or a `ReferenceBank` of images. These images serve as references
+            for the domain adaptation.
         blend_ratio (tuple[float, float]): Specifies the minimum and maximum blend ratio for mixing
             the adapted image with the original. This enhances the diversity of the output images.
             Values should be in the range [0, 1]. Default: (0.25, 1.0)
@@ -260,6 +386,9 @@ class PixelDistributionAdaptation(ImageOnlyTransform):
             - "standard": StandardScaler (zero mean and unit variance)
             - "minmax": MinMaxScaler (scales to a fixed range, usually [0, 1])
             Default: "pca"
+        reference_cache (ReferenceCache | None): Cache of decoded reference images. By default, a cache shared
+            by all reference-based transforms is used, so every reference is decoded once per process.
+            If None, references are read with `read_fn` on every call.
         p (float): The probability of applying the transform to any given image. Default: 0.5
 
     Targets:
@@ -302,6 +431,7 @@ class PixelDistributionAdaptation(ImageOnlyTransform):
         reference_images: Sequence[Any]
         blend_ratio: Annotated[tuple[float, float], AfterValidator(nondecreasing), AfterValidator(check_01)]
         read_fn: Callable[[Any], np.ndarray]
+        reference_cache: ReferenceCache | None
         transform_type: Literal["pca", "standard", "minmax"]
 
     def __init__(
@@ -309,6 +439,7 @@ class PixelDistributionAdaptation(ImageOnlyTransform):
         reference_images: Sequence[Any],
         blend_ratio: tuple[float, float] = (0.25, 1.0),
         read_fn: Callable[[Any], np.ndarray] = read_rgb_image,
+        reference_cache: ReferenceCache | None = DEFAULT_REFERENCE_CACHE,
         transform_type: Literal["pca", "standard", "minmax"] = "pca",
         always_apply: bool | None = None,
         p: float = 0.5,
@@ -316,25 +447,41 @@ class PixelDistributionAdaptation(ImageOnlyTransform):
         super().__init__(p=p, always_apply=always_apply)
         self.reference_images = reference_images
         self.read_fn = read_fn
+        self.reference_cache = reference_cache
         self.blend_ratio = blend_ratio
         self.transform_type = transform_type
 
-    def apply(self, img: np.ndarray, reference_image: np.ndarray, blend_ratio: float, **params: Any) -> np.ndarray:
-        return adapt_pixel_distribution(
+    def apply(
+        self,
+        img: np.ndarray,
+        reference_fingerprint: Fingerprint,
+        blend_ratio: float,
+        **params: Any,
+    ) -> np.ndarray:
+        return adapt_pixel_distribution_with_fingerprint(
             img,
-            ref=reference_image,
+            reference_fingerprint,
             weight=blend_ratio,
             transform_type=self.transform_type,
         )
 
     def get_params(self) -> dict[str, Any]:
         return {
-            "reference_image": self.read_fn(random.choice(self.reference_images)),
+            "reference": random.choice(self.get_references()),
             "blend_ratio": random.uniform(*self.blend_ratio),
         }
 
-    def get_transform_init_args_names(self) -> tuple[str, str, str, str]:
-        return "reference_images", "blend_ratio", "read_fn", "transform_type"
+    def get_params_dependent_on_data(self, params: dict[str, Any], data: dict[str, Any]) -> dict[str, Fingerprint]:
+        return {"reference_fingerprint": self.get_reference_fingerprint(params["reference"], params["shape"][:2])}
+
+    def get_fingerprint_name(self, image_shape: tuple[int, int]) -> str:
+        return f"pda_{self.transform_type}_{image_shape[0]}x{image_shape[1]}"
+
+    def compute_fingerprint(self, reference_image: np.ndarray, image_shape: tuple[int, int]) -> Fingerprint:
+        return get_pixel_distribution_fingerprint(reference_image, image_shape, self.transform_type)
+
+    def get_transform_init_args_names(self) -> tuple[str, ...]:
+        return "reference_images", "blend_ratio", "read_fn", "transform_type", "reference_cache"
 
     def to_dict_private(self) -> dict[str, Any]:
         msg = "PixelDistributionAdaptation can not be serialized."
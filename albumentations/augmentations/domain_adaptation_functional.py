@@ -2,13 +2,13 @@ from __future__ import annotations
 
 import abc
 from copy import deepcopy
-from typing import Literal
+from typing import Dict, Literal, cast
 
 import cv2
 import numpy as np
+import scipy.fft as sfft
 from albucore.functions import add_weighted, from_float, to_float
 from albucore.utils import clip, clipped, get_num_channels, preserve_channel_dim
-from skimage.exposure import match_histograms
 from typing_extensions import Protocol
 
 import albumentations.augmentations.functional as fmain
@@ -17,10 +17,19 @@ from albumentations.core.types import MONO_CHANNEL_DIMENSIONS, NUM_MULTI_CHANNEL
 
 __all__ = [
     "fourier_domain_adaptation",
+    "fourier_domain_adaptation_with_fingerprint",
+    "get_fda_fingerprint",
     "apply_histogram",
+    "apply_histogram_with_fingerprint",
+    "get_histogram_fingerprint",
     "adapt_pixel_distribution",
+    "adapt_pixel_distribution_with_fingerprint",
+    "get_pixel_distribution_fingerprint",
 ]
 
+# Statistics of a reference image that a domain adaptation function needs, computed once per reference
+Fingerprint = Dict[str, np.ndarray]
+
 
 class BaseScaler:
     def __init__(self) -> None:
@@ -120,14 +129,19 @@ class DomainAdapter:
     def __init__(
         self,
         transformer: TransformerInterface,
-        ref_img: np.ndarray,
+        ref_img: np.ndarray | None,
         color_conversions: tuple[None, None] = (None, None),
+        num_channels: int | None = None,
     ):
         self.color_in, self.color_out = color_conversions
         self.source_transformer = deepcopy(transformer)
         self.target_transformer = transformer
-        self.num_channels = get_num_channels(ref_img)
-        self.target_transformer.fit(self.flatten(ref_img))
+        if ref_img is None:
+            # The transformer is already fitted on the reference image
+            self.num_channels = cast(int, num_channels)
+        else:
+            self.num_channels = get_num_channels(ref_img)
+            self.target_transformer.fit(self.flatten(ref_img))
 
     def to_colorspace(self, img: np.ndarray) -> np.ndarray:
         return img if self.color_in is None else cv2.cvtColor(img, self.color_in)
@@ -179,27 +193,83 @@ def adapt_pixel_distribution(
 ) -> np.ndarray:
     if img.dtype != ref.dtype:
         raise ValueError("Input image and reference image must have the same dtype.")
+    fingerprint = get_pixel_distribution_fingerprint(ref, img.shape, transform_type)
+    return adapt_pixel_distribution_with_fingerprint(img, fingerprint, transform_type, weight)
+
+
+def get_pixel_distribution_fingerprint(
+    ref: np.ndarray,
+    image_shape: tuple[int, ...],
+    transform_type: Literal["pca", "standard", "minmax"],
+) -> Fingerprint:
+    """Fit the transformation of `adapt_pixel_distribution` on a reference image for images of `image_shape`."""
+    if get_num_channels(ref) == 1:
+        ref = np.squeeze(ref)
+
+    if ref.shape[:2] != tuple(image_shape[:2]):
+        ref = cv2.resize(ref, dsize=image_shape[:2], interpolation=cv2.INTER_AREA)
+
+    if ref.dtype == np.float32:
+        ref = from_float(ref, np.uint8)
+
+    transformer = {"pca": PCA, "standard": StandardScaler, "minmax": MinMaxScaler}[transform_type]()
+    transformer.fit(to_float(ref).reshape(-1, get_num_channels(ref)))
+
+    if isinstance(transformer, PCA):
+        return {"mean": transformer.mean, "components": transformer.components_}
+    if isinstance(transformer, StandardScaler):
+        return {"mean": transformer.mean, "scale": transformer.scale}
+    return {"data_min": transformer.data_min, "data_max": transformer.data_max, "data_range": transformer.data_range}
+
+
+def _load_transformer(
+    fingerprint: Fingerprint,
+    transform_type: Literal["pca", "standard", "minmax"],
+) -> TransformerInterface:
+    if transform_type == "pca":
+        pca = PCA()
+        pca.mean = fingerprint["mean"]
+        # Copied, because the sign of the components is flipped in place to match the source
+        pca.components_ = np.array(fingerprint["components"])
+        return pca
+    if transform_type == "standard":
+        standard_scaler = StandardScaler()
+        standard_scaler.mean, standard_scaler.scale = fingerprint["mean"], fingerprint["scale"]
+        return standard_scaler
+    minmax_scaler = MinMaxScaler()
+    minmax_scaler.data_min, minmax_scaler.data_max = fingerprint["data_min"], fingerprint["data_max"]
+    minmax_scaler.data_range = fingerprint["data_range"]
+    return minmax_scaler
+
+
+@clipped
+@preserve_channel_dim
+def adapt_pixel_distribution_with_fingerprint(
+    img: np.ndarray,
+    fingerprint: Fingerprint,
+    transform_type: Literal["pca", "standard", "minmax"],
+    weight: float,
+) -> np.ndarray:
+    """Apply `adapt_pixel_distribution` with a reference fitted by `get_pixel_distribution_fingerprint`."""
     img_num_channels = get_num_channels(img)
-    ref_num_channels = get_num_channels(ref)
+    ref_num_channels = next(iter(fingerprint.values())).shape[-1]
 
     if img_num_channels != ref_num_channels:
         raise ValueError("Input image and reference image must have the same number of channels.")
 
     if img_num_channels == 1:
         img = np.squeeze(img)
-        ref = np.squeeze(ref)
-
-    if img.shape != ref.shape:
-        ref = cv2.resize(ref, dsize=img.shape[:2], interpolation=cv2.INTER_AREA)
 
     original_dtype = img.dtype
 
     if original_dtype == np.float32:
         img = from_float(img, np.uint8)
-        ref = from_float(ref, np.uint8)
 
-    transformer = {"pca": PCA, "standard": StandardScaler, "minmax": MinMaxScaler}[transform_type]()
-    adapter = DomainAdapter(transformer=transformer, ref_img=ref)
+    adapter = DomainAdapter(
+        transformer=cast(TransformerInterface, _load_transformer(fingerprint, transform_type)),
+        ref_img=None,
+        num_channels=ref_num_channels,
+    )
     transformed = adapter(img).astype(np.float32)
 
     result = img.astype(np.float32) * (1 - weight) + transformed * weight
@@ -207,19 +277,45 @@ def adapt_pixel_distribution(
     return result if original_dtype == np.uint8 else to_float(result)
 
 
-def low_freq_mutate(amp_src: np.ndarray, amp_trg: np.ndarray, beta: float) -> np.ndarray:
-    image_shape = amp_src.shape[:2]
-
-    border = int(np.floor(min(image_shape) * beta))
+def get_low_freq_window(image_shape: tuple[int, ...], beta: float) -> tuple[int, int, int, int]:
+    """Return the rows and columns (y_min, y_max, x_min, x_max) of the centered low-frequency window of FDA."""
+    border = int(np.floor(min(image_shape[:2]) * beta))
 
     center_x, center_y = fmain.center(image_shape)
 
-    height, width = image_shape
+    height, width = image_shape[:2]
 
     h1, h2 = max(0, int(center_y - border)), min(int(center_y + border), height)
     w1, w2 = max(0, int(center_x - border)), min(int(center_x + border), width)
-    amp_src[h1:h2, w1:w2] = amp_trg[h1:h2, w1:w2]
-    return amp_src
+    return h1, h2, w1, w2
+
+
+def _get_frequencies(length: int, start: int, end: int, onesided: bool = False) -> tuple[np.ndarray, ...]:
+    """Map the window [start, end) of a shifted spectrum axis to indices of the unshifted one.
+
+    Returns the sorted indices of the window and of its reflection, and whether every index and its reflection
+    lie in the window. With `onesided`, only the indices kept by a real FFT are returned.
+    """
+    window = (np.arange(start, end) - length // 2) % length
+    indices = np.union1d(window, -window % length)
+    if onesided:
+        indices = indices[indices <= length // 2]
+    return indices, np.isin(indices, window), np.isin(-indices % length, window)
+
+
+def get_low_freq_block(image_shape: tuple[int, ...], beta: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the rows and columns of the real FFT spectrum that FDA changes, and the weight of the target there.
+
+    FDA swaps the amplitude in a centered window of the full spectrum and keeps the real part of the inverse
+    transform, which averages every frequency with its reflection. The window is not symmetric, so frequencies
+    whose reflection alone lies in the window take half of the target amplitude.
+    """
+    h1, h2, w1, w2 = get_low_freq_window(image_shape, beta)
+    rows, rows_in_window, reflected_rows_in_window = _get_frequencies(image_shape[0], h1, h2)
+    cols, cols_in_window, reflected_cols_in_window = _get_frequencies(image_shape[1], w1, w2, onesided=True)
+    weight = np.outer(rows_in_window, cols_in_window).astype(np.float32)
+    weight += np.outer(reflected_rows_in_window, reflected_cols_in_window)
+    return rows, cols, weight / 2
 
 
 @clipped
@@ -248,20 +344,15 @@ def fourier_domain_adaptation(img: np.ndarray, target_img: np.ndarray, beta: flo
     Note:
         - Both input images are converted to float32 for processing.
         - The function handles both grayscale (2D) and color (3D) images.
-        - For grayscale images, an extra dimension is added to facilitate uniform processing.
-        - The adaptation is performed channel-wise for color images.
+        - All channels are transformed at once with a real FFT, computed in float32 and complex64.
         - The output is clipped to the valid range and preserves the original number of channels.
 
-    The adaptation process involves the following steps for each channel:
-    1. Compute the 2D Fourier Transform of both source and target images.
-    2. Shift the zero frequency component to the center of the spectrum.
-    3. Extract amplitude and phase information from the source image's spectrum.
-    4. Mutate the source amplitude using the target amplitude and the beta parameter.
-    5. Combine the mutated amplitude with the original phase.
-    6. Perform the inverse Fourier Transform to obtain the adapted channel.
-
-    The `low_freq_mutate` function (not shown here) is responsible for the actual
-    amplitude mutation, focusing on low-frequency components which carry style information.
+    The adaptation process involves the following steps:
+    1. Compute the 2D real Fourier Transform of both source and target images.
+    2. Find the coefficients of the centered low-frequency window, `get_low_freq_block`, without shifting
+       the spectrum.
+    3. Replace the amplitude of these source coefficients with the target amplitude, keeping their phase.
+    4. Perform the inverse real Fourier Transform of the source spectrum.
 
     Example:
         >>> import numpy as np
@@ -276,45 +367,71 @@ def fourier_domain_adaptation(img: np.ndarray, target_img: np.ndarray, beta: flo
           (Yang and Soatto, 2020, CVPR)
           https://openaccess.thecvf.com/content_CVPR_2020/papers/Yang_FDA_Fourier_Domain_Adaptation_for_Semantic_Segmentation_CVPR_2020_paper.pdf
     """
-    src_img = img.astype(np.float32)
-    trg_img = target_img.astype(np.float32)
+    return fourier_domain_adaptation_with_fingerprint(img, get_fda_fingerprint(target_img, img.shape, beta), beta)
 
-    if len(src_img.shape) == MONO_CHANNEL_DIMENSIONS:
-        src_img = np.expand_dims(src_img, axis=-1)
-    if len(trg_img.shape) == MONO_CHANNEL_DIMENSIONS:
-        trg_img = np.expand_dims(trg_img, axis=-1)
 
-    num_channels = src_img.shape[-1]
+def _to_float_channels(img: np.ndarray) -> np.ndarray:
+    img = img.astype(np.float32)
+    return np.expand_dims(img, axis=-1) if img.ndim == MONO_CHANNEL_DIMENSIONS else img
 
-    # Prepare container for the output image
-    src_in_trg = np.zeros_like(src_img)
 
-    for channel_id in range(num_channels):
-        # Perform FFT on each channel
-        fft_src = np.fft.fft2(src_img[:, :, channel_id])
-        fft_trg = np.fft.fft2(trg_img[:, :, channel_id])
+def get_fda_fingerprint(target_img: np.ndarray, image_shape: tuple[int, ...], max_beta: float) -> Fingerprint:
+    """Compute the low-frequency amplitude spectrum of a target image that FDA with `beta <= max_beta` swaps in.
 
-        # Shift the zero frequency component to the center
-        fft_src_shifted = np.fft.fftshift(fft_src)
-        fft_trg_shifted = np.fft.fftshift(fft_trg)
+    The target image is resized to `image_shape` first, as FDA requires both images to be of the same size.
+    """
+    if target_img.shape[:2] != tuple(image_shape[:2]):
+        target_img = cv2.resize(target_img, dsize=(image_shape[1], image_shape[0]))
+
+    rows, cols, _ = get_low_freq_block(image_shape, max_beta)
+    spectrum = sfft.rfft2(_to_float_channels(target_img), axes=(0, 1))
+    return {
+        "amplitude": np.abs(spectrum[np.ix_(rows, cols)]),
+        "rows": rows,
+        "cols": cols,
+        "image_shape": np.array(image_shape[:2]),
+    }
+
+
+def _get_positions(indices: np.ndarray, fingerprint_indices: np.ndarray) -> np.ndarray | None:
+    positions = np.minimum(np.searchsorted(fingerprint_indices, indices), len(fingerprint_indices) - 1)
+    return positions if np.array_equal(fingerprint_indices[positions], indices) else None
+
+
+@clipped
+@preserve_channel_dim
+def fourier_domain_adaptation_with_fingerprint(img: np.ndarray, fingerprint: Fingerprint, beta: float) -> np.ndarray:
+    """Apply `fourier_domain_adaptation` with a target image amplitude spectrum from `get_fda_fingerprint`.
 
-        # Extract amplitude and phase
-        amp_src, pha_src = np.abs(fft_src_shifted), np.angle(fft_src_shifted)
-        amp_trg = np.abs(fft_trg_shifted)
+    All channels are transformed at once with a real FFT in single precision. Only the coefficients of the
+    low-frequency block change: they take the target amplitude and keep their phase, the rest of the spectrum is
+    passed to the inverse transform as it is.
+    """
+    src_img = _to_float_channels(img)
 
-        # Mutate the amplitude part of the source with the target
-        mutated_amp = low_freq_mutate(amp_src.copy(), amp_trg, beta)
+    if tuple(fingerprint["image_shape"]) != src_img.shape[:2]:
+        msg = f"Fingerprint is computed for images of shape {tuple(fingerprint['image_shape'])}, got {img.shape}."
+        raise ValueError(msg)
 
-        # Combine the mutated amplitude with the original phase
-        fft_src_mutated = np.fft.ifftshift(mutated_amp * np.exp(1j * pha_src))
+    rows, cols, weight = get_low_freq_block(src_img.shape, beta)
+    if not weight.any():
+        return src_img
 
-        # Perform inverse FFT
-        src_in_trg_channel = np.fft.ifft2(fft_src_mutated)
+    row_positions = _get_positions(rows, fingerprint["rows"])
+    col_positions = _get_positions(cols, fingerprint["cols"])
+    if row_positions is None or col_positions is None:
+        msg = f"Fingerprint is computed for a smaller beta than {beta}."
+        raise ValueError(msg)
+    amp_trg = fingerprint["amplitude"][np.ix_(row_positions, col_positions)]
 
-        # Store the result in the corresponding channel of the output image
-        src_in_trg[:, :, channel_id] = np.real(src_in_trg_channel)
+    spectrum = sfft.rfft2(src_img, axes=(0, 1))
+    block = spectrum[np.ix_(rows, cols)]
+    amp_src = np.abs(block)
+    # Unit phase of the source, zero coefficients have a zero phase
+    phase = np.divide(block, amp_src, out=np.ones_like(block), where=amp_src > 0)
+    spectrum[np.ix_(rows, cols)] = block + weight[..., np.newaxis] * (amp_trg * phase - block)
 
-    return src_in_trg
+    return sfft.irfft2(spectrum, s=src_img.shape[:2], axes=(0, 1))
 
 
 @clipped
@@ -346,7 +463,8 @@ def apply_histogram(img: np.ndarray, reference_image: np.ndarray, blend_ratio: f
     Note:
         - If the input and reference images have different sizes, the reference image
           will be resized to match the input image's dimensions.
-        - The function uses `match_histograms` from scikit-image for the core histogram matching.
+        - The matching is the same as `match_histograms` from scikit-image, split into the reference histogram
+          computed by `get_histogram_fingerprint` and the matching done by `apply_histogram_with_fingerprint`.
         - The @clipped and @preserve_channel_dim decorators ensure the output is within
           the valid range and maintains the original number of dimensions.
 
@@ -357,19 +475,74 @@ def apply_histogram(img: np.ndarray, reference_image: np.ndarray, blend_ratio: f
         >>> reference_image = np.random.randint(0, 256, (100, 100, 3), dtype=np.uint8)
         >>> result = apply_histogram(input_image, reference_image, blend_ratio=0.7)
     """
+    return apply_histogram_with_fingerprint(img, get_histogram_fingerprint(reference_image, img.shape), blend_ratio)
+
+
+def get_histogram_fingerprint(reference_image: np.ndarray, image_shape: tuple[int, ...]) -> Fingerprint:
+    """Compute the cumulative histogram of every channel of a reference image that `apply_histogram` matches.
+
+    The reference image is resized to `image_shape` first, as `apply_histogram` does.
+    """
     # Resize reference image only if necessary
-    if img.shape[:2] != reference_image.shape[:2]:
-        reference_image = cv2.resize(reference_image, dsize=(img.shape[1], img.shape[0]))
+    if tuple(image_shape[:2]) != reference_image.shape[:2]:
+        reference_image = cv2.resize(reference_image, dsize=(image_shape[1], image_shape[0]))
 
-    img = np.squeeze(img)
     reference_image = np.squeeze(reference_image)
+    channels = (
+        [reference_image]
+        if reference_image.ndim == MONO_CHANNEL_DIMENSIONS
+        else [reference_image[..., channel] for channel in range(reference_image.shape[-1])]
+    )
+
+    fingerprint = {}
+    for channel_id, channel in enumerate(channels):
+        if channel.dtype.kind == "u":
+            counts = np.bincount(channel.reshape(-1))
+            # omit values where the count was 0
+            values = np.nonzero(counts)[0]
+            counts = counts[values]
+        else:
+            values, counts = np.unique(channel.reshape(-1), return_counts=True)
+        fingerprint[f"values_{channel_id}"] = values
+        fingerprint[f"quantiles_{channel_id}"] = np.cumsum(counts) / channel.size
+    return fingerprint
+
+
+def _match_cumulative_cdf(source: np.ndarray, values: np.ndarray, quantiles: np.ndarray) -> np.ndarray:
+    # Same as skimage.exposure.match_histograms for a template whose quantiles are known
+    if source.dtype.kind == "u":
+        src_lookup = source.reshape(-1)
+        src_counts = np.bincount(src_lookup)
+    else:
+        _, src_lookup, src_counts = np.unique(source.reshape(-1), return_inverse=True, return_counts=True)
+
+    src_quantiles = np.cumsum(src_counts) / source.size
+    interp_a_values = np.interp(src_quantiles, quantiles, values)
+    return interp_a_values[src_lookup].reshape(source.shape)
+
+
+@clipped
+@preserve_channel_dim
+def apply_histogram_with_fingerprint(img: np.ndarray, fingerprint: Fingerprint, blend_ratio: float) -> np.ndarray:
+    """Apply `apply_histogram` with a reference histogram from `get_histogram_fingerprint`."""
+    img = np.squeeze(img)
+    num_channels = img.shape[2] if img.ndim == NUM_MULTI_CHANNEL_DIMENSIONS and img.shape[2] > 1 else 1
+    if num_channels != len(fingerprint) // 2:
+        raise ValueError("Number of channels in the input image and reference image must match!")
 
     # Match histograms between the images
-    matched = match_histograms(
-        img,
-        reference_image,
-        channel_axis=2 if img.ndim == NUM_MULTI_CHANNEL_DIMENSIONS and img.shape[2] > 1 else None,
-    )
+    if num_channels > 1:
+        matched = np.empty(img.shape, dtype=img.dtype)
+        for channel in range(num_channels):
+            matched[..., channel] = _match_cumulative_cdf(
+                img[..., channel],
+                fingerprint[f"values_{channel}"],
+                fingerprint[f"quantiles_{channel}"],
+            )
+    else:
+        matched = _match_cumulative_cdf(img, fingerprint["values_0"], fingerprint["quantiles_0"])
+        if img.dtype == np.float32:
+            matched = matched.astype(np.float32)
 
     # Blend the original image and the matched image
     return add_weighted(matched, blend_ratio, img, 1 - blend_ratio)
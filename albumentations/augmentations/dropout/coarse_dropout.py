@@ -268,5 +268,6 @@ class CoarseDropout(DualTransform):
             "image": self.apply,
             "mask": self.apply_to_mask,
             "masks": self.apply_to_masks,
+            "instance_masks": self.apply_to_instance_masks,
             "keypoints": self.apply_to_keypoints,
         }
@@ -1,14 +1,25 @@
 from __future__ import annotations
 
+from typing import Sequence
+
+import cv2
 import numpy as np
 from albucore.utils import MAX_VALUES_BY_DTYPE, is_grayscale_image, preserve_channel_dim
+from skimage.measure import label
 from typing_extensions import Literal
 
 from albumentations import random_utils
 from albumentations.augmentations.utils import handle_empty_array
-from albumentations.core.types import MONO_CHANNEL_DIMENSIONS, ColorType
+from albumentations.core.types import MONO_CHANNEL_DIMENSIONS, NUM_MULTI_CHANNEL_DIMENSIONS, ColorType
 
-__all__ = ["cutout", "channel_dropout", "filter_keypoints_in_holes", "generate_random_fill"]
+__all__ = [
+    "cutout",
+    "channel_dropout",
+    "filter_keypoints_in_holes",
+    "generate_random_fill",
+    "label_mask",
+    "get_dropout_mask",
+]
 
 
 @preserve_channel_dim
@@ -152,3 +163,82 @@ def filter_keypoints_in_holes(keypoints: np.ndarray, holes: np.ndarray) -> np.nd
     valid_keypoints = ~np.any(inside_hole, axis=1)
 
     return keypoints[valid_keypoints]
+
+
+def label_mask(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Label 8-connected regions of equal non-zero values of a single channel mask.
+
+    Labels are numbered from 1 in the raster order of the first pixel of every region, the same as by
+    `skimage.measure.label`. Masks with several channels are labeled as volumes by `skimage.measure.label`.
+
+    Args:
+        mask (np.ndarray): Mask of shape (height, width) or (height, width, num_channels).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Label image, of shape (height, width) for single channel masks, and
+            bounding boxes [x_min, y_min, x_max, y_max] of labels 1 to num_labels, with shape (num_labels, 4).
+
+    """
+    if mask.ndim == NUM_MULTI_CHANNEL_DIMENSIONS and mask.shape[-1] > 1:
+        label_image, num_labels = label(mask, return_num=True)
+        # Labels of volumes are not bounded by their boxes in the image plane, they span the whole mask
+        return label_image, np.tile([0, 0, mask.shape[1], mask.shape[0]], (num_labels, 1))
+
+    mask = mask.reshape(mask.shape[:2])
+    if mask.dtype.type in {np.uint8, np.bool_}:
+        histogram = cv2.calcHist([np.ascontiguousarray(mask).view(np.uint8)], [0], None, [256], [0, 256])
+        values = np.flatnonzero(histogram)
+    else:
+        values = np.unique(mask)
+    values = values[values != 0]
+
+    if len(values) <= 1:
+        return _label_binary(mask if mask.dtype == np.uint8 else (mask != 0).view(np.uint8))
+
+    label_image = np.zeros(mask.shape, dtype=np.int32)
+    value_boxes = []
+    num_labels = 0
+    for value in values:
+        value_labels, boxes = _label_binary((mask == value).view(np.uint8))
+        np.add(value_labels, num_labels, out=label_image, where=value_labels > 0)
+        value_boxes.append(boxes)
+        num_labels += len(boxes)
+    boxes = np.concatenate(value_boxes)
+
+    # Renumber labels of all values in the raster order of their first pixels, which lie in the top rows of boxes
+    first_x = [
+        x_min + np.argmax(label_image[y_min, x_min:x_max] == label)
+        for label, (x_min, y_min, x_max, _) in enumerate(boxes, start=1)
+    ]
+    order = np.lexsort((first_x, boxes[:, 1]))
+    lut = np.zeros(num_labels + 1, dtype=np.int32)
+    lut[order + 1] = np.arange(1, num_labels + 1, dtype=np.int32)
+    return lut[label_image], boxes[order]
+
+
+def _label_binary(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Wu's algorithm numbers labels in the raster order of their first pixels, unlike the parallel default ones
+    _, label_image, stats, _ = cv2.connectedComponentsWithStatsWithAlgorithm(mask, 8, cv2.CV_32S, cv2.CCL_WU)
+    boxes = stats[1:, :4].copy()
+    boxes[:, 2:] += boxes[:, :2]
+    return label_image, boxes
+
+
+def get_dropout_mask(label_image: np.ndarray, boxes: np.ndarray, labels: Sequence[int]) -> np.ndarray:
+    """Return the boolean mask of the pixels with one of `labels`.
+
+    If the bounding boxes of the labels cover less than the image, only their regions are compared, otherwise
+    the label image is mapped through a lookup table in a single pass.
+    """
+    selected_boxes = boxes[np.asarray(labels, dtype=np.intp) - 1]
+    boxes_area = int(np.prod(selected_boxes[:, 2:] - selected_boxes[:, :2], axis=1).sum())
+
+    if boxes_area < label_image.size:
+        dropout_mask = np.zeros(label_image.shape, dtype=bool)
+        for label, (x_min, y_min, x_max, y_max) in zip(labels, selected_boxes):
+            dropout_mask[y_min:y_max, x_min:x_max] |= label_image[y_min:y_max, x_min:x_max] == label
+        return dropout_mask
+
+    lut = np.zeros(len(boxes) + 1, dtype=bool)
+    lut[labels] = True
+    return lut[label_image]
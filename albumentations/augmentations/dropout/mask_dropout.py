@@ -1,18 +1,21 @@
 from __future__ import annotations
 
 import random
-from typing import Any, Callable, Tuple, cast
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Tuple, cast
 
 import cv2
 import numpy as np
 from pydantic import Field
-from skimage.measure import label
 from typing_extensions import Literal
 
+from albumentations.augmentations.utils import hash_arrays
 from albumentations.core.pydantic import OnePlusIntRangeType
 from albumentations.core.transforms_interface import BaseTransformInitSchema, DualTransform
 from albumentations.core.types import ScalarType, ScaleIntType, Targets
 
+from . import functional as fdropout
+
 __all__ = ["MaskDropout"]
 
 
@@ -28,6 +31,10 @@ class MaskDropout(DualTransform):
         image_fill_value: Fill value to use when filling image.
             Can be 'inpaint' to apply inpainting (works only  for 3-channel images)
         mask_fill_value: Fill value to use when filling mask.
+        label_cache_size: Number of masks whose connected components are cached, so that the mask of a sample
+            that is seen again is not labeled again. Default: 0, nothing is cached.
+        mask_id_key: Key of the data with an id of the mask, e.g. the index of the sample, that identifies
+            cached masks. If None, masks are identified by a hash of their content. Default: None.
 
     Targets:
         image, mask
@@ -53,12 +60,16 @@ class MaskDropout(DualTransform):
             ),
         )
         mask_fill_value: float = Field(default=0, description="Fill value to use when filling mask.")
+        label_cache_size: int = Field(default=0, ge=0, description="Number of masks with cached labels.")
+        mask_id_key: str | None = Field(default=None, description="Key of the data with an id of the mask.")
 
     def __init__(
         self,
         max_objects: ScaleIntType = (1, 1),
         image_fill_value: float | Literal["inpaint"] = 0,
         mask_fill_value: ScalarType = 0,
+        label_cache_size: int = 0,
+        mask_id_key: str | None = None,
         always_apply: bool | None = None,
         p: float = 0.5,
     ):
@@ -66,15 +77,37 @@ class MaskDropout(DualTransform):
         self.max_objects = cast(Tuple[int, int], max_objects)
         self.image_fill_value = image_fill_value
         self.mask_fill_value = mask_fill_value
+        self.label_cache_size = label_cache_size
+        self.mask_id_key = mask_id_key
+        self._label_cache: OrderedDict[Hashable, tuple[np.ndarray, np.ndarray]] = OrderedDict()
 
     @property
     def targets_as_params(self) -> list[str]:
-        return ["mask"]
+        return ["mask"] if self.mask_id_key is None else ["mask", self.mask_id_key]
+
+    def _label_mask(self, data: dict[str, Any]) -> tuple[np.ndarray, np.ndarray]:
+        if not self.label_cache_size:
+            return fdropout.label_mask(data["mask"])
+
+        key = data[self.mask_id_key] if self.mask_id_key is not None else hash_arrays([data["mask"]])
+        cached = self._label_cache.get(key)
+        if cached is not None:
+            self._label_cache.move_to_end(key)
+            return cached
+
+        cached = fdropout.label_mask(data["mask"])
+        for array in cached:
+            array.flags.writeable = False
+        self._label_cache[key] = cached
+        if len(self._label_cache) > self.label_cache_size:
+            self._label_cache.popitem(last=False)
+        return cached
 
     def get_params_dependent_on_data(self, params: dict[str, Any], data: dict[str, Any]) -> dict[str, Any]:
         mask = data["mask"]
 
-        label_image, num_labels = label(mask, return_num=True)
+        label_image, boxes = self._label_mask(data)
+        num_labels = len(boxes)
 
         if num_labels == 0:
             dropout_mask = None
@@ -86,9 +119,7 @@ class MaskDropout(DualTransform):
                 dropout_mask = mask > 0
             else:
                 labels_index = random.sample(range(1, num_labels + 1), objects_to_drop)
-                dropout_mask = np.zeros((mask.shape[0], mask.shape[1]), dtype=bool)
-                for label_index in labels_index:
-                    dropout_mask |= label_image == label_index
+                dropout_mask = fdropout.get_dropout_mask(label_image, boxes, labels_index)
 
         params.update({"dropout_mask": dropout_mask})
         return params
@@ -117,7 +148,7 @@ class MaskDropout(DualTransform):
         return mask
 
     def get_transform_init_args_names(self) -> tuple[str, ...]:
-        return "max_objects", "image_fill_value", "mask_fill_value"
+        return "max_objects", "image_fill_value", "mask_fill_value", "label_cache_size", "mask_id_key"
 
     @property
     def targets(self) -> dict[str, Callable[..., Any]]:
@@ -125,4 +156,5 @@ class MaskDropout(DualTransform):
             "image": self.apply,
             "mask": self.apply_to_mask,
             "masks": self.apply_to_masks,
+            "instance_masks": self.apply_to_instance_masks,
         }
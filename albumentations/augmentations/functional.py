@@ -58,11 +58,13 @@ __all__ = [
     "adjust_contrast_torchvision",
     "adjust_hue_torchvision",
     "adjust_saturation_torchvision",
+    "apply_color_matrix",
     "brightness_contrast_adjust",
     "center",
     "center_bbox",
     "channel_shuffle",
     "clahe",
+    "compose_color_matrices",
     "convolve",
     "downscale",
     "equalize",
@@ -88,6 +90,9 @@ __all__ = [
     "generate_approx_gaussian_noise",
 ]
 
+# Weights of R, G and B in the luma `cv2.COLOR_RGB2GRAY` computes
+RGB_TO_GRAY_WEIGHTS = np.array([0.299, 0.587, 0.114])
+
 
 def _shift_hsv_uint8(
     img: np.ndarray,
@@ -431,6 +436,25 @@ def linear_transformation_rgb(img: np.ndarray, transformation_matrix: np.ndarray
     return cv2.transform(img, transformation_matrix)
 
 
+def compose_color_matrices(second: np.ndarray, first: np.ndarray) -> np.ndarray:
+    """Return the (C, C + 1) affine map of channel values that applies `first` and then `second`."""
+    linear_part = second[:, :-1] @ first[:, :-1]
+    offset = second[:, :-1] @ first[:, -1] + second[:, -1]
+    return np.hstack([linear_part, offset[:, None]])
+
+
+@preserve_channel_dim
+def apply_color_matrix(img: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """Map the channel values of every pixel with a (C, C + 1) affine map in a single pass.
+
+    uint8 results are rounded and saturated by `cv2.transform`, float32 results are clipped to [0, 1].
+    """
+    result = cv2.transform(img, matrix)
+    if img.dtype == np.uint8:
+        return result
+    return clip(result, img.dtype)
+
+
 @preserve_channel_dim
 def clahe(img: np.ndarray, clip_limit: float, tile_grid_size: tuple[int, int]) -> np.ndarray:
     """Apply Contrast Limited Adaptive Histogram Equalization (CLAHE) to the input image.
@@ -1555,6 +1579,70 @@ def fancy_pca(img: np.ndarray, alpha_vector: np.ndarray) -> np.ndarray:
     return from_float(img_pca, dtype=orig_dtype) if orig_dtype == np.uint8 else img_pca
 
 
+def get_fancy_pca_matrix(
+    mean: np.ndarray,
+    cov: np.ndarray,
+    alpha_vector: np.ndarray,
+    num_pixels: int,
+    max_value: float,
+) -> np.ndarray:
+    """Return the (C, C + 1) affine map of channel values `fancy_pca` applies to an image with given statistics.
+
+    Args:
+        mean (np.ndarray): Per-channel mean of the image in the range of its dtype.
+        cov (np.ndarray): Population covariance matrix of the channels in the range of the image dtype.
+        alpha_vector (np.ndarray): Vector of scale factors for each principal component.
+        num_pixels (int): Number of pixels in the image.
+        max_value (float): Maximum value of the image dtype.
+
+    """
+    num_channels = len(mean)
+    if num_channels == 1:
+        noise_matrix = alpha_vector[0] * np.sqrt(cov) / max_value
+    else:
+        # `fancy_pca` computes the sample covariance of values scaled to [0, 1]
+        img_cov = cov * (num_pixels / max(num_pixels - 1, 1)) / max_value**2
+        eig_vals, eig_vecs = np.linalg.eigh(img_cov)
+
+        sort_perm = eig_vals[::-1].argsort()
+        eig_vals = eig_vals[sort_perm]
+        eig_vecs = eig_vecs[:, sort_perm]
+
+        noise_matrix = eig_vecs @ np.diag(alpha_vector * eig_vals)
+
+    return np.hstack([np.eye(num_channels) + noise_matrix, -(noise_matrix @ mean)[:, None]])
+
+
+def get_color_jitter_matrix(
+    mean: np.ndarray,
+    brightness: float,
+    contrast: float,
+    saturation: float,
+    order: Sequence[int],
+) -> np.ndarray:
+    """Return the (C, C + 1) affine map of channel values the brightness, contrast and saturation steps
+    of `ColorJitter` apply in the given order to an image with the given per-channel mean.
+
+    The hue step, index 3 in `order`, is not affine and is skipped.
+    """
+    num_channels = len(mean)
+    matrix = np.eye(num_channels, num_channels + 1)
+    for i in order:
+        if i == 0:
+            step = np.eye(num_channels, num_channels + 1) * brightness
+        elif i == 1:
+            current_mean = matrix[:, :-1] @ mean + matrix[:, -1]
+            gray_mean = current_mean[0] if num_channels == 1 else RGB_TO_GRAY_WEIGHTS @ current_mean
+            step = np.hstack([np.eye(num_channels) * contrast, np.full((num_channels, 1), gray_mean * (1 - contrast))])
+        elif i == 2 and num_channels == NUM_RGB_CHANNELS:  # noqa: PLR2004
+            linear_part = saturation * np.eye(num_channels) + (1 - saturation) * RGB_TO_GRAY_WEIGHTS[None, :]
+            step = np.hstack([linear_part, np.zeros((num_channels, 1))])
+        else:
+            continue
+        matrix = compose_color_matrices(step, matrix)
+    return matrix
+
+
 @preserve_channel_dim
 def adjust_brightness_torchvision(img: np.ndarray, factor: np.ndarray) -> np:
     if factor == 0:
@@ -2056,9 +2144,7 @@ PLANCKIAN_COEFFS = {
 }
 
 
-@clipped
-def planckian_jitter(img: np.ndarray, temperature: int, mode: PlanckianJitterMode = "blackbody") -> np.ndarray:
-    img = img.copy()
+def get_planckian_coeffs(temperature: int, mode: PlanckianJitterMode = "blackbody") -> np.ndarray:
     # Linearly interpolate between 2 closest temperatures
     step = 500
     t_left = (temperature // step) * step
@@ -2067,7 +2153,13 @@ def planckian_jitter(img: np.ndarray, temperature: int, mode: PlanckianJitterMod
     w_left = (t_right - temperature) / step
     w_right = (temperature - t_left) / step
 
-    coeffs = w_left * np.array(PLANCKIAN_COEFFS[mode][t_left]) + w_right * np.array(PLANCKIAN_COEFFS[mode][t_right])
+    return w_left * np.array(PLANCKIAN_COEFFS[mode][t_left]) + w_right * np.array(PLANCKIAN_COEFFS[mode][t_right])
+
+
+@clipped
+def planckian_jitter(img: np.ndarray, temperature: int, mode: PlanckianJitterMode = "blackbody") -> np.ndarray:
+    img = img.copy()
+    coeffs = get_planckian_coeffs(temperature, mode)
 
     image = to_float(img) if img.dtype == np.uint8 else img
 
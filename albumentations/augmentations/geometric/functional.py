@@ -12,6 +12,7 @@ from albumentations import random_utils
 from albumentations.augmentations.functional import bbox_from_mask, center
 from albumentations.augmentations.utils import angle_2pi_range, handle_empty_array
 from albumentations.core.bbox_utils import denormalize_bboxes, normalize_bboxes
+from albumentations.core.instance_masks import InstanceMasks
 from albumentations.core.types import (
     NUM_KEYPOINTS_COLUMNS_IN_ALBUMENTATIONS,
     NUM_MULTI_CHANNEL_DIMENSIONS,
@@ -19,6 +20,7 @@ from albumentations.core.types import (
     ColorType,
     D4Type,
     ScalarType,
+    d4_group_elements,
 )
 
 __all__ = [
@@ -47,6 +49,7 @@ __all__ = [
     "transpose",
     "vflip",
     "d4",
+    "compose_d4",
     "bboxes_rotate",
     "keypoints_rotate",
     "bboxes_d4",
@@ -59,6 +62,9 @@ __all__ = [
     "keypoints_vflip",
     "bboxes_hflip",
     "keypoints_hflip",
+    "instance_masks_d4",
+    "resize_instance_masks",
+    "warp_instance_masks",
 ]
 
 PAIR = 2
@@ -66,6 +72,9 @@ PAIR = 2
 ROT90_180_FACTOR = 2
 ROT90_270_FACTOR = 3
 
+# Map coordinate used for pixels that must not sample the source image under any interpolation
+OUTSIDE_MAP_COORDINATE = -1e4
+
 
 @handle_empty_array
 def bboxes_rot90(bboxes: np.ndarray, factor: int) -> np.ndarray:
@@ -1330,6 +1339,30 @@ def rot90(img: np.ndarray, factor: int) -> np.ndarray:
     return np.rot90(img, factor)
 
 
+def _build_d4_composition_table() -> dict[tuple[D4Type, D4Type], D4Type]:
+    # D4 acts faithfully on the corners of a 2x2 array, so every element leaves a distinct footprint on it
+    probe = np.arange(4).reshape(2, 2)
+    elements = {d4(probe, element).tobytes(): element for element in d4_group_elements}
+    return {
+        (first, second): elements[d4(d4(probe, first), second).tobytes()]
+        for first in d4_group_elements
+        for second in d4_group_elements
+    }
+
+
+D4_COMPOSITION_TABLE = _build_d4_composition_table()
+
+
+def compose_d4(first: D4Type, second: D4Type) -> D4Type:
+    """Returns the `D_4` group element equivalent to applying `first` and then `second`.
+
+    Example:
+        >>> compose_d4("h", "v")
+        'r180'
+    """
+    return D4_COMPOSITION_TABLE[first, second]
+
+
 @handle_empty_array
 def bboxes_vflip(bboxes: np.ndarray) -> np.ndarray:
     """Flip bounding boxes vertically around the x-axis.
@@ -2038,13 +2071,107 @@ def flip_bboxes(
     return flipped_bboxes
 
 
+def generate_distortion_maps(generated_mesh: np.ndarray, image_shape: tuple[int, int]) -> tuple[np.ndarray, np.ndarray]:
+    """Rasterize per-cell perspective transforms of a distortion mesh into dense remap maps.
+
+    For every cell the inverse homography (destination -> source) is evaluated only within the bounding
+    rectangle of its destination quadrilateral and written to the pixels covered by that quadrilateral,
+    so the total cost is proportional to the image area rather than to cells x image area.
+    Pixels that are not covered by any quadrilateral are mapped outside of the source image.
+    Where quadrilaterals overlap, later cells take precedence.
+
+    Args:
+        generated_mesh (np.ndarray): A 2D array where each row represents a quadrilateral cell
+                                    as [x1, y1, x2, y2, dst_x1, dst_y1, dst_x2, dst_y2, dst_x3, dst_y3, dst_x4, dst_y4].
+        image_shape (tuple[int, int]): The shape of the image (height, width).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The `map_x` and `map_y` float32 arrays of shape (height, width)
+            that can be passed to `cv2.remap`.
+
+    Example:
+        >>> mesh = np.array([[0, 0, 50, 50, 5, 5, 45, 5, 45, 45, 5, 45]])
+        >>> map_x, map_y = generate_distortion_maps(mesh, (100, 100))
+        >>> map_x.shape
+        (100, 100)
+    """
+    height, width = image_shape[:2]
+
+    # Pixels outside of every quadrilateral sample far enough outside of the source image
+    # that no interpolation kernel reaches back into it
+    map_x = np.full((height, width), OUTSIDE_MAP_COORDINATE, dtype=np.float32)
+    map_y = np.full((height, width), OUTSIDE_MAP_COORDINATE, dtype=np.float32)
+
+    for mesh in generated_mesh:
+        x1, y1, x2, y2 = mesh[:4]
+        dst_quad = np.int32(mesh[4:].reshape(4, 2))
+        src_quad = np.array([[x1, y1], [x2, y1], [x2, y2], [x1, y2]], dtype=np.float32)
+
+        inverse_mat = cv2.getPerspectiveTransform(dst_quad.astype(np.float32), src_quad)
+
+        # Only evaluate the homography inside the bounding rectangle of the destination cell
+        roi_x_min, roi_y_min = np.clip(dst_quad.min(axis=0), 0, [width, height])
+        roi_x_max, roi_y_max = np.clip(dst_quad.max(axis=0) + 1, 0, [width, height])
+        if roi_x_min >= roi_x_max or roi_y_min >= roi_y_max:
+            continue
+
+        roi = (slice(roi_y_min, roi_y_max), slice(roi_x_min, roi_x_max))
+        roi_mask = np.zeros((roi_y_max - roi_y_min, roi_x_max - roi_x_min), dtype=np.uint8)
+        cv2.fillConvexPoly(roi_mask, dst_quad - [roi_x_min, roi_y_min], 1)
+        inside = roi_mask.view(bool)
+
+        xs = np.arange(roi_x_min, roi_x_max, dtype=np.float64)[np.newaxis, :]
+        ys = np.arange(roi_y_min, roi_y_max, dtype=np.float64)[:, np.newaxis]
+        denominator = inverse_mat[2, 0] * xs + inverse_mat[2, 1] * ys + inverse_mat[2, 2]
+
+        src_x = (inverse_mat[0, 0] * xs + inverse_mat[0, 1] * ys + inverse_mat[0, 2]) / denominator
+        src_y = (inverse_mat[1, 0] * xs + inverse_mat[1, 1] * ys + inverse_mat[1, 2]) / denominator
+
+        np.copyto(map_x[roi], src_x, where=inside)
+        np.copyto(map_y[roi], src_y, where=inside)
+
+    return map_x, map_y
+
+
 @preserve_channel_dim
+def remap(
+    img: np.ndarray,
+    map_x: np.ndarray,
+    map_y: np.ndarray,
+    interpolation: int,
+    border_mode: int = cv2.BORDER_CONSTANT,
+    value: ColorType | None = None,
+) -> np.ndarray:
+    """Remap an image with precomputed maps, processing images with many channels in chunks.
+
+    Args:
+        img (np.ndarray): The input image.
+        map_x (np.ndarray): Float32 array of shape (height, width) with source x coordinates.
+        map_y (np.ndarray): Float32 array of shape (height, width) with source y coordinates.
+        interpolation (int): OpenCV interpolation flag.
+        border_mode (int): OpenCV border mode. Default: cv2.BORDER_CONSTANT.
+        value (ColorType | None): Border value if border_mode is cv2.BORDER_CONSTANT.
+
+    Returns:
+        np.ndarray: The remapped image with the same dtype and number of channels as the input.
+    """
+    remap_fn = maybe_process_in_chunks(
+        cv2.remap,
+        map1=map_x,
+        map2=map_y,
+        interpolation=interpolation,
+        borderMode=border_mode,
+        borderValue=value,
+    )
+    return remap_fn(img)
+
+
 def distort_image(image: np.ndarray, generated_mesh: np.ndarray, interpolation: int) -> np.ndarray:
     """Apply perspective distortion to an image based on a generated mesh.
 
     This function applies a perspective transformation to each cell of the image defined by the
-    generated mesh. The distortion is applied using OpenCV's perspective transformation and
-    blending techniques.
+    generated mesh. The per-cell transformations are rasterized into a single pair of dense maps
+    and applied with one `cv2.remap` call.
 
     Args:
         image (np.ndarray): The input image to be distorted. Can be a 2D grayscale image or a
@@ -2061,9 +2188,9 @@ def distort_image(image: np.ndarray, generated_mesh: np.ndarray, interpolation:
 
     Note:
         - The function preserves the channel dimension of the input image.
-        - Each cell of the generated mesh is transformed independently and then blended into the output image.
-        - The distortion is applied using perspective transformation, which allows for more complex
-          distortions compared to affine transformations.
+        - Pixels outside of every destination quadrilateral are filled with zeros.
+        - To distort several images with the same mesh, compute the maps once with
+          `generate_distortion_maps` and apply them with `remap`.
 
     Example:
         >>> image = np.random.randint(0, 255, (100, 100, 3), dtype=np.uint8)
@@ -2072,38 +2199,8 @@ def distort_image(image: np.ndarray, generated_mesh: np.ndarray, interpolation:
         >>> distorted.shape
         (100, 100, 3)
     """
-    distorted_image = np.zeros_like(image)
-
-    for mesh in generated_mesh:
-        # Extract source rectangle and destination quadrilateral
-        x1, y1, x2, y2 = mesh[:4]  # Source rectangle
-        dst_quad = mesh[4:].reshape(4, 2)  # Destination quadrilateral
-
-        # Convert source rectangle to quadrilateral
-        src_quad = np.array(
-            [
-                [x1, y1],  # Top-left
-                [x2, y1],  # Top-right
-                [x2, y2],  # Bottom-right
-                [x1, y2],  # Bottom-left
-            ],
-            dtype=np.float32,
-        )
-
-        # Calculate Perspective transformation matrix
-        perspective_mat = cv2.getPerspectiveTransform(src_quad, dst_quad)
-
-        # Apply Perspective transformation
-        warped = cv2.warpPerspective(image, perspective_mat, (image.shape[1], image.shape[0]), flags=interpolation)
-
-        # Create mask for the transformed region
-        mask = np.zeros(image.shape[:2], dtype=np.uint8)
-        cv2.fillConvexPoly(mask, np.int32(dst_quad), 255)
-
-        # Copy only the warped quadrilateral area to the output image
-        distorted_image = cv2.copyTo(warped, mask, distorted_image)
-
-    return distorted_image
+    map_x, map_y = generate_distortion_maps(generated_mesh, image.shape[:2])
+    return remap(image, map_x, map_y, interpolation)
 
 
 def calculate_grid_dimensions(
@@ -2642,3 +2739,122 @@ def bboxes_grid_distortion(
 
     # Normalize the returned bboxes
     return normalize_bboxes(bboxes_returned, image_shape)
+
+
+def instance_masks_d4(instance_masks: InstanceMasks, group_member: D4Type) -> InstanceMasks:
+    """Applies a `D_4` symmetry group transformation to sparse instance masks.
+
+    Only the tight crop of every instance is permuted, its bounding box is moved with `bboxes_d4`.
+
+    Args:
+        instance_masks (InstanceMasks): Instance masks to transform.
+        group_member (D4Type): A string identifier for the `D_4` group transformation to apply.
+            Valid values are 'e', 'r90', 'r180', 'r270', 'v', 'hvt', 'h', 't'.
+
+    Returns:
+        InstanceMasks: Transformed instance masks.
+    """
+    height, width = instance_masks.shape
+    shape = (width, height) if group_member in {"r90", "r270", "t", "hvt"} else (height, width)
+
+    normalized_bboxes = normalize_bboxes(instance_masks.bboxes.astype(np.float64), instance_masks.shape)
+    bboxes = denormalize_bboxes(bboxes_d4(normalized_bboxes, group_member), shape)
+
+    return InstanceMasks(
+        [d4(mask, group_member) for mask in instance_masks.masks],
+        np.round(bboxes),
+        shape,
+        instance_masks.ids,
+    )
+
+
+def warp_instance_masks(
+    instance_masks: InstanceMasks,
+    matrix: np.ndarray,
+    output_shape: tuple[int, int],
+    interpolation: int,
+) -> InstanceMasks:
+    """Warp sparse instance masks with an affine or perspective transformation matrix.
+
+    Every instance is warped only within the bounding rectangle of its transformed region,
+    which gives the same result as warping the full-frame mask with a constant zero border.
+
+    Args:
+        instance_masks (InstanceMasks): Instance masks to warp.
+        matrix (np.ndarray): 3x3 transformation matrix that maps source to destination pixel coordinates.
+        output_shape (tuple[int, int]): Height and width of the output image.
+        interpolation (int): OpenCV interpolation flag.
+
+    Returns:
+        InstanceMasks: Warped instance masks. Instances that end up outside of the output image are dropped.
+    """
+    height, width = output_shape[:2]
+    is_affine = np.allclose(matrix[2], [0, 0, 1])
+
+    masks = []
+    offsets = []
+    for mask, (x_min, y_min, x_max, y_max) in zip(instance_masks.masks, instance_masks.bboxes):
+        # Corners of the pixel area covered by the mask
+        corners = np.array([[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]], dtype=np.float32) - 0.5
+        warped_corners = cv2.perspectiveTransform(corners[np.newaxis], matrix)[0]
+
+        dst_x_min, dst_y_min = np.clip(np.floor(warped_corners.min(axis=0)).astype(int) - 1, 0, [width, height])
+        dst_x_max, dst_y_max = np.clip(np.ceil(warped_corners.max(axis=0)).astype(int) + 2, 0, [width, height])
+        if dst_x_min >= dst_x_max or dst_y_min >= dst_y_max:
+            masks.append(np.zeros((0, 0), dtype=mask.dtype))
+            offsets.append((0, 0))
+            continue
+
+        # Move the origin of the source and destination to the corresponding regions
+        roi_matrix = (
+            np.array([[1, 0, -dst_x_min], [0, 1, -dst_y_min], [0, 0, 1]], dtype=np.float64)
+            @ matrix
+            @ np.array([[1, 0, x_min], [0, 1, y_min], [0, 0, 1]], dtype=np.float64)
+        )
+        dsize = (int(dst_x_max - dst_x_min), int(dst_y_max - dst_y_min))
+
+        if is_affine:
+            warped = cv2.warpAffine(mask, roi_matrix[:2], dsize, flags=interpolation, borderMode=cv2.BORDER_CONSTANT)
+        else:
+            warped = cv2.warpPerspective(mask, roi_matrix, dsize, flags=interpolation, borderMode=cv2.BORDER_CONSTANT)
+
+        masks.append(warped)
+        offsets.append((dst_x_min, dst_y_min))
+
+    return InstanceMasks.from_rois(masks, np.array(offsets).reshape(-1, 2), (height, width), instance_masks.ids)
+
+
+def resize_instance_masks(
+    instance_masks: InstanceMasks,
+    target_shape: tuple[int, int],
+    interpolation: int,
+) -> InstanceMasks:
+    """Resize sparse instance masks to the target image shape.
+
+    Bounding boxes are scaled and rounded, then the tight crop of every instance is resized to its new box,
+    so borders of the instances may differ by up to one pixel from resizing the full-frame masks.
+
+    Args:
+        instance_masks (InstanceMasks): Instance masks to resize.
+        target_shape (tuple[int, int]): Height and width of the resized image.
+        interpolation (int): OpenCV interpolation flag.
+
+    Returns:
+        InstanceMasks: Resized instance masks.
+    """
+    height, width = instance_masks.shape
+    target_height, target_width = target_shape[:2]
+    if (height, width) == (target_height, target_width):
+        return instance_masks
+
+    scale = np.array([target_width / width, target_height / height] * 2)
+    bboxes = np.round(instance_masks.bboxes * scale).astype(np.int32)
+    # Keep at least one pixel of every instance
+    bboxes[:, 2:] = np.maximum(bboxes[:, 2:], bboxes[:, :2] + 1)
+
+    masks = [
+        cv2.resize(mask, (int(x_max - x_min), int(y_max - y_min)), interpolation=interpolation)
+        for mask, (x_min, y_min, x_max, y_max) in zip(instance_masks.masks, bboxes)
+    ]
+
+    return InstanceMasks.from_rois(masks, bboxes, (target_height, target_width), instance_masks.ids)
@@ -7,6 +7,7 @@ import cv2
 import numpy as np
 from pydantic import Field, ValidationInfo, field_validator
 
+from albumentations.core.instance_masks import InstanceMasks
 from albumentations.core.pydantic import InterpolationType, ProbabilityType
 from albumentations.core.transforms_interface import BaseTransformInitSchema, DualTransform
 from albumentations.core.types import ScaleFloatType, ScaleIntType, Targets
@@ -39,6 +40,7 @@ class RandomScale(DualTransform):
     """
 
     _targets = (Targets.IMAGE, Targets.MASK, Targets.BBOXES, Targets.KEYPOINTS)
+    _stack_channels = True
 
     class InitSchema(BaseTransformInitSchema):
         scale_limit: ScaleFloatType
@@ -125,6 +127,7 @@ class LongestMaxSize(DualTransform):
     """
 
     _targets = (Targets.IMAGE, Targets.MASK, Targets.BBOXES, Targets.KEYPOINTS)
+    _stack_channels = True
 
     class InitSchema(MaxSizeInitSchema):
         pass
@@ -189,6 +192,7 @@ class SmallestMaxSize(DualTransform):
     """
 
     _targets = (Targets.IMAGE, Targets.MASK, Targets.KEYPOINTS, Targets.BBOXES)
+    _stack_channels = True
 
     class InitSchema(MaxSizeInitSchema):
         pass
@@ -255,6 +259,7 @@ class Resize(DualTransform):
     """
 
     _targets = (Targets.IMAGE, Targets.MASK, Targets.KEYPOINTS, Targets.BBOXES)
+    _stack_channels = True
 
     class InitSchema(BaseTransformInitSchema):
         height: int = Field(ge=1, description="Desired height of the output.")
@@ -278,6 +283,9 @@ class Resize(DualTransform):
     def apply(self, img: np.ndarray, interpolation: int, **params: Any) -> np.ndarray:
         return fgeometric.resize(img, (self.height, self.width), interpolation=interpolation)
 
+    def apply_to_instance_masks(self, instance_masks: InstanceMasks, **params: Any) -> InstanceMasks:
+        return fgeometric.resize_instance_masks(instance_masks, (self.height, self.width), cv2.INTER_NEAREST)
+
     def apply_to_bboxes(self, bboxes: np.ndarray, **params: Any) -> np.ndarray:
         # Bounding box coordinates are scale invariant
         return bboxes
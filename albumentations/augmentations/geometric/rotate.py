@@ -12,10 +12,12 @@ from typing_extensions import Literal
 from albumentations.augmentations.crops import functional as fcrops
 from albumentations.augmentations.functional import center, center_bbox
 from albumentations.augmentations.geometric.transforms import Affine
+from albumentations.core.instance_masks import InstanceMasks
 from albumentations.core.pydantic import BorderModeType, InterpolationType, SymmetricRangeType
 from albumentations.core.transforms_interface import BaseTransformInitSchema, DualTransform
 from albumentations.core.types import (
     ColorType,
+    D4Type,
     ScaleFloatType,
     Targets,
 )
@@ -26,6 +28,8 @@ __all__ = ["Rotate", "RandomRotate90", "SafeRotate"]
 
 SMALL_NUMBER = 1e-10
 
+ROT90_GROUP_ELEMENTS: tuple[D4Type, ...] = ("e", "r90", "r180", "r270")
+
 
 class RandomRotate90(DualTransform):
     """Randomly rotate the input by 90 degrees zero or more times.
@@ -42,14 +46,21 @@ class RandomRotate90(DualTransform):
     """
 
     _targets = (Targets.IMAGE, Targets.MASK, Targets.BBOXES, Targets.KEYPOINTS)
+    _d4_symmetry = True
 
     def apply(self, img: np.ndarray, factor: int, **params: Any) -> np.ndarray:
         return fgeometric.rot90(img, factor)
 
+    def apply_to_instance_masks(self, instance_masks: InstanceMasks, factor: int, **params: Any) -> InstanceMasks:
+        return fgeometric.instance_masks_d4(instance_masks, ROT90_GROUP_ELEMENTS[factor])
+
     def get_params(self) -> dict[str, int]:
         # Random int in the range [0, 3]
         return {"factor": random.randint(0, 3)}
 
+    def get_d4_group_element(self, params: dict[str, Any]) -> D4Type:
+        return ROT90_GROUP_ELEMENTS[params["factor"]]
+
     def apply_to_bboxes(self, bboxes: np.ndarray, factor: int, **params: Any) -> np.ndarray:
         return fgeometric.bboxes_rot90(bboxes, factor)
 
@@ -100,6 +111,7 @@ class Rotate(DualTransform):
     """
 
     _targets = (Targets.IMAGE, Targets.MASK, Targets.BBOXES, Targets.KEYPOINTS)
+    _stack_channels = True
 
     class InitSchema(RotateInitSchema):
         rotate_method: Literal["largest_box", "ellipse"]
@@ -17,6 +17,7 @@ from albumentations import random_utils
 from albumentations.augmentations.functional import center, center_bbox
 from albumentations.augmentations.utils import check_range
 from albumentations.core.bbox_utils import denormalize_bboxes, normalize_bboxes
+from albumentations.core.instance_masks import InstanceMasks
 from albumentations.core.pydantic import (
     BorderModeType,
     InterpolationType,
@@ -96,6 +97,7 @@ class ElasticTransform(DualTransform):
     """
 
     _targets = (Targets.IMAGE, Targets.MASK, Targets.BBOXES)
+    _stack_channels = True
 
     class InitSchema(BaseTransformInitSchema):
         alpha: Annotated[float, Field(description="Alpha parameter.", ge=0)]
@@ -207,6 +209,7 @@ class ElasticTransform(DualTransform):
             "image": self.apply,
             "mask": self.apply_to_mask,
             "masks": self.apply_to_masks,
+            "instance_masks": self.apply_to_instance_masks,
             "bboxes": self.apply_to_bboxes,
         }
 
@@ -242,6 +245,7 @@ class Perspective(DualTransform):
     """
 
     _targets = (Targets.IMAGE, Targets.MASK, Targets.KEYPOINTS, Targets.BBOXES)
+    _stack_channels = True
 
     class InitSchema(BaseTransformInitSchema):
         scale: NonNegativeFloatRangeType
@@ -292,6 +296,36 @@ class Perspective(DualTransform):
             params["interpolation"],
         )
 
+    def apply_to_instance_masks(
+        self,
+        instance_masks: InstanceMasks,
+        matrix: np.ndarray,
+        max_height: int,
+        max_width: int,
+        **params: Any,
+    ) -> InstanceMasks:
+        if self.pad_mode != cv2.BORDER_CONSTANT or np.any(np.asarray(self.pad_val) != 0):
+            return super().apply_to_instance_masks(
+                instance_masks,
+                matrix=matrix,
+                max_height=max_height,
+                max_width=max_width,
+                **params,
+            )
+
+        output_shape = (max_height, max_width)
+        if self.keep_size:
+            # Fold the final resize into the warp
+            output_shape = instance_masks.shape
+            scale_x = output_shape[1] / max_width
+            scale_y = output_shape[0] / max_height
+            resize_matrix = np.array(
+                [[scale_x, 0, 0.5 * (scale_x - 1)], [0, scale_y, 0.5 * (scale_y - 1)], [0, 0, 1]],
+            )
+            matrix = resize_matrix @ matrix
+
+        return fgeometric.warp_instance_masks(instance_masks, matrix, output_shape, cv2.INTER_NEAREST)
+
     def apply_to_bboxes(
         self,
         bboxes: np.ndarray,
@@ -545,6 +579,7 @@ class Affine(DualTransform):
     """
 
     _targets = (Targets.IMAGE, Targets.MASK, Targets.BBOXES, Targets.KEYPOINTS)
+    _stack_channels = True
 
     class InitSchema(BaseTransformInitSchema):
         scale: ScaleFloatType | dict[str, Any] | None = Field(
@@ -713,6 +748,24 @@ class Affine(DualTransform):
             output_shape=output_shape,
         )
 
+    def apply_to_instance_masks(
+        self,
+        instance_masks: InstanceMasks,
+        matrix: skimage.transform.ProjectiveTransform,
+        output_shape: tuple[int, int],
+        **params: Any,
+    ) -> InstanceMasks:
+        # Regions of the instances cannot reproduce reflected or non-zero borders
+        if self.mode != cv2.BORDER_CONSTANT or np.any(np.asarray(self.cval_mask) != 0):
+            return super().apply_to_instance_masks(instance_masks, matrix=matrix, output_shape=output_shape, **params)
+
+        return fgeometric.warp_instance_masks(
+            instance_masks,
+            matrix.params,
+            (int(np.round(output_shape[0])), int(np.round(output_shape[1]))),
+            self.mask_interpolation,
+        )
+
     def apply_to_bboxes(
         self,
         bboxes: np.ndarray,
@@ -1005,6 +1058,7 @@ class PiecewiseAffine(DualTransform):
     """
 
     _targets = (Targets.IMAGE, Targets.MASK, Targets.BBOXES, Targets.KEYPOINTS)
+    _stack_channels = True
 
     class InitSchema(BaseTransformInitSchema):
         scale: NonNegativeFloatRangeType
@@ -1473,16 +1527,23 @@ class VerticalFlip(DualTransform):
     """
 
     _targets = (Targets.IMAGE, Targets.MASK, Targets.BBOXES, Targets.KEYPOINTS)
+    _d4_symmetry = True
 
     def apply(self, img: np.ndarray, **params: Any) -> np.ndarray:
         return fgeometric.vflip(img)
 
+    def apply_to_instance_masks(self, instance_masks: InstanceMasks, **params: Any) -> InstanceMasks:
+        return fgeometric.instance_masks_d4(instance_masks, "v")
+
     def apply_to_bboxes(self, bboxes: np.ndarray, **params: Any) -> np.ndarray:
         return fgeometric.bboxes_vflip(bboxes)
 
     def apply_to_keypoints(self, keypoints: np.ndarray, **params: Any) -> np.ndarray:
         return fgeometric.keypoints_vflip(keypoints, params["rows"])
 
+    def get_d4_group_element(self, params: dict[str, Any]) -> D4Type:
+        return "v"
+
     def get_transform_init_args_names(self) -> tuple[()]:
         return ()
 
@@ -1502,6 +1563,7 @@ class HorizontalFlip(DualTransform):
     """
 
     _targets = (Targets.IMAGE, Targets.MASK, Targets.BBOXES, Targets.KEYPOINTS)
+    _d4_symmetry = True
 
     def apply(self, img: np.ndarray, **params: Any) -> np.ndarray:
         if get_num_channels(img) > 1 and img.dtype == np.uint8:
@@ -1511,12 +1573,18 @@ class HorizontalFlip(DualTransform):
 
         return fgeometric.hflip(img)
 
+    def apply_to_instance_masks(self, instance_masks: InstanceMasks, **params: Any) -> InstanceMasks:
+        return fgeometric.instance_masks_d4(instance_masks, "h")
+
     def apply_to_bboxes(self, bboxes: np.ndarray, **params: Any) -> np.ndarray:
         return fgeometric.bboxes_hflip(bboxes)
 
     def apply_to_keypoints(self, keypoints: np.ndarray, **params: Any) -> np.ndarray:
         return fgeometric.keypoints_hflip(keypoints, params["cols"])
 
+    def get_d4_group_element(self, params: dict[str, Any]) -> D4Type:
+        return "h"
+
     def get_transform_init_args_names(self) -> tuple[()]:
         return ()
 
@@ -1571,16 +1639,23 @@ class Transpose(DualTransform):
     """
 
     _targets = (Targets.IMAGE, Targets.MASK, Targets.BBOXES, Targets.KEYPOINTS)
+    _d4_symmetry = True
 
     def apply(self, img: np.ndarray, **params: Any) -> np.ndarray:
         return fgeometric.transpose(img)
 
+    def apply_to_instance_masks(self, instance_masks: InstanceMasks, **params: Any) -> InstanceMasks:
+        return fgeometric.instance_masks_d4(instance_masks, "t")
+
     def apply_to_bboxes(self, bboxes: np.ndarray, **params: Any) -> np.ndarray:
         return fgeometric.bboxes_transpose(bboxes)
 
     def apply_to_keypoints(self, keypoints: np.ndarray, **params: Any) -> np.ndarray:
         return fgeometric.keypoints_transpose(keypoints)
 
+    def get_d4_group_element(self, params: dict[str, Any]) -> D4Type:
+        return "t"
+
     def get_transform_init_args_names(self) -> tuple[()]:
         return ()
 
@@ -1611,6 +1686,7 @@ class OpticalDistortion(DualTransform):
     """
 
     _targets = (Targets.IMAGE, Targets.MASK, Targets.BBOXES)
+    _stack_channels = True
 
     class InitSchema(BaseTransformInitSchema):
         distort_limit: SymmetricRangeType = (-0.05, 0.05)
@@ -1685,6 +1761,7 @@ class OpticalDistortion(DualTransform):
             "image": self.apply,
             "mask": self.apply_to_mask,
             "masks": self.apply_to_masks,
+            "instance_masks": self.apply_to_instance_masks,
             "bboxes": self.apply_to_bboxes,
         }
 
@@ -1724,6 +1801,7 @@ class GridDistortion(DualTransform):
     """
 
     _targets = (Targets.IMAGE, Targets.MASK, Targets.BBOXES)
+    _stack_channels = True
 
     class InitSchema(BaseTransformInitSchema):
         num_steps: Annotated[int, Field(ge=1, description="Count of grid cells on each side.")]
@@ -1862,6 +1940,7 @@ class GridDistortion(DualTransform):
             "image": self.apply,
             "mask": self.apply_to_mask,
             "masks": self.apply_to_masks,
+            "instance_masks": self.apply_to_instance_masks,
             "bboxes": self.apply_to_bboxes,
         }
 
@@ -1902,6 +1981,7 @@ class D4(DualTransform):
     """
 
     _targets = (Targets.IMAGE, Targets.MASK, Targets.BBOXES, Targets.KEYPOINTS)
+    _d4_symmetry = True
 
     class InitSchema(BaseTransformInitSchema):
         p: ProbabilityType = 1
@@ -1916,6 +1996,14 @@ class D4(DualTransform):
     def apply(self, img: np.ndarray, group_element: D4Type, **params: Any) -> np.ndarray:
         return fgeometric.d4(img, group_element)
 
+    def apply_to_instance_masks(
+        self,
+        instance_masks: InstanceMasks,
+        group_element: D4Type,
+        **params: Any,
+    ) -> InstanceMasks:
+        return fgeometric.instance_masks_d4(instance_masks, group_element)
+
     def apply_to_bboxes(self, bboxes: np.ndarray, group_element: D4Type, **params: Any) -> np.ndarray:
         return fgeometric.bboxes_d4(bboxes, group_element)
 
@@ -1932,6 +2020,9 @@ class D4(DualTransform):
             "group_element": random_utils.choice(d4_group_elements),
         }
 
+    def get_d4_group_element(self, params: dict[str, Any]) -> D4Type:
+        return params["group_element"]
+
     def get_transform_init_args_names(self) -> tuple[()]:
         return ()
 
@@ -1971,6 +2062,7 @@ class GridElasticDeform(DualTransform):
     """
 
     _targets = (Targets.IMAGE, Targets.MASK)
+    _stack_channels = True
 
     class InitSchema(BaseTransformInitSchema):
         num_grid_xy: Annotated[tuple[int, int], AfterValidator(check_1plus)]
@@ -2013,11 +2105,16 @@ class GridElasticDeform(DualTransform):
 
         return {"generated_mesh": generated_mesh}
 
-    def apply(self, img: np.ndarray, generated_mesh: np.ndarray, **params: Any) -> np.ndarray:
-        return fgeometric.distort_image(img, generated_mesh, self.interpolation)
+    def apply_with_params(self, params: dict[str, Any], *args: Any, **kwargs: Any) -> dict[str, Any]:
+        # Dense maps are built once per call and shared by all targets, but are not stored in params
+        map_x, map_y = fgeometric.generate_distortion_maps(params["generated_mesh"], params["shape"][:2])
+        return super().apply_with_params({**params, "map_x": map_x, "map_y": map_y}, *args, **kwargs)
+
+    def apply(self, img: np.ndarray, map_x: np.ndarray, map_y: np.ndarray, **params: Any) -> np.ndarray:
+        return fgeometric.remap(img, map_x, map_y, self.interpolation)
 
-    def apply_to_mask(self, mask: np.ndarray, generated_mesh: np.ndarray, **params: Any) -> np.ndarray:
-        return fgeometric.distort_image(mask, generated_mesh, self.mask_interpolation)
+    def apply_to_mask(self, mask: np.ndarray, map_x: np.ndarray, map_y: np.ndarray, **params: Any) -> np.ndarray:
+        return fgeometric.remap(mask, map_x, map_y, self.mask_interpolation)
 
     def get_transform_init_args_names(self) -> tuple[str, ...]:
         return "num_grid_xy", "magnitude", "interpolation", "mask_interpolation"
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import random
 import types
-from typing import Any, Callable, Generator, Iterable, Iterator, Sequence
+from collections import OrderedDict
+from typing import Any, Callable, Generator, Iterable, Iterator, Sequence, Tuple
 from warnings import warn
 
 import cv2
@@ -14,12 +15,18 @@ from typing_extensions import Annotated
 
 from albumentations.augmentations.mixing import functional as fmixing
 from albumentations.core.bbox_utils import check_bboxes, denormalize_bboxes
+from albumentations.core.reference_cache import ReferenceBank, ReferencePrefetcher
 from albumentations.core.transforms_interface import BaseTransformInitSchema, ReferenceBasedTransform
 from albumentations.core.types import LENGTH_RAW_BBOX, ReferenceImage, Targets
 from albumentations.random_utils import beta
 
 __all__ = ["MixUp", "OverlayElements"]
 
+OVERLAY_CACHE_SIZE = 64
+
+# Source array id, width, height and interpolation of a resized overlay
+OverlayCacheKey = Tuple[int, int, int, int]
+
 
 class MixUp(ReferenceBasedTransform):
     """Performs MixUp data augmentation, blending images, masks, and class labels with reference data.
@@ -37,6 +44,7 @@ class MixUp(ReferenceBasedTransform):
         reference_data (Optional[Union[Generator[ReferenceImage, None, None], Sequence[Any]]]):
             A sequence or generator of dictionaries containing the reference data for mixing
             If None or an empty sequence is provided, no operation is performed and a warning is issued.
+            A `ReferenceBank` of such dictionaries is read from the bank, without `read_fn`.
         read_fn (Callable[[ReferenceImage], dict[str, Any]]):
             A function to process items from reference_data. It should accept items from reference_data
             and return a dictionary containing processed data:
@@ -48,6 +56,9 @@ class MixUp(ReferenceBasedTransform):
         alpha (float):
             The alpha parameter for the Beta distribution, influencing the mix's balance. Must be ≥ 0.
             Higher values lead to more uniform mixing. Defaults to 0.4.
+        reference_prefetcher (ReferencePrefetcher | None):
+            If set, reference data is drawn ahead and read with `read_fn` on background threads,
+            optionally resized to the size of the input images. Defaults to None.
         p (float):
             The probability of applying the transformation. Defaults to 0.5.
 
@@ -114,17 +125,19 @@ class MixUp(ReferenceBasedTransform):
     _targets = (Targets.IMAGE, Targets.MASK, Targets.GLOBAL_LABEL)
 
     class InitSchema(BaseTransformInitSchema):
-        reference_data: Generator[Any, None, None] | Sequence[Any] | None = None
+        reference_data: ReferenceBank | Generator[Any, None, None] | Sequence[Any] | None = None
         read_fn: Callable[[ReferenceImage], Any]
         alpha: Annotated[float, Field(default=0.4, ge=0, le=1)]
         mix_coef_return_name: str = "mix_coef"
+        reference_prefetcher: ReferencePrefetcher | None = None
 
     def __init__(
         self,
-        reference_data: Generator[Any, None, None] | Sequence[Any] | None = None,
+        reference_data: ReferenceBank | Generator[Any, None, None] | Sequence[Any] | None = None,
         read_fn: Callable[[ReferenceImage], Any] = lambda x: {"image": x, "mask": None, "class_label": None},
         alpha: float = 0.4,
         mix_coef_return_name: str = "mix_coef",
+        reference_prefetcher: ReferencePrefetcher | None = None,
         always_apply: bool | None = None,
         p: float = 0.5,
     ):
@@ -133,6 +146,7 @@ class MixUp(ReferenceBasedTransform):
 
         self.read_fn = read_fn
         self.alpha = alpha
+        self.reference_prefetcher = reference_prefetcher
 
         if reference_data is None:
             warn("No reference data provided for MixUp. This transform will act as a no-op.", stacklevel=2)
@@ -194,33 +208,51 @@ class MixUp(ReferenceBasedTransform):
     def get_transform_init_args_names(self) -> tuple[str, ...]:
         return "reference_data", "alpha"
 
-    def get_params(self) -> dict[str, None | float | dict[str, Any]]:
-        mix_data = None
+    def draw_reference(self) -> Any:
+        """Return the next item of `reference_data`, raise StopIteration if there is none."""
         # Check if reference_data is not empty and is a sequence (list, tuple, np.array)
         if isinstance(self.reference_data, Sequence) and not isinstance(self.reference_data, (str, bytes)):
             if len(self.reference_data) > 0:  # Additional check to ensure it's not empty
                 mix_idx = random.randint(0, len(self.reference_data) - 1)
-                mix_data = self.reference_data[mix_idx]
+                # Items of a bank are referred to by their index and read from the bank by get_read_fn()
+                return mix_idx if isinstance(self.reference_data, ReferenceBank) else self.reference_data[mix_idx]
         # Check if reference_data is an iterator or generator
         elif isinstance(self.reference_data, Iterator):
-            try:
-                mix_data = next(self.reference_data)  # Attempt to get the next item
-            except StopIteration:
+            return next(self.reference_data)
+        raise StopIteration
+
+    def get_read_fn(self) -> Callable[[Any], Any]:
+        """Return the function that reads references, the bank itself for a `ReferenceBank`."""
+        if isinstance(self.reference_data, ReferenceBank):
+            return self.reference_data
+        return self.read_fn
+
+    def read_next_reference(self) -> Any | None:
+        """Return the next reference read with `get_read_fn()`, or None if there is none."""
+        if self.reference_prefetcher is not None:
+            return self.reference_prefetcher.get(self.draw_reference, self.get_read_fn())
+        try:
+            reference = self.draw_reference()
+        except StopIteration:
+            return None
+        return self.get_read_fn()(reference)
+
+    def get_params(self) -> dict[str, None | float | dict[str, Any]]:
+        mix_data = self.read_next_reference()
+
+        if mix_data is None:
+            if isinstance(self.reference_data, Iterator):
                 warn(
                     "Reference data iterator/generator has been exhausted. "
                     "Further mixing augmentations will not be applied.",
                     RuntimeWarning,
                     stacklevel=2,
                 )
-                return {"mix_data": {}, "mix_coef": 1}
-
-        # If mix_data is None or empty after the above checks, return default values
-        if mix_data is None:
+            # If there is no reference data, return default values
             return {"mix_data": {}, "mix_coef": 1}
 
-        # If mix_data is not None, calculate mix_coef and apply read_fn
         mix_coef = beta(self.alpha, self.alpha)  # Assuming beta is defined elsewhere
-        return {"mix_data": self.read_fn(mix_data), "mix_coef": mix_coef}
+        return {"mix_data": mix_data, "mix_coef": mix_coef}
 
     def apply_with_params(self, params: dict[str, Any], *args: Any, **kwargs: Any) -> dict[str, Any]:
         res = super().apply_with_params(params, *args, **kwargs)
@@ -257,6 +289,10 @@ class OverlayElements(ReferenceBasedTransform):
     Image types:
         uint8, float32
 
+    Note:
+        Overlays resized to their bounding boxes are cached, so that metadata that repeats from call to call, e.g.
+        the same logos, is resized once. Overlay arrays are expected not to be modified in place.
+
     Reference:
         https://github.com/danaaubakirova/doc-augmentation
 
@@ -275,13 +311,18 @@ class OverlayElements(ReferenceBasedTransform):
     ):
         super().__init__(p=p, always_apply=always_apply)
         self.metadata_key = metadata_key
+        self._overlay_cache: OrderedDict[OverlayCacheKey, tuple[np.ndarray, np.ndarray]] = OrderedDict()
 
     @property
     def targets_as_params(self) -> list[str]:
         return [self.metadata_key]
 
     @staticmethod
-    def preprocess_metadata(metadata: dict[str, Any], img_shape: tuple[int, int]) -> dict[str, Any]:
+    def preprocess_metadata(
+        metadata: dict[str, Any],
+        img_shape: tuple[int, int],
+        overlay_cache: OrderedDict[OverlayCacheKey, tuple[np.ndarray, np.ndarray]] | None = None,
+    ) -> dict[str, Any]:
         overlay_image = metadata["image"]
         overlay_height, overlay_width = overlay_image.shape[:2]
         image_height, image_width = img_shape[:2]
@@ -296,11 +337,16 @@ class OverlayElements(ReferenceBasedTransform):
 
             if "mask" in metadata:
                 mask = metadata["mask"]
-                mask = cv2.resize(mask, (x_max - x_min, y_max - y_min), interpolation=cv2.INTER_NEAREST)
+                mask = resize_overlay(mask, (x_max - x_min, y_max - y_min), cv2.INTER_NEAREST, overlay_cache)
             else:
                 mask = np.ones((y_max - y_min, x_max - x_min), dtype=np.uint8)
 
-            overlay_image = cv2.resize(overlay_image, (x_max - x_min, y_max - y_min), interpolation=cv2.INTER_AREA)
+            overlay_image = resize_overlay(
+                overlay_image,
+                (x_max - x_min, y_max - y_min),
+                cv2.INTER_AREA,
+                overlay_cache,
+            )
             offset = (y_min, x_min)
 
             if len(bbox) == LENGTH_RAW_BBOX and "bbox_id" in metadata:
@@ -309,7 +355,12 @@ class OverlayElements(ReferenceBasedTransform):
                 bbox = (x_min, y_min, x_max, y_max, *bbox[4:])
         else:
             if image_height < overlay_height or image_width < overlay_width:
-                overlay_image = cv2.resize(overlay_image, (image_width, image_height), interpolation=cv2.INTER_AREA)
+                overlay_image = resize_overlay(
+                    overlay_image,
+                    (image_width, image_height),
+                    cv2.INTER_AREA,
+                    overlay_cache,
+                )
                 overlay_height, overlay_width = overlay_image.shape[:2]
 
             mask = metadata["mask"] if "mask" in metadata else np.ones_like(overlay_image, dtype=np.uint8)
@@ -349,9 +400,9 @@ class OverlayElements(ReferenceBasedTransform):
         img_shape = params["shape"]
 
         if isinstance(metadata, list):
-            overlay_data = [self.preprocess_metadata(md, img_shape) for md in metadata]
+            overlay_data = [self.preprocess_metadata(md, img_shape, self._overlay_cache) for md in metadata]
         else:
-            overlay_data = [self.preprocess_metadata(metadata, img_shape)]
+            overlay_data = [self.preprocess_metadata(metadata, img_shape, self._overlay_cache)]
 
         return {
             "overlay_data": overlay_data,
@@ -393,3 +444,28 @@ class OverlayElements(ReferenceBasedTransform):
 
     def get_transform_init_args_names(self) -> tuple[str, ...]:
         return ("metadata_key",)
+
+
+def resize_overlay(
+    image: np.ndarray,
+    size: tuple[int, int],
+    interpolation: int,
+    overlay_cache: OrderedDict[OverlayCacheKey, tuple[np.ndarray, np.ndarray]] | None,
+) -> np.ndarray:
+    """Resize an overlay to (width, height), reusing the result of a previous call for the same array and size."""
+    if overlay_cache is None:
+        return cv2.resize(image, size, interpolation=interpolation)
+
+    key = (id(image), *size, interpolation)
+    cached = overlay_cache.get(key)
+    if cached is not None:
+        overlay_cache.move_to_end(key)
+        return cached[1]
+
+    resized = cv2.resize(image, size, interpolation=interpolation)
+    resized.flags.writeable = False
+    # The source array is kept alive with its resized copy, so that its id is not reused by another array
+    overlay_cache[key] = (image, resized)
+    if len(overlay_cache) > OVERLAY_CACHE_SIZE:
+        overlay_cache.popitem(last=False)
+    return resized
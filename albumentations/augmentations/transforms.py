@@ -28,7 +28,7 @@ from typing_extensions import Annotated, Literal, Self, TypedDict
 from albumentations import random_utils
 from albumentations.augmentations.blur.functional import blur
 from albumentations.augmentations.blur.transforms import BlurInitSchema, process_blur_limit
-from albumentations.augmentations.utils import check_range, non_rgb_error
+from albumentations.augmentations.utils import ColorStats, check_range, non_rgb_error
 from albumentations.core.pydantic import (
     InterpolationType,
     NonNegativeFloatRangeType,
@@ -200,6 +200,7 @@ class RandomGridShuffle(DualTransform):
             "image": self.apply,
             "mask": self.apply_to_mask,
             "masks": self.apply_to_masks,
+            "instance_masks": self.apply_to_instance_masks,
             "keypoints": self.apply_to_keypoints,
         }
 
@@ -2174,6 +2175,8 @@ class RGBShift(ImageOnlyTransform):
         - Color cast: https://en.wikipedia.org/wiki/Color_cast
     """
 
+    _linear_color = True
+
     class InitSchema(BaseTransformInitSchema):
         r_shift_limit: SymmetricRangeType
         g_shift_limit: SymmetricRangeType
@@ -2199,6 +2202,11 @@ class RGBShift(ImageOnlyTransform):
 
         return albucore.add_vector(img, shift)
 
+    def get_color_matrix(self, params: dict[str, Any], stats: ColorStats) -> np.ndarray | None:
+        if stats.num_channels != NUM_RGB_CHANNELS:
+            return None
+        return np.hstack([np.eye(NUM_RGB_CHANNELS), params["shift"][:, None]])
+
     def get_params(self) -> dict[str, Any]:
         return {
             "shift": np.array(
@@ -2301,6 +2309,8 @@ class RandomBrightnessContrast(ImageOnlyTransform):
         - Contrast: https://en.wikipedia.org/wiki/Contrast_(vision)
     """
 
+    _linear_color = True
+
     class InitSchema(BaseTransformInitSchema):
         brightness_limit: SymmetricRangeType
         contrast_limit: SymmetricRangeType
@@ -2322,6 +2332,13 @@ class RandomBrightnessContrast(ImageOnlyTransform):
     def apply(self, img: np.ndarray, alpha: float, beta: float, **params: Any) -> np.ndarray:
         return fmain.brightness_contrast_adjust(img, alpha, beta, self.brightness_by_max)
 
+    def get_color_matrix(self, params: dict[str, Any], stats: ColorStats) -> np.ndarray:
+        if self.brightness_by_max:
+            value = params["beta"] * MAX_VALUES_BY_DTYPE[stats.img.dtype]
+        else:
+            value = params["beta"] * stats.mean.mean()
+        return np.hstack([np.eye(stats.num_channels) * params["alpha"], np.full((stats.num_channels, 1), value)])
+
     def get_params(self) -> dict[str, float]:
         return {
             "alpha": 1.0 + random.uniform(*self.contrast_limit),
@@ -2619,6 +2636,8 @@ class ChannelShuffle(ImageOnlyTransform):
 
     """
 
+    _linear_color = True
+
     def apply(self, img: np.ndarray, channels_shuffled: tuple[int, ...], **params: Any) -> np.ndarray:
         return fmain.channel_shuffle(img, channels_shuffled)
 
@@ -2627,6 +2646,9 @@ class ChannelShuffle(ImageOnlyTransform):
         ch_arr = random_utils.shuffle(ch_arr)
         return {"channels_shuffled": ch_arr}
 
+    def get_color_matrix(self, params: dict[str, Any], stats: ColorStats) -> np.ndarray:
+        return np.eye(stats.num_channels, stats.num_channels + 1)[params["channels_shuffled"]]
+
     def get_transform_init_args_names(self) -> tuple[()]:
         return ()
 
@@ -2795,6 +2817,8 @@ class ToGray(ImageOnlyTransform):
         np.ndarray: Grayscale image with the specified number of channels.
     """
 
+    _linear_color = True
+
     class InitSchema(BaseTransformInitSchema):
         num_output_channels: int = Field(default=3, description="The number of output channels.", ge=1)
         method: Literal["weighted_average", "from_lab", "desaturation", "average", "max", "pca"]
@@ -2823,6 +2847,18 @@ class ToGray(ImageOnlyTransform):
 
         return fmain.to_gray(img, self.num_output_channels, self.method)
 
+    def get_color_matrix(self, params: dict[str, Any], stats: ColorStats) -> np.ndarray | None:
+        num_channels = stats.num_channels
+        if num_channels == 1 or self.num_output_channels != num_channels:
+            return None
+        if self.method == "weighted_average" and num_channels == NUM_RGB_CHANNELS:
+            weights = fmain.RGB_TO_GRAY_WEIGHTS
+        elif self.method == "average":
+            weights = np.full(num_channels, 1 / num_channels)
+        else:
+            return None
+        return np.hstack([np.tile(weights, (num_channels, 1)), np.zeros((num_channels, 1))])
+
     def get_transform_init_args_names(self) -> tuple[str, ...]:
         return "num_output_channels", "method"
 
@@ -2872,6 +2908,8 @@ class ToSepia(ImageOnlyTransform):
 
     """
 
+    _linear_color = True
+
     def __init__(self, p: float = 0.5, always_apply: bool | None = None):
         super().__init__(p, always_apply)
         self.sepia_transformation_matrix = np.array(
@@ -2884,6 +2922,11 @@ class ToSepia(ImageOnlyTransform):
             raise TypeError(msg)
         return fmain.linear_transformation_rgb(img, self.sepia_transformation_matrix)
 
+    def get_color_matrix(self, params: dict[str, Any], stats: ColorStats) -> np.ndarray | None:
+        if stats.num_channels != NUM_RGB_CHANNELS:
+            return None
+        return np.hstack([self.sepia_transformation_matrix, np.zeros((NUM_RGB_CHANNELS, 1))])
+
     def get_transform_init_args_names(self) -> tuple[()]:
         return ()
 
@@ -3395,6 +3438,8 @@ class FancyPCA(ImageOnlyTransform):
 
     """
 
+    _linear_color = True
+
     class InitSchema(BaseTransformInitSchema):
         alpha: float = Field(ge=0)
 
@@ -3411,6 +3456,15 @@ class FancyPCA(ImageOnlyTransform):
         alpha_vector = random_utils.normal(0, self.alpha, num_channels).astype(np.float32)
         return {"alpha_vector": alpha_vector}
 
+    def get_color_matrix(self, params: dict[str, Any], stats: ColorStats) -> np.ndarray:
+        return fmain.get_fancy_pca_matrix(
+            stats.mean,
+            stats.cov,
+            params["alpha_vector"],
+            stats.num_pixels,
+            MAX_VALUES_BY_DTYPE[stats.img.dtype],
+        )
+
     def get_transform_init_args_names(self) -> tuple[str]:
         return ("alpha",)
 
@@ -3485,6 +3539,8 @@ class ColorJitter(ImageOnlyTransform):
         - https://docs.opencv.org/3.4/de/d25/imgproc_color_conversions.html
     """
 
+    _linear_color = True
+
     class InitSchema(BaseTransformInitSchema):
         brightness: ScaleFloatType
         contrast: ScaleFloatType
@@ -3575,6 +3631,17 @@ class ColorJitter(ImageOnlyTransform):
             img = self.transforms[i](img, color_transforms[i])
         return img
 
+    def get_color_matrix(self, params: dict[str, Any], stats: ColorStats) -> np.ndarray | None:
+        if stats.num_channels not in {1, NUM_RGB_CHANNELS} or (params["hue"] != 0 and stats.num_channels != 1):
+            return None
+        return fmain.get_color_jitter_matrix(
+            stats.mean,
+            params["brightness"],
+            params["contrast"],
+            params["saturation"],
+            params["order"],
+        )
+
     def get_transform_init_args_names(self) -> tuple[str, str, str, str]:
         return "brightness", "contrast", "saturation", "hue"
 
@@ -4709,6 +4776,7 @@ class Morphological(DualTransform):
             "image": self.apply,
             "mask": self.apply_to_mask,
             "masks": self.apply_to_masks,
+            "instance_masks": self.apply_to_instance_masks,
         }
 
 
@@ -4807,6 +4875,8 @@ class PlanckianJitter(ImageOnlyTransform):
         - Implementation inspired by: https://github.com/TheZino/PlanckianJitter
     """
 
+    _linear_color = True
+
     class InitSchema(BaseTransformInitSchema):
         mode: PlanckianJitterMode
         temperature_limit: Annotated[tuple[int, int], AfterValidator(nondecreasing)] | None
@@ -4857,6 +4927,12 @@ class PlanckianJitter(ImageOnlyTransform):
             raise TypeError("PlanckianJitter transformation expects 3-channel images.")
         return fmain.planckian_jitter(img, temperature, mode=self.mode)
 
+    def get_color_matrix(self, params: dict[str, Any], stats: ColorStats) -> np.ndarray | None:
+        if stats.num_channels != NUM_RGB_CHANNELS:
+            return None
+        coeffs = fmain.get_planckian_coeffs(params["temperature"], self.mode)
+        return np.hstack([np.diag([coeffs[0] / coeffs[1], 1, coeffs[2] / coeffs[1]]), np.zeros((NUM_RGB_CHANNELS, 1))])
+
     def get_params(self) -> dict[str, Any]:
         sampling_prob_boundary = PLANKIAN_JITTER_CONST["SAMPLING_TEMP_PROB"]
         sampling_temp_boundary = PLANKIAN_JITTER_CONST["WHITE_TEMP"]
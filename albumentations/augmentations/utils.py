@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import functools
+import hashlib
+import math
 from functools import wraps
-from typing import TYPE_CHECKING, Any, Callable, TypeVar, cast
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Sequence, TypeVar, cast
 
 import cv2
 import numpy as np
 from albucore.utils import (
+    get_num_channels,
     is_grayscale_image,
     is_multispectral_image,
     is_rgb_image,
@@ -18,13 +21,20 @@ from albumentations.core.keypoints_utils import angle_to_2pi_range
 if TYPE_CHECKING:
     from pathlib import Path
 
+    from albumentations.core.composition import TransformType
+
 
 __all__ = [
     "read_bgr_image",
     "read_rgb_image",
     "read_grayscale",
+    "read_jpeg_shape",
+    "get_decode_reduction",
+    "read_reduced_rgb_image",
+    "read_reduced_grayscale",
     "angle_2pi_range",
     "non_rgb_error",
+    "hash_arrays",
 ]
 
 P = ParamSpec("P")
@@ -32,17 +42,141 @@ T = TypeVar("T", bound=np.ndarray)
 F = TypeVar("F", bound=Callable[..., Any])
 
 
-def read_bgr_image(path: str | Path) -> np.ndarray:
-    return cv2.imread(str(path), cv2.IMREAD_COLOR)
+DECODE_REDUCTIONS = (8, 4, 2)
+REDUCED_COLOR_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+REDUCED_GRAYSCALE_FLAGS = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+JPEG_SOI = b"\xff\xd8"
+JPEG_MARKER_PREFIX = 0xFF
+JPEG_MARKER_SIZE = 2
+# Start of frame markers of baseline, progressive, lossless and arithmetic coded JPEG images
+JPEG_SOF_MARKERS = frozenset({0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF})
+JPEG_STANDALONE_MARKERS = frozenset({0x01, *range(0xD0, 0xD8)})
+
+
+def read_bgr_image(path: str | Path, reduction: int = 1) -> np.ndarray:
+    """Read a color image in BGR order.
 
+    Args:
+        path: Path to the image.
+        reduction: Factor of 1, 2, 4 or 8 to downscale the image by while decoding. JPEG images are decoded
+            directly at the reduced resolution, which is several times faster than a full decode.
+
+    """
+    return cv2.imread(str(path), REDUCED_COLOR_FLAGS[reduction])
 
-def read_rgb_image(path: str | Path) -> np.ndarray:
-    image = read_bgr_image(path)
-    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
 
+def read_rgb_image(path: str | Path, reduction: int = 1) -> np.ndarray:
+    image = read_bgr_image(path, reduction)
+    # Convert in place to avoid a second copy of the decoded image
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image)
 
-def read_grayscale(path: str | Path) -> np.ndarray:
-    return cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+
+def read_grayscale(path: str | Path, reduction: int = 1) -> np.ndarray:
+    return cv2.imread(str(path), REDUCED_GRAYSCALE_FLAGS[reduction])
+
+
+def read_jpeg_shape(path: str | Path) -> tuple[int, int] | None:
+    """Read height and width of a JPEG image from its header without decoding it.
+
+    Returns None if the file is not a JPEG image.
+    """
+    with open(path, "rb") as file:
+        if file.read(2) != JPEG_SOI:
+            return None
+
+        while True:
+            marker = file.read(JPEG_MARKER_SIZE)
+            if len(marker) < JPEG_MARKER_SIZE or marker[0] != JPEG_MARKER_PREFIX:
+                return None
+            if marker[1] == JPEG_MARKER_PREFIX:  # fill byte
+                file.seek(-1, 1)
+                continue
+            if marker[1] in JPEG_STANDALONE_MARKERS:
+                continue
+
+            length = int.from_bytes(file.read(2), "big")
+            if marker[1] in JPEG_SOF_MARKERS:
+                header = file.read(5)
+                return int.from_bytes(header[1:3], "big"), int.from_bytes(header[3:5], "big")
+            file.seek(length - JPEG_MARKER_SIZE, 1)
+
+
+def get_decode_reduction(transforms: TransformType | Sequence[TransformType], image_shape: tuple[int, int]) -> int:
+    """Get the largest JPEG decode reduction after which the pipeline still only downscales the image.
+
+    The first transform of the pipeline is inspected. If it is always applied and only reduces the image to a
+    known size, that is `LongestMaxSize`, `SmallestMaxSize`, `Resize` or `RandomResizedCrop`, the image can be
+    decoded at 1/2, 1/4 or 1/8 of its resolution as long as the target size is still met. The pipeline produces
+    images of the same size from such a reduced image, while decoding is several times faster.
+
+    Bounding boxes and keypoints in absolute coordinates have to be scaled by the user accordingly.
+    Both orientations of the image are checked, so that EXIF rotation applied by OpenCV does not matter.
+
+    Args:
+        transforms: Pipeline that will be applied to the image.
+        image_shape: Height and width of the image at full resolution, e.g. from `read_jpeg_shape`.
+
+    Returns:
+        int: Reduction of 1, 2, 4 or 8 that can be passed to `read_rgb_image` and other readers.
+
+    """
+    from albumentations.augmentations.crops.transforms import RandomResizedCrop
+    from albumentations.augmentations.geometric.resize import LongestMaxSize, Resize, SmallestMaxSize
+    from albumentations.core.composition import BaseCompose, Compose, Sequential
+
+    while isinstance(transforms, (Compose, Sequential, Sequence)) and len(transforms):
+        if isinstance(transforms, BaseCompose) and transforms.p < 1:
+            return 1
+        transforms = transforms[0]
+    if getattr(transforms, "p", 0) < 1:
+        return 1
+
+    height, width = image_shape
+    if isinstance(transforms, (LongestMaxSize, SmallestMaxSize)):
+        max_sizes = [transforms.max_size] if isinstance(transforms.max_size, int) else transforms.max_size
+        side = max(height, width) if isinstance(transforms, LongestMaxSize) else min(height, width)
+        min_sizes = (side, side)
+        target_size = (max(max_sizes), max(max_sizes))
+    elif isinstance(transforms, Resize):
+        min_sizes = (min(height, width), min(height, width))
+        target_size = (max(transforms.height, transforms.width), max(transforms.height, transforms.width))
+    elif isinstance(transforms, RandomResizedCrop):
+        # The smallest crop is sampled with the smallest area and the most extreme aspect ratios
+        min_area = transforms.scale[0] * height * width
+        min_sizes = (math.sqrt(min_area / transforms.ratio[1]), math.sqrt(min_area * transforms.ratio[0]))
+        target_size = transforms.size
+    else:
+        return 1
+
+    for reduction in DECODE_REDUCTIONS:
+        if all(size / reduction >= target for size, target in zip(min_sizes, target_size)):
+            return reduction
+    return 1
+
+
+def read_reduced_rgb_image(path: str | Path, transforms: TransformType | Sequence[TransformType]) -> np.ndarray:
+    """Read an RGB image at the lowest resolution that still meets the first size-reducing transform."""
+    image_shape = read_jpeg_shape(path)
+    reduction = 1 if image_shape is None else get_decode_reduction(transforms, image_shape)
+    return read_rgb_image(path, reduction)
+
+
+def read_reduced_grayscale(path: str | Path, transforms: TransformType | Sequence[TransformType]) -> np.ndarray:
+    """Read a grayscale image at the lowest resolution that still meets the first size-reducing transform."""
+    image_shape = read_jpeg_shape(path)
+    reduction = 1 if image_shape is None else get_decode_reduction(transforms, image_shape)
+    return read_grayscale(path, reduction)
 
 
 def angle_2pi_range(
@@ -172,6 +306,57 @@ class PCA:
         return np.cumsum(self.explained_variance_ratio())
 
 
+class ColorStats:
+    """Channel statistics of an image after an affine map of its channel values.
+
+    The mean and the covariance of the image are computed once, when they are first needed, and are then mapped
+    through `matrix` analytically, so that transforms whose color matrices depend on the image get the statistics
+    of the image they would have been applied to.
+
+    Args:
+        img (np.ndarray): Image the statistics are computed from.
+
+    """
+
+    def __init__(self, img: np.ndarray) -> None:
+        self.img = img
+        self.num_channels = get_num_channels(img)
+        # (C, C + 1) affine map from the channel values of `img` to the ones the statistics describe
+        self.matrix = np.eye(self.num_channels, self.num_channels + 1)
+        self._mean: np.ndarray | None = None
+        self._cov: np.ndarray | None = None
+
+    @property
+    def num_pixels(self) -> int:
+        return self.img.shape[0] * self.img.shape[1]
+
+    @property
+    def mean(self) -> np.ndarray:
+        """Per-channel mean of the mapped image."""
+        if self._mean is None:
+            self._mean = self.img.reshape(-1, self.num_channels).mean(axis=0, dtype=np.float64)
+        return self.matrix[:, :-1] @ self._mean + self.matrix[:, -1]
+
+    @property
+    def cov(self) -> np.ndarray:
+        """Population covariance matrix of the channels of the mapped image."""
+        if self._cov is None:
+            pixels = self.img.reshape(-1, self.num_channels)
+            self._cov = np.atleast_2d(np.cov(pixels, rowvar=False, ddof=0))
+        linear_part = self.matrix[:, :-1]
+        return linear_part @ self._cov @ linear_part.T
+
+
+def hash_arrays(arrays: Iterable[np.ndarray]) -> bytes:
+    """Return a SHA-256 digest of the shapes, data types and contents of arrays, e.g. to key caches of masks."""
+    digest = hashlib.sha256()
+    for array in arrays:
+        contiguous_array = np.ascontiguousarray(array)
+        digest.update(f"{contiguous_array.shape}{contiguous_array.dtype}".encode())
+        digest.update(contiguous_array.data)
+    return digest.digest()
+
+
 def handle_empty_array(func: F) -> F:
     @functools.wraps(func)
     def wrapper(array: T, *args: Any, **kwargs: Any) -> Any:
@@ -9,9 +9,15 @@ import cv2
 import numpy as np
 
 from albumentations import random_utils
+from albumentations.augmentations import functional as fmain
+from albumentations.augmentations.geometric import functional as fgeometric
+from albumentations.augmentations.geometric.transforms import D4
+from albumentations.augmentations.utils import ColorStats
 
 from .bbox_utils import BboxParams, BboxProcessor
 from .hub_mixin import HubMixin
+from .image_source import ImageSource
+from .instance_masks import InstanceMasks
 from .keypoints_utils import KeypointParams, KeypointsProcessor
 from .serialization import (
     SERIALIZABLE_REGISTRY,
@@ -19,7 +25,8 @@ from .serialization import (
     get_shortest_class_fullname,
     instantiate_nonserializable,
 )
-from .transforms_interface import BasicTransform
+from .transforms_interface import BasicTransform, read_image_sources
+from .types import D4Type
 from .utils import DataProcessor, format_args, get_shape
 
 __all__ = [
@@ -43,15 +50,17 @@ REPR_INDENT_STEP = 2
 TransformType = Union[BasicTransform, "BaseCompose"]
 TransformsSeqType = List[TransformType]
 
-AVAILABLE_KEYS = ("image", "mask", "masks", "bboxes", "keypoints", "global_label")
+AVAILABLE_KEYS = ("image", "mask", "masks", "instance_masks", "bboxes", "keypoints", "global_label")
 MASK_KEYS = (
     "mask",
     "masks",
+    "instance_masks",
 )
 # Keys related to image data
 IMAGE_KEYS = ("image", "images")
 CHECKED_SINGLE = ("image", "mask")
 CHECKED_MULTI = ("masks", "images")
+CHECKED_INSTANCE_MASKS = ("instance_masks",)
 CHECK_BBOX_PARAM = ("bboxes",)
 CHECK_KEYPOINTS_PARAM = ("keypoints",)
 
@@ -241,6 +250,11 @@ class Compose(BaseCompose, HubMixin):
         strict (bool): If True, unknown keys will raise an error. If False, unknown keys will be ignored. Default: True.
         return_params (bool): if True returns params of each applied transform
         save_key (str): key to save applied params, default is 'applied_params'
+        fuse_color (bool): If True, consecutive transforms that map the channel values of every pixel with
+            an affine map, like `RandomBrightnessContrast`, `RGBShift`, `ToSepia` or `ColorJitter` without hue,
+            are applied to the image as a single matrix. Values are rounded and clipped once instead of after
+            every transform, so results differ from the step by step ones where intermediate values saturate.
+            Only used if `image` is the only image target. Default: False.
 
     """
 
@@ -255,8 +269,11 @@ class Compose(BaseCompose, HubMixin):
         strict: bool = True,
         return_params: bool = False,
         save_key: str = "applied_params",
+        fuse_color: bool = False,
     ):
         super().__init__(transforms, p)
+        self._d4 = D4(p=1)
+        self.fuse_color = fuse_color
 
         if bbox_params:
             if isinstance(bbox_params, dict):
@@ -333,12 +350,78 @@ class Compose(BaseCompose, HubMixin):
 
         self.preprocess(data)
 
+        # Consecutive flips, transposes and rotations by 90 degrees are merged into a single D4 group element
+        # that is applied once, before the next transform or at the end of the pipeline
+        merge_d4 = self._can_merge_d4(data)
+        group_element: D4Type = "e"
+        # Consecutive affine maps of channel values are multiplied into a single color matrix in the same way.
+        # They commute with D4 elements, and `color_stats` follows the image the next matrix is applied to
+        fuse_color = self._can_fuse_color(data)
+        color_stats: ColorStats | None = None
         for t in self.transforms:
-            data = t(**data)
+            sampled_element = t.sample_d4_group_element(data) if merge_d4 and isinstance(t, BasicTransform) else None
+            if sampled_element is not None:
+                group_element = fgeometric.compose_d4(group_element, sampled_element)
+                continue
+
+            sampled_color = None
+            if fuse_color and isinstance(t, BasicTransform):
+                if color_stats is None:
+                    color_stats = ColorStats(data["image"])
+                sampled_color = t.sample_color_matrix(data, color_stats)
+            if sampled_color is not None and sampled_color[1] is not None:
+                color_stats = cast(ColorStats, color_stats)
+                color_stats.matrix = fmain.compose_color_matrices(sampled_color[1], color_stats.matrix)
+                continue
+
+            data = self._apply_d4(group_element, data)
+            group_element = "e"
+            data = self._apply_color_matrix(color_stats, data)
+            color_stats = None
+
+            data = t(**data) if sampled_color is None else t.apply_with_params(sampled_color[0], **data)
             data = self.check_data_post_transform(data)
 
+        data = self._apply_d4(group_element, data)
+        data = self._apply_color_matrix(color_stats, data)
+
         return self.postprocess(data)
 
+    def _can_merge_d4(self, data: dict[str, Any]) -> bool:
+        # Keypoint angles updated by a merged element may differ by pi from the ones updated step by step,
+        # because `keypoints_transpose` does not reflect angles above pi over the diagonal
+        return not any(
+            data_name == "keypoints" or self._additional_targets.get(data_name) == "keypoints" for data_name in data
+        )
+
+    def _can_fuse_color(self, data: dict[str, Any]) -> bool:
+        # Matrices of transforms like `RandomBrightnessContrast` depend on statistics of the image they are applied
+        # to, so they are only fused if there is a single image
+        return (
+            self.fuse_color
+            and isinstance(data.get("image"), np.ndarray)
+            and not any(
+                data_name == "images" or self._additional_targets.get(data_name) in {"image", "images"}
+                for data_name in data
+            )
+        )
+
+    def _apply_color_matrix(self, color_stats: ColorStats | None, data: dict[str, Any]) -> dict[str, Any]:
+        if color_stats is None or np.array_equal(color_stats.matrix, np.eye(*color_stats.matrix.shape)):
+            return data
+
+        data["image"] = fmain.apply_color_matrix(data["image"], color_stats.matrix)
+        return data
+
+    def _apply_d4(self, group_element: D4Type, data: dict[str, Any]) -> dict[str, Any]:
+        if group_element == "e":
+            return data
+
+        self._d4.add_targets(self._additional_targets)
+        params = self._d4.update_params_shape(params={"group_element": group_element}, data=data)
+        data = self._d4.apply_with_params(params, **data)
+        return self.check_data_post_transform(data)
+
     def run_with_params(self, *, params: dict[int, dict[str, Any]], **data: Any) -> dict[str, Any]:
         """Run transforms with given parameters. Available only for Compose with `return_params=True`."""
         if self._transforms_dict is None:
@@ -371,6 +454,7 @@ class Compose(BaseCompose, HubMixin):
         if self.main_compose:
             for p in self.processors.values():
                 p.postprocess(data)
+            data = read_image_sources(data)
         return data
 
     def to_dict_private(self) -> dict[str, Any]:
@@ -383,6 +467,7 @@ class Compose(BaseCompose, HubMixin):
                 "keypoint_params": (keypoints_processor.params.to_dict_private() if keypoints_processor else None),
                 "additional_targets": self.additional_targets,
                 "is_check_shapes": self.is_check_shapes,
+                "fuse_color": self.fuse_color,
             },
         )
         return dictionary
@@ -402,19 +487,32 @@ class Compose(BaseCompose, HubMixin):
         )
         return dictionary
 
+    @staticmethod
+    def _get_checked_shape(data_name: str, internal_data_name: str, data: Any) -> tuple[int, int] | None:
+        if internal_data_name in CHECKED_SINGLE:
+            if not isinstance(data, np.ndarray) and not (
+                internal_data_name == "image" and isinstance(data, ImageSource)
+            ):
+                raise TypeError(f"{data_name} must be numpy array type")
+            return data.shape[:2]
+        if internal_data_name in CHECKED_MULTI and data is not None and len(data):
+            if not isinstance(data, Sequence) or not isinstance(data[0], np.ndarray):
+                raise TypeError(f"{data_name} must be list of numpy arrays")
+            return data[0].shape[:2]
+        if internal_data_name in CHECKED_INSTANCE_MASKS:
+            if not isinstance(data, InstanceMasks):
+                raise TypeError(f"{data_name} must be InstanceMasks type")
+            return data.shape
+        return None
+
     def _check_args(self, **kwargs: Any) -> None:
         shapes = []
 
         for data_name, data in kwargs.items():
             internal_data_name = self._additional_targets.get(data_name, data_name)
-            if internal_data_name in CHECKED_SINGLE:
-                if not isinstance(data, np.ndarray):
-                    raise TypeError(f"{data_name} must be numpy array type")
-                shapes.append(data.shape[:2])
-            if internal_data_name in CHECKED_MULTI and data is not None and len(data):
-                if not isinstance(data, Sequence) or not isinstance(data[0], np.ndarray):
-                    raise TypeError(f"{data_name} must be list of numpy arrays")
-                shapes.append(data[0].shape[:2])
+            shape = self._get_checked_shape(data_name, internal_data_name, data)
+            if shape is not None:
+                shapes.append(shape)
             if internal_data_name in CHECK_BBOX_PARAM and self.processors.get("bboxes") is None:
                 msg = "bbox_params must be specified for bbox transformations"
                 raise ValueError(msg)
@@ -670,6 +768,8 @@ class ReplayCompose(Compose):
 
     def to_dict_private(self) -> dict[str, Any]:
         dictionary = super().to_dict_private()
+        # Replayed transforms are applied one by one, so their colors are never fused
+        del dictionary["fuse_color"]
         dictionary.update({"save_key": self.save_key})
         return dictionary
 
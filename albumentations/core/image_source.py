@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable
+
+import cv2
+import numpy as np
+
+__all__ = ["ImageSource"]
+
+RegionReader = Callable[[int, int, int, int], np.ndarray]
+
+
+class ImageSource:
+    """Image of known shape that is read lazily, region by region.
+
+    Pass it to a pipeline as the `image` target instead of a decoded array. Crop transforms compute their
+    coordinates from the shape alone and read only the region they keep, so a pipeline that starts with
+    `RandomCrop`, `CenterCrop`, `Crop`, `RandomResizedCrop` or `RandomSizedBBoxSafeCrop` never holds the
+    whole image in memory. Any other transform reads the whole image first.
+
+    Args:
+        read_region (Callable): Function `read_region(x_min, y_min, x_max, y_max)` that returns the region
+            of the image with `x_max` and `y_max` being exclusive.
+        shape (tuple[int, ...]): Shape of the image, (height, width) or (height, width, num_channels).
+        dtype (np.dtype): Data type of the image. Default: np.uint8.
+
+    Example:
+        >>> source = A.ImageSource.from_file("huge.npy")
+        >>> transform = A.Compose([A.RandomCrop(512, 512), A.HorizontalFlip()])
+        >>> crop = transform(image=source)["image"]
+
+    """
+
+    def __init__(self, read_region: RegionReader, shape: tuple[int, ...], dtype: np.dtype | type = np.uint8):
+        self._read_region = read_region
+        self.shape = tuple(int(size) for size in shape)
+        self.dtype = np.dtype(dtype)
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> ImageSource:
+        """Create a source from an array whose regions are cheap to read, e.g. an `np.memmap`."""
+
+        def read_region(x_min: int, y_min: int, x_max: int, y_max: int) -> np.ndarray:
+            return np.array(array[y_min:y_max, x_min:x_max])
+
+        return cls(read_region, array.shape, array.dtype)
+
+    @classmethod
+    def from_file(
+        cls,
+        path: str | Path,
+        shape: tuple[int, ...] | None = None,
+        read_fn: Callable[[str | Path], np.ndarray] | None = None,
+    ) -> ImageSource:
+        """Create a source from a file.
+
+        `.npy` files are memory-mapped, so that only the requested regions are read from disk. Other files are
+        decoded with `read_fn`, `read_rgb_image` by default, on the first read, which requires their `shape`
+        to be known up front.
+        """
+        if Path(path).suffix == ".npy":
+            return cls.from_array(np.load(path, mmap_mode="r"))
+
+        if shape is None:
+            msg = "shape is required to read regions of encoded images lazily."
+            raise ValueError(msg)
+        if read_fn is None:
+            from albumentations.augmentations.utils import read_rgb_image
+
+            read_fn = read_rgb_image
+        return cls(_decode_once(lambda: read_fn(path), shape), shape)
+
+    @classmethod
+    def from_bytes(cls, buffer: bytes, shape: tuple[int, ...]) -> ImageSource:
+        """Create a source from an encoded RGB image, decoded on the first read."""
+
+        def decode() -> np.ndarray:
+            image = cv2.imdecode(np.frombuffer(buffer, dtype=np.uint8), cv2.IMREAD_COLOR)
+            return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+        return cls(_decode_once(decode, shape), shape)
+
+    @property
+    def height(self) -> int:
+        return self.shape[0]
+
+    @property
+    def width(self) -> int:
+        return self.shape[1]
+
+    def read_region(self, x_min: int, y_min: int, x_max: int, y_max: int) -> np.ndarray:
+        """Read the region of the image with `x_max` and `y_max` being exclusive."""
+        x_min, y_min = max(0, x_min), max(0, y_min)
+        x_max, y_max = min(self.width, x_max), min(self.height, y_max)
+        return self._read_region(x_min, y_min, x_max, y_max)
+
+    def read(self) -> np.ndarray:
+        """Read the whole image."""
+        return self.read_region(0, 0, self.width, self.height)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(shape={self.shape}, dtype={self.dtype})"
+
+
+def _decode_once(decode: Callable[[], np.ndarray], shape: tuple[int, ...]) -> RegionReader:
+    decoded: list[np.ndarray] = []
+
+    def read_region(x_min: int, y_min: int, x_max: int, y_max: int) -> np.ndarray:
+        if not decoded:
+            image = decode()
+            if image is None or image.shape[:2] != tuple(shape[:2]):
+                msg = f"Decoded image of shape {None if image is None else image.shape} does not match {shape}."
+                raise ValueError(msg)
+            decoded.append(image)
+        return decoded[0][y_min:y_max, x_min:x_max]
+
+    return read_region
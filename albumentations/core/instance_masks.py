@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+__all__ = ["InstanceMasks"]
+
+NUM_BBOX_COORDINATES = 4
+
+
+class InstanceMasks:
+    """Sparse container for instance segmentation masks.
+
+    Every instance is stored as a tight crop of its mask together with the bounding box of that crop
+    in the image. Instance masks are usually tiny compared to the full frame, so storing only the
+    region of interest saves both memory and time: crops drop and clip instances by their bounding
+    boxes, flips permute the small crops, and warps process only the region of every instance.
+
+    Pass it to a pipeline as the `instance_masks` target. Transforms without a dedicated sparse
+    implementation materialize dense masks, apply `apply_to_masks` and convert the result back.
+
+    Args:
+        masks (Sequence[np.ndarray]): 2D arrays of shape (y_max - y_min, x_max - x_min), one per instance.
+        bboxes (np.ndarray): Integer array of shape (num_instances, 4) with [x_min, y_min, x_max, y_max]
+            of every mask in pixels, `x_max` and `y_max` being exclusive.
+        shape (tuple[int, int]): Height and width of the image the masks belong to.
+        ids (np.ndarray | None): Identifiers of the instances, preserved by transforms so that instances
+            dropped by crops can be matched with their labels. Default: `np.arange(num_instances)`.
+
+    Example:
+        >>> masks = np.zeros((2, 100, 100), dtype=np.uint8)
+        >>> masks[0, 10:20, 30:35] = 1
+        >>> masks[1, 50:60, 50:70] = 1
+        >>> instance_masks = InstanceMasks.from_dense(masks)
+        >>> instance_masks.bboxes
+        array([[30, 10, 35, 20],
+               [50, 50, 70, 60]], dtype=int32)
+        >>> transform = A.Compose([A.RandomCrop(64, 64), A.HorizontalFlip()])
+        >>> result = transform(image=image, instance_masks=instance_masks)
+        >>> dense_masks = result["instance_masks"].to_dense()
+
+    """
+
+    def __init__(
+        self,
+        masks: Sequence[np.ndarray],
+        bboxes: np.ndarray,
+        shape: tuple[int, int],
+        ids: np.ndarray | None = None,
+    ):
+        self.masks = list(masks)
+        self.bboxes = np.asarray(bboxes, dtype=np.int32).reshape(-1, NUM_BBOX_COORDINATES)
+        self.shape = (int(shape[0]), int(shape[1]))
+        self.ids = np.arange(len(self.masks)) if ids is None else np.asarray(ids)
+
+        if not len(self.masks) == len(self.bboxes) == len(self.ids):
+            msg = (
+                f"Number of masks ({len(self.masks)}), bboxes ({len(self.bboxes)}) and ids ({len(self.ids)}) "
+                "should be equal."
+            )
+            raise ValueError(msg)
+
+        for mask, (x_min, y_min, x_max, y_max) in zip(self.masks, self.bboxes):
+            if mask.shape != (y_max - y_min, x_max - x_min):
+                msg = f"Mask of shape {mask.shape} does not match its bbox {[x_min, y_min, x_max, y_max]}."
+                raise ValueError(msg)
+
+    @classmethod
+    def from_dense(
+        cls,
+        masks: Sequence[np.ndarray] | np.ndarray,
+        ids: np.ndarray | None = None,
+        shape: tuple[int, int] | None = None,
+    ) -> InstanceMasks:
+        """Create instance masks from full-frame masks, dropping empty ones.
+
+        Args:
+            masks: Sequence of 2D masks of the same shape, or an array of shape (num_instances, height, width).
+            ids: Identifiers of the instances. Default: their position in `masks`.
+            shape: Height and width of the image, required only when `masks` is empty.
+
+        """
+        if shape is None:
+            if not len(masks):
+                msg = "shape is required to create InstanceMasks from an empty sequence of masks."
+                raise ValueError(msg)
+            shape = masks[0].shape[:2]
+
+        ids = np.arange(len(masks)) if ids is None else np.asarray(ids)
+        return cls.from_rois(
+            [mask.reshape(mask.shape[:2]) for mask in masks],
+            np.array([[0, 0, shape[1], shape[0]]] * len(masks), dtype=np.int32),
+            shape,
+            ids,
+        )
+
+    @classmethod
+    def from_rois(
+        cls,
+        masks: Sequence[np.ndarray],
+        offsets: np.ndarray,
+        shape: tuple[int, int],
+        ids: np.ndarray,
+    ) -> InstanceMasks:
+        """Create instance masks from loose regions, shrinking them to their non-zero pixels.
+
+        Regions are clipped to the image and instances without non-zero pixels inside the image are dropped.
+
+        Args:
+            masks: 2D masks of arbitrary sizes.
+            offsets: Array of shape (num_instances, 2+) with [x_min, y_min, ...] of every mask in the image.
+            shape: Height and width of the image.
+            ids: Identifiers of the instances.
+
+        """
+        height, width = shape[:2]
+        result_masks = []
+        result_bboxes = []
+        result_ids = []
+
+        for mask, offset, instance_id in zip(masks, offsets, ids):
+            x_offset, y_offset = int(offset[0]), int(offset[1])
+
+            # Clip the region to the image
+            x_start, y_start = max(0, -x_offset), max(0, -y_offset)
+            x_end = min(mask.shape[1], width - x_offset)
+            y_end = min(mask.shape[0], height - y_offset)
+            if x_start >= x_end or y_start >= y_end:
+                continue
+            clipped = mask[y_start:y_end, x_start:x_end]
+
+            rows = np.flatnonzero(clipped.any(axis=1))
+            if not rows.size:
+                continue
+            cols = np.flatnonzero(clipped.any(axis=0))
+
+            # Copy, so that the tight crop does not keep the whole source region alive
+            result_masks.append(clipped[rows[0] : rows[-1] + 1, cols[0] : cols[-1] + 1].copy())
+            result_bboxes.append(
+                [
+                    x_offset + x_start + cols[0],
+                    y_offset + y_start + rows[0],
+                    x_offset + x_start + cols[-1] + 1,
+                    y_offset + y_start + rows[-1] + 1,
+                ],
+            )
+            result_ids.append(instance_id)
+
+        return cls(result_masks, np.array(result_bboxes, dtype=np.int32), shape, np.array(result_ids, dtype=ids.dtype))
+
+    def to_dense(self, dtype: np.dtype | None = None) -> np.ndarray:
+        """Materialize full-frame masks as an array of shape (num_instances, height, width)."""
+        if dtype is None:
+            dtype = self.masks[0].dtype if self.masks else np.uint8
+
+        dense = np.zeros((len(self.masks), *self.shape), dtype=dtype)
+        for dense_mask, mask, (x_min, y_min, x_max, y_max) in zip(dense, self.masks, self.bboxes):
+            dense_mask[y_min:y_max, x_min:x_max] = mask
+        return dense
+
+    def __len__(self) -> int:
+        return len(self.masks)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(num_instances={len(self)}, shape={self.shape})"
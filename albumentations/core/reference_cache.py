@@ -0,0 +1,532 @@
+from __future__ import annotations
+
+import json
+import os
+import random
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Mapping,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
+
+import cv2
+import numpy as np
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+__all__ = ["ReferenceBank", "ReferenceCache", "ReferencePrefetcher", "read_fingerprints", "write_fingerprints"]
+
+ReadFn = Callable[[Any], np.ndarray]
+Fingerprint = Dict[str, np.ndarray]
+FingerprintKey = Tuple[Union[str, int], str]
+
+DEFAULT_MAX_BYTES = 256 * 2**20
+DEFAULT_PREFETCH = 16
+FINGERPRINT_ALIGNMENT = 64
+FINGERPRINT_FOOTER_DTYPE = np.dtype("<i8")
+
+
+class ReferenceCache:
+    """Least recently used cache of decoded reference images with a limit on their total size in bytes.
+
+    Transforms that read reference images, such as `HistogramMatching`, `FDA` and `PixelDistributionAdaptation`,
+    look them up here before calling their `read_fn`, so every reference is decoded once per process as long as
+    the reference set fits into `max_bytes`. One cache can be shared by several transforms, images are keyed by
+    the reference and the `read_fn` that decodes it. References that are not hashable, e.g. arrays that are
+    already decoded, bypass the cache.
+
+    Besides images, the cache keeps fingerprints of references, the statistics that transforms compute from
+    them, e.g. histograms or amplitude spectra, so that only the input image is processed on every call.
+    Fingerprints can also be precomputed for a whole reference set with `write_reference_fingerprints` and
+    loaded with `load_fingerprints`.
+
+    Cached images and fingerprints are read-only and are shared between the transforms that use them.
+
+    Args:
+        max_bytes (int): Maximum total size of the cached images. Least recently used images are evicted
+            once it is exceeded. Default: 256 MiB.
+        size (tuple[int, int] | None): If set, images are resized to (height, width) once, when they are
+            decoded, e.g. to the working resolution of the pipeline. Default: None.
+        num_workers (int): Number of threads that decode images passed to `prefetch`. Default: 1.
+
+    Example:
+        >>> cache = A.ReferenceCache(max_bytes=2**30, size=(512, 512))
+        >>> cache.prefetch(reference_paths, A.read_rgb_image, num_samples=64)
+        >>> transform = A.Compose([
+        ...     A.FDA(reference_paths, reference_cache=cache),
+        ...     A.HistogramMatching(reference_paths, reference_cache=cache),
+        ... ])
+        >>> cache.stats["hits"], cache.stats["misses"]
+
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, size: tuple[int, int] | None = None, num_workers: int = 1):
+        self.max_bytes = max_bytes
+        self.size = size
+        self.num_workers = num_workers
+        self._fingerprint_paths: list[str | Path] = []
+        self._loaded_fingerprints: dict[FingerprintKey, Fingerprint] = {}
+        self._reset()
+
+    def _reset(self) -> None:
+        self._images: OrderedDict[Hashable, np.ndarray | Fingerprint] = OrderedDict()
+        self._pending: dict[Hashable, Future[np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._random = random.Random()
+        self._pid = os.getpid()
+        self.nbytes = 0
+        self.hits = self.misses = self.prefetched = self.evictions = 0
+        self.fingerprint_hits = self.fingerprint_misses = 0
+
+    def _check_process(self) -> None:
+        # Threads do not survive a fork, a forked DataLoader worker starts with a cache of its own
+        if self._pid != os.getpid():
+            self._reset()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "prefetched": self.prefetched,
+            "evictions": self.evictions,
+            "fingerprint_hits": self.fingerprint_hits,
+            "fingerprint_misses": self.fingerprint_misses,
+            "num_images": len(self._images),
+            "nbytes": self.nbytes,
+        }
+
+    def get(self, reference: Any, read_fn: ReadFn) -> np.ndarray:
+        """Return the decoded `reference`, reading it with `read_fn` if it is not cached."""
+        key = _get_key(reference, read_fn)
+        if key is None:
+            return self._decode(reference, read_fn)
+
+        self._check_process()
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return cast(np.ndarray, image)
+            pending = self._pending.get(key)
+
+        if pending is not None:
+            self.hits += 1
+            return pending.result()
+
+        self.misses += 1
+        image = self._decode(reference, read_fn)
+        self._store(key, image)
+        return image
+
+    def get_fingerprint(
+        self,
+        reference: Any,
+        read_fn: ReadFn,
+        name: str,
+        compute: Callable[[np.ndarray], Fingerprint],
+    ) -> Fingerprint:
+        """Return the fingerprint `name` of `reference`, computing it with `compute` from the decoded reference.
+
+        Fingerprints loaded with `load_fingerprints` are looked up first. The decoded reference is not cached
+        when the fingerprint is computed, as the fingerprint replaces it.
+        """
+        key = _get_key(reference, read_fn)
+        if key is None:
+            return compute(self._decode(reference, read_fn))
+
+        self._check_process()
+        if isinstance(reference, (str, os.PathLike, int)):
+            loaded = self._loaded_fingerprints.get((_get_file_key(reference), name))
+            if loaded is not None:
+                self.fingerprint_hits += 1
+                return loaded
+
+        fingerprint_key = (*key, name)
+        with self._lock:
+            fingerprint = self._images.get(fingerprint_key)
+            if fingerprint is not None:
+                self._images.move_to_end(fingerprint_key)
+                self.fingerprint_hits += 1
+                return cast(Fingerprint, fingerprint)
+            image = self._images.get(key)
+
+        self.fingerprint_misses += 1
+        fingerprint = compute(self._decode(reference, read_fn) if image is None else cast(np.ndarray, image))
+        self._store(fingerprint_key, fingerprint)
+        return fingerprint
+
+    def load_fingerprints(self, path: str | Path) -> None:
+        """Load fingerprints written by `write_fingerprints`, the file is memory-mapped and not copied."""
+        self._loaded_fingerprints.update(read_fingerprints(path))
+        self._fingerprint_paths.append(path)
+
+    def prefetch(self, references: Sequence[Any], read_fn: ReadFn, num_samples: int | None = None) -> None:
+        """Decode references in the background.
+
+        Args:
+            references: References to decode.
+            read_fn: Function that decodes a reference.
+            num_samples: If set, only this number of randomly drawn references is decoded, which keeps a pool
+                of references warm when the whole set does not fit into the cache. The draw does not affect
+                the global random state.
+
+        """
+        self._check_process()
+        if num_samples is not None:
+            references = self._random.sample(list(references), min(num_samples, len(references)))
+
+        for reference in references:
+            key = _get_key(reference, read_fn)
+            if key is None:
+                continue
+            with self._lock:
+                if key in self._images or key in self._pending:
+                    continue
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.num_workers, thread_name_prefix="albumentations-reference")
+                future = self._executor.submit(self._decode, reference, read_fn)
+                self._pending[key] = future
+            future.add_done_callback(lambda future, key=key: self._store_prefetched(key, future))
+
+    def clear(self) -> None:
+        """Drop all cached images and reset the statistics."""
+        executor = self._executor
+        self._reset()
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _decode(self, reference: Any, read_fn: ReadFn) -> np.ndarray:
+        image = read_fn(reference)
+        if self.size is not None and image.shape[:2] != tuple(self.size):
+            image = cv2.resize(image, self.size[::-1], interpolation=cv2.INTER_AREA)
+        return image
+
+    def _store_prefetched(self, key: Hashable, future: Future[np.ndarray]) -> None:
+        with self._lock:
+            self._pending.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            self.prefetched += 1
+            self._store(key, future.result())
+
+    def _store(self, key: Hashable, value: np.ndarray | Fingerprint) -> None:
+        arrays = list(value.values()) if isinstance(value, dict) else [value]
+        nbytes = sum(array.nbytes for array in arrays)
+        if nbytes > self.max_bytes:
+            return
+        for array in arrays:
+            array.flags.writeable = False
+
+        with self._lock:
+            if key in self._images:
+                return
+            self._images[key] = value
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._images.popitem(last=False)
+                self.nbytes -= sum(
+                    array.nbytes for array in (evicted.values() if isinstance(evicted, dict) else [evicted])
+                )
+                self.evictions += 1
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Pickled into DataLoader workers without its images, every worker fills a cache of its own
+        # Loaded fingerprints are pickled by the paths of their files
+        return {
+            "max_bytes": self.max_bytes,
+            "size": self.size,
+            "num_workers": self.num_workers,
+            "fingerprint_paths": self._fingerprint_paths,
+        }
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(state["max_bytes"], state["size"], state["num_workers"])  # type: ignore[misc]
+        for path in state["fingerprint_paths"]:
+            self.load_fingerprints(path)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(max_bytes={self.max_bytes}, size={self.size}, num_workers={self.num_workers})"
+        )
+
+
+class ReferencePrefetcher:
+    """Read reference data ahead of the transform that consumes it, on a thread pool.
+
+    The transform draws references as usual, but up to `prefetch` draws ahead, and `read_fn` runs on
+    `num_workers` threads, so reading and decoding are off the augmentation path. When the references come from
+    a generator that runs out, the references already in the queue are still returned and the transform then
+    behaves as with an exhausted generator.
+
+    Args:
+        prefetch (int): Maximum number of references that are read ahead. Default: 16.
+        num_workers (int): Number of reading threads. Default: 1.
+        size (tuple[int, int] | None): If set, images and masks returned by `read_fn` are resized to
+            (height, width) in the reading threads, e.g. to the size of the images they are mixed with.
+            Default: None.
+
+    Note:
+        Draws happen ahead of time, so a seeded pipeline gives the same results from run to run, but not
+        the same results as without a prefetcher.
+
+    Example:
+        >>> transform = A.MixUp(reference_paths, read_fn=read_sample,
+        ...                     reference_prefetcher=A.ReferencePrefetcher(prefetch=32, num_workers=4, size=(256, 256)))
+
+    """
+
+    def __init__(self, prefetch: int = DEFAULT_PREFETCH, num_workers: int = 1, size: tuple[int, int] | None = None):
+        if prefetch < 1:
+            msg = f"prefetch should be positive, got {prefetch}."
+            raise ValueError(msg)
+        self.prefetch = prefetch
+        self.num_workers = num_workers
+        self.size = size
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pending: deque[Future[Any]] = deque()
+        self._executor: ThreadPoolExecutor | None = None
+        self._exhausted = False
+        self._pid = os.getpid()
+
+    def get(self, draw: Callable[[], Any], read_fn: Callable[[Any], Any]) -> Any | None:
+        """Return the next reference read with `read_fn`, or None once `draw` raised StopIteration and the queue
+        is empty.
+        """
+        if self._pid != os.getpid():
+            self._reset()
+
+        while not self._exhausted and len(self._pending) < self.prefetch:
+            try:
+                reference = draw()
+            except StopIteration:
+                self._exhausted = True
+                break
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.num_workers, thread_name_prefix="albumentations-prefetch")
+            self._pending.append(self._executor.submit(self._read, reference, read_fn))
+
+        return self._pending.popleft().result() if self._pending else None
+
+    def _read(self, reference: Any, read_fn: Callable[[Any], Any]) -> Any:
+        data = read_fn(reference)
+        if self.size is None:
+            return data
+        if isinstance(data, np.ndarray):
+            return self._resize(data, cv2.INTER_LINEAR)
+        return {
+            **data,
+            **{
+                key: self._resize(data[key], interpolation)
+                for key, interpolation in [("image", cv2.INTER_LINEAR), ("mask", cv2.INTER_NEAREST)]
+                if data.get(key) is not None
+            },
+        }
+
+    def _resize(self, image: np.ndarray, interpolation: int) -> np.ndarray:
+        size = cast(Tuple[int, int], self.size)
+        if image.shape[:2] == tuple(size):
+            return image
+        return cv2.resize(image, size[::-1], interpolation=interpolation)
+
+    def close(self) -> None:
+        """Shut the reading threads down and drop the queued references."""
+        executor = self._executor
+        self._reset()
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {"prefetch": self.prefetch, "num_workers": self.num_workers, "size": self.size}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._reset()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(prefetch={self.prefetch}, num_workers={self.num_workers}, size={self.size})"
+
+
+class ReferenceBank(Sequence[Any]):
+    """Reference data packed into a single memory-mapped file, written once with `ReferenceBank.write`.
+
+    Transforms keep their references on the instance, so a list of decoded references is pickled into every
+    DataLoader worker. A bank is pickled by its path instead and every worker memory-maps the same file, so the
+    references are read from disk on demand and their pages are shared through the OS page cache.
+
+    Items are what `read_fn` returned when the bank was written: images, or dictionaries of arrays, e.g. the
+    samples of `MixUp`. They are read-only views into the file.
+
+    `MixUp`, `HistogramMatching`, `FDA` and `PixelDistributionAdaptation` accept a bank wherever they take
+    a sequence of references. They refer to its items by their index and read them from the bank, their
+    `read_fn` is not used. Being indices, the references can be cached and fingerprinted by `ReferenceCache`.
+
+    Args:
+        path (str | Path): Path of a file written by `ReferenceBank.write`.
+
+    Example:
+        >>> bank = A.ReferenceBank.write("references.bank", reference_paths, read_fn=A.read_rgb_image)
+        >>> transform = A.Compose([A.FDA(bank), A.HistogramMatching(bank)])
+        >>> loader = DataLoader(dataset, num_workers=32, multiprocessing_context="spawn")
+
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = path
+        self._data = np.memmap(path, dtype=np.uint8, mode="r")
+        self._index = _read_index(self._data)
+
+    @classmethod
+    def write(
+        cls,
+        path: str | Path,
+        references: Iterable[Any],
+        read_fn: Callable[[Any], Any] | None = None,
+    ) -> ReferenceBank:
+        """Write references, read with `read_fn` if it is set, into a bank file and open it.
+
+        References should be arrays or dictionaries whose values are arrays, scalars or None.
+        """
+        index = []
+        offset = 0
+        with open(path, "wb") as file:
+            for reference in references:
+                data = reference if read_fn is None else read_fn(reference)
+                fields, offset = _write_arrays(file, data if isinstance(data, Mapping) else {"": data}, offset)
+                index.append(fields)
+            _write_index(file, index)
+        return cls(path)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, index: int | slice) -> Any:  # type: ignore[override]
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        arrays = _read_arrays(self._data, self._index[index])
+        # Images are stored under an empty field name, dictionaries under their keys
+        return arrays[""] if list(arrays) == [""] else arrays
+
+    def __call__(self, index: int) -> Any:
+        """Return the item at `index`, so that the bank serves as `read_fn` for references that are indices."""
+        return self[index]
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {"path": self.path}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(state["path"])  # type: ignore[misc]
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self.path!r}, num_items={len(self)})"
+
+
+def _get_key(reference: Any, read_fn: ReadFn) -> Hashable | None:
+    key = (reference, read_fn)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _get_file_key(reference: str | os.PathLike[str] | int) -> str | int:
+    return reference if isinstance(reference, int) else os.fspath(reference)
+
+
+def write_fingerprints(path: str | Path, fingerprints: Iterable[tuple[Any, str, Fingerprint]]) -> int:
+    """Write fingerprints of references into a single file that `read_fingerprints` memory-maps.
+
+    Args:
+        path: Path of the file.
+        fingerprints: Triplets of a reference, a path or an integer, the name of the fingerprint, and
+            the fingerprint itself.
+
+    Returns:
+        int: Number of written fingerprints.
+
+    The file stores the arrays back to back, aligned to 64 bytes, followed by a JSON index and its size.
+
+    """
+    index = []
+    offset = 0
+    with open(path, "wb") as file:
+        for reference, name, fingerprint in fingerprints:
+            if not isinstance(reference, (str, os.PathLike, int)):
+                msg = f"Only fingerprints of paths and integers can be written, got {type(reference).__name__}."
+                raise TypeError(msg)
+            fields, offset = _write_arrays(file, fingerprint, offset)
+            index.append([_get_file_key(reference), name, fields])
+        _write_index(file, index)
+    return len(index)
+
+
+def read_fingerprints(path: str | Path) -> dict[FingerprintKey, Fingerprint]:
+    """Memory-map fingerprints written by `write_fingerprints`, keyed by reference and fingerprint name."""
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    return {(reference, name): _read_arrays(data, fields) for reference, name, fields in _read_index(data)}
+
+
+def _write_arrays(file: BinaryIO, arrays: Mapping[str, Any], offset: int) -> tuple[dict[str, Any], int]:
+    """Write arrays at the end of the file, at `offset`, and return their index entries and the new offset.
+
+    Values that are None are stored in the index only.
+    """
+    fields: dict[str, Any] = {}
+    for field, value in arrays.items():
+        if value is None:
+            fields[field] = None
+            continue
+        array = np.ascontiguousarray(value)
+        padding = -offset % FINGERPRINT_ALIGNMENT
+        file.write(bytes(padding))
+        offset += padding
+        fields[field] = [offset, array.dtype.str, list(array.shape)]
+        file.write(array.tobytes())
+        offset += array.nbytes
+    return fields, offset
+
+
+def _read_arrays(data: np.ndarray, fields: dict[str, Any]) -> dict[str, Any]:
+    arrays = {}
+    for field, entry in fields.items():
+        if entry is None:
+            arrays[field] = None
+            continue
+        offset, dtype_str, shape = entry
+        dtype = np.dtype(dtype_str)
+        nbytes = dtype.itemsize * int(np.prod(shape))
+        arrays[field] = data[offset : offset + nbytes].view(dtype).reshape(shape)
+    return arrays
+
+
+def _write_index(file: BinaryIO, index: list[Any]) -> None:
+    header = json.dumps(index).encode()
+    file.write(header)
+    file.write(np.array([len(header)], dtype=FINGERPRINT_FOOTER_DTYPE).tobytes())
+
+
+def _read_index(data: np.ndarray) -> Any:
+    footer_size = FINGERPRINT_FOOTER_DTYPE.itemsize
+    header_size = int(data[-footer_size:].view(FINGERPRINT_FOOTER_DTYPE)[0])
+    return json.loads(data[-footer_size - header_size : -footer_size].tobytes())
+
+
+# Shared by all reference-based transforms that are not given a cache of their own
+DEFAULT_REFERENCE_CACHE = ReferenceCache()
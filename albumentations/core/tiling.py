@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import math
+import random
+from typing import Any, Callable, Sequence, cast
+
+import numpy as np
+
+from .composition import BaseCompose, Compose, Sequential, TransformType
+from .transforms_interface import BasicTransform, ImageOnlyTransform
+
+__all__ = ["process_tiled"]
+
+RegionReader = Callable[[int, int, int, int], np.ndarray]
+
+DEFAULT_MEMORY_BUDGET = 256 * 2**20
+# Tiles are copied a few times while they pass through a pipeline and are often converted to float32
+TILE_WORKING_COPIES = 4
+MIN_WORKING_ITEMSIZE = 4
+
+
+def process_tiled(
+    transforms: TransformType | Sequence[TransformType],
+    image: np.ndarray | RegionReader,
+    output: np.ndarray | None = None,
+    image_shape: tuple[int, ...] | None = None,
+    dtype: np.dtype | None = None,
+    tile_size: int | None = None,
+    halo: int = 0,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+) -> np.ndarray:
+    """Apply image-only transforms to an image that does not fit in memory, tile by tile.
+
+    Parameters of every transform are sampled once for the whole image. The image is then read in
+    overlapping spatial tiles, every tile passes through the transforms with these parameters, and the inner
+    part of the result is written to `output`. Parameters that are arrays of the image size, such as noise maps,
+    are cropped to the tile. Neighbourhood operations like blur or morphology give the same result as on the
+    whole image as long as `halo` is not smaller than their radius.
+
+    Only transforms that keep the image size and process every pixel from its neighbourhood are supported,
+    that is `ImageOnlyTransform`. Results of transforms that compute statistics of the whole image on the fly,
+    like `Equalize` or `Normalize` with per-image normalization, differ from tile to tile.
+
+    Args:
+        transforms: Transforms to apply. `Compose` and `Sequential` are unrolled, other compositions are
+            not supported because their choice of transforms has to be made once for the whole image.
+        image: Image as an array, e.g. an `np.memmap`, or a function `read_region(x_min, y_min, x_max, y_max)`
+            that returns the corresponding region of the image.
+        output: Array of the image size, e.g. an `np.memmap`, the result is written into.
+            Allocated in memory if None.
+        image_shape: Shape of the image, required if `image` is a function.
+        dtype: Data type of the image, required if `image` is a function.
+        tile_size: Side of the square region written by every tile. Derived from `memory_budget` if None.
+        halo: Number of pixels read around every tile, should be at least the radius of neighbourhood operations.
+        memory_budget: Approximate number of bytes a single tile may use while it passes through the transforms.
+
+    Returns:
+        np.ndarray: `output` with the transformed image.
+
+    Example:
+        >>> image = np.load("mosaic.npy", mmap_mode="r")
+        >>> output = np.lib.format.open_memmap("result.npy", mode="w+", dtype=image.dtype, shape=image.shape)
+        >>> transform = A.Compose([A.GaussianBlur(blur_limit=(7, 7), p=1), A.RandomBrightnessContrast(p=1)])
+        >>> A.process_tiled(transform, image, output=output, halo=3)
+
+    """
+    if isinstance(transforms, (BaseCompose, BasicTransform)):
+        transforms = [transforms]
+    _check_transforms(transforms)
+
+    if callable(image):
+        if image_shape is None or dtype is None:
+            msg = "image_shape and dtype are required if image is a region reader."
+            raise ValueError(msg)
+        read_region = image
+        # Parameters are sampled with an image of the right shape that does not allocate any memory
+        image_proxy = np.broadcast_to(np.zeros((), dtype=dtype), image_shape)
+    else:
+        image_shape, dtype = image.shape, image.dtype
+        image_proxy = image
+
+        def read_region(x_min: int, y_min: int, x_max: int, y_max: int) -> np.ndarray:
+            return image[y_min:y_max, x_min:x_max]
+
+    height, width = image_shape[:2]
+    if output is not None and output.shape[:2] != (height, width):
+        msg = f"Output of shape {output.shape} does not match image of shape {image_shape}."
+        raise ValueError(msg)
+
+    if tile_size is None:
+        tile_size = get_tile_size(image_shape, np.dtype(dtype), halo, memory_budget)
+
+    sampled_params = _sample_params(transforms, image_proxy)
+
+    for y_min in range(0, height, tile_size):
+        for x_min in range(0, width, tile_size):
+            y_max, x_max = min(y_min + tile_size, height), min(x_min + tile_size, width)
+            region = (max(0, x_min - halo), max(0, y_min - halo), min(width, x_max + halo), min(height, y_max + halo))
+
+            tile = _process_tile(sampled_params, np.array(read_region(*region)), region, (height, width))
+
+            if output is None:
+                output = np.empty((height, width, *tile.shape[2:]), dtype=tile.dtype)
+            output[y_min:y_max, x_min:x_max] = tile[
+                y_min - region[1] : y_max - region[1],
+                x_min - region[0] : x_max - region[0],
+            ]
+
+    return output
+
+
+def get_tile_size(image_shape: tuple[int, ...], dtype: np.dtype, halo: int, memory_budget: int) -> int:
+    """Return the side of the largest tile whose working set with a halo fits into the memory budget."""
+    num_channels = int(np.prod(image_shape[2:]))
+    bytes_per_pixel = num_channels * max(dtype.itemsize, MIN_WORKING_ITEMSIZE) * TILE_WORKING_COPIES
+    tile_size = math.isqrt(memory_budget // bytes_per_pixel) - 2 * halo
+    if tile_size <= 0:
+        msg = f"Memory budget of {memory_budget} bytes is too small for tiles with a halo of {halo} pixels."
+        raise ValueError(msg)
+    return tile_size
+
+
+def _check_transforms(transforms: Sequence[TransformType]) -> None:
+    for transform in transforms:
+        if isinstance(transform, (Compose, Sequential)):
+            _check_transforms(transform.transforms)
+        elif not isinstance(transform, ImageOnlyTransform):
+            msg = (
+                f"{transform.__class__.__name__} can not be applied tile by tile, "
+                "only image-only transforms, Compose and Sequential are supported."
+            )
+            raise TypeError(msg)
+
+
+def _sample_params(
+    transforms: Sequence[TransformType],
+    image: np.ndarray,
+) -> list[tuple[ImageOnlyTransform, dict[str, Any]]]:
+    """Sample parameters of transforms that are applied, drawing random numbers in the same order as `__call__`."""
+    sampled_params = []
+    for transform in transforms:
+        if isinstance(transform, (Compose, Sequential)):
+            if random.random() < transform.p:
+                sampled_params.extend(_sample_params(transform.transforms, image))
+            continue
+
+        transform = cast(ImageOnlyTransform, transform)
+        if not transform.should_apply():
+            continue
+
+        data = {"image": image}
+        params = transform.update_params_shape(params=transform.get_params(), data=data)
+        params.update(transform.get_params_dependent_on_data(params=params, data=data))
+        sampled_params.append((transform, params))
+    return sampled_params
+
+
+def _crop_params(params: dict[str, Any], region: tuple[int, int, int, int], shape: tuple[int, int]) -> dict[str, Any]:
+    x_min, y_min, x_max, y_max = region
+    return {
+        key: value[y_min:y_max, x_min:x_max]
+        if isinstance(value, np.ndarray) and value.ndim >= len(shape) and value.shape[: len(shape)] == shape
+        else value
+        for key, value in params.items()
+    }
+
+
+def _process_tile(
+    sampled_params: list[tuple[ImageOnlyTransform, dict[str, Any]]],
+    tile: np.ndarray,
+    region: tuple[int, int, int, int],
+    shape: tuple[int, int],
+) -> np.ndarray:
+    tile_shape = tile.shape[:2]
+    for transform, params in sampled_params:
+        tile = transform.apply_with_params(_crop_params(params, region, shape), image=tile)["image"]
+        if tile.shape[:2] != tile_shape:
+            msg = f"{transform.__class__.__name__} changed the size of a tile from {tile_shape} to {tile.shape[:2]}."
+            raise ValueError(msg)
+    return tile
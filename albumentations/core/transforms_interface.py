@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import random
 from copy import deepcopy
-from typing import Any, Callable, Sequence
+from typing import TYPE_CHECKING, Any, Callable, Sequence
 from warnings import warn
 
 import cv2
@@ -12,12 +12,18 @@ from pydantic import BaseModel, ConfigDict, Field
 from albumentations.core.pydantic import ProbabilityType
 from albumentations.core.validation import ValidatedTransformMeta
 
+from .image_source import ImageSource
+from .instance_masks import InstanceMasks
 from .serialization import Serializable, SerializableMeta, get_shortest_class_fullname
 from .types import (
     ColorType,
+    D4Type,
     Targets,
 )
-from .utils import format_args
+from .utils import format_args, process_stacked
+
+if TYPE_CHECKING:
+    from albumentations.augmentations.utils import ColorStats
 
 __all__ = ["BasicTransform", "DualTransform", "ImageOnlyTransform", "NoOp", "ReferenceBasedTransform"]
 
@@ -37,6 +43,13 @@ class BaseTransformInitSchema(BaseModel):
     p: ProbabilityType = 0.5
 
 
+def read_image_sources(data: dict[str, Any]) -> dict[str, Any]:
+    """Replace images that are read lazily with the whole decoded images."""
+    if not any(isinstance(value, ImageSource) for value in data.values()):
+        return data
+    return {key: value.read() if isinstance(value, ImageSource) else value for key, value in data.items()}
+
+
 class CombinedMeta(SerializableMeta, ValidatedTransformMeta):
     pass
 
@@ -52,6 +65,18 @@ class BasicTransform(Serializable, metaclass=CombinedMeta):
     interpolation: int
     fill_value: ColorType
     mask_fill_value: ColorType | None
+    # transforms that process every channel independently and with the same parameters set it to True,
+    # so that lists of images and masks are processed stacked along the channel axis
+    _stack_channels: bool = False
+    # transforms that only permute pixels with an element of the D4 group set it to True and implement
+    # `get_d4_group_element`, so that Compose merges consecutive ones into a single permutation
+    _d4_symmetry: bool = False
+    # transforms that map channel values of every pixel with the same affine map set it to True and implement
+    # `get_color_matrix`, so that Compose with `fuse_color=True` applies consecutive ones as a single matrix
+    _linear_color: bool = False
+    # transforms that only read a region of the image set it to True and accept an `ImageSource` as the image,
+    # other transforms get the whole image read
+    _supports_image_source: bool = False
     # replay mode params
     deterministic: bool = False
     save_key = "replay"
@@ -88,6 +113,7 @@ class BasicTransform(Serializable, metaclass=CombinedMeta):
         if args:
             msg = "You have to pass data to augmentations as named arguments, for example: aug(image=image)"
             raise KeyError(msg)
+        kwargs = self._read_image_sources(kwargs)
         if self.replay_mode:
             if self.applied_in_replay:
                 return self.apply_with_params(self.params, **kwargs)
@@ -128,6 +154,7 @@ class BasicTransform(Serializable, metaclass=CombinedMeta):
 
     def apply_with_params(self, params: dict[str, Any], *args: Any, **kwargs: Any) -> dict[str, Any]:
         """Apply transforms with parameters."""
+        kwargs = self._read_image_sources(kwargs)
         params = self.update_params(params, **kwargs)  # remove after move parameters like interpolation
         res = {}
         for key, arg in kwargs.items():
@@ -145,6 +172,9 @@ class BasicTransform(Serializable, metaclass=CombinedMeta):
                 res[key] = arg
         return res
 
+    def _read_image_sources(self, data: dict[str, Any]) -> dict[str, Any]:
+        return data if self._supports_image_source else read_image_sources(data)
+
     def set_deterministic(self, flag: bool, save_key: str = "replay") -> BasicTransform:
         """Set transform to be deterministic."""
         if save_key == "params":
@@ -172,8 +202,21 @@ class BasicTransform(Serializable, metaclass=CombinedMeta):
 
     def apply_to_images(self, images: np.ndarray, **params: Any) -> list[np.ndarray]:
         """Apply transform on images."""
+        if self._can_stack_channels():
+            return process_stacked(lambda image: self.apply(image, **params), images)
         return [self.apply(image, **params) for image in images]
 
+    def _can_stack_channels(self) -> bool:
+        """Check if targets can be processed stacked along the channel axis.
+
+        Per-channel fill values would be spread over the stacked channels, so stacking is only used
+        when every fill value of the transform is a scalar or None.
+        """
+        if not self._stack_channels:
+            return False
+        fill_values = (getattr(self, name, None) for name in ("value", "mask_value", "cval", "cval_mask"))
+        return all(value is None or np.isscalar(value) for value in fill_values)
+
     def get_params(self) -> dict[str, Any]:
         """Returns parameters independent of input."""
         return {}
@@ -190,6 +233,53 @@ class BasicTransform(Serializable, metaclass=CombinedMeta):
         """Returns parameters dependent on input."""
         return params
 
+    def get_d4_group_element(self, params: dict[str, Any]) -> D4Type:
+        """Returns the D4 group element the transform applies with given parameters."""
+        raise NotImplementedError
+
+    def sample_d4_group_element(self, data: dict[str, Any]) -> D4Type | None:
+        """Samples parameters the same way as `__call__` and returns the D4 group element they apply.
+
+        Returns None if the transform is not a D4 symmetry or records its parameters for replay,
+        in which case it has to be called as usual. Nothing is sampled in that case.
+        """
+        if not self._d4_symmetry or self.deterministic or self.replay_mode:
+            return None
+        if not self.should_apply():
+            return "e"
+
+        params = self.update_params_shape(params=self.get_params(), data=data)
+        params.update(self.get_params_dependent_on_data(params=params, data=data))
+        return self.get_d4_group_element(params)
+
+    def get_color_matrix(self, params: dict[str, Any], stats: ColorStats) -> np.ndarray | None:
+        """Returns the (C, C + 1) affine map of channel values the transform applies with given parameters.
+
+        Values are in the range of the image dtype and `stats` describes the image the map is applied to.
+        Returns None if the transform is not affine with these parameters.
+        """
+        raise NotImplementedError
+
+    def sample_color_matrix(
+        self,
+        data: dict[str, Any],
+        stats: ColorStats,
+    ) -> tuple[dict[str, Any], np.ndarray | None] | None:
+        """Samples parameters the same way as `__call__` and returns them with the affine color map they apply.
+
+        Returns None if the transform is not linear in color or records its parameters for replay,
+        in which case it has to be called as usual. Nothing is sampled in that case. The map is None if it is
+        not affine with the sampled parameters, in which case the transform has to be applied with them.
+        """
+        if not self._linear_color or self.deterministic or self.replay_mode:
+            return None
+        if not self.should_apply():
+            return {}, np.eye(stats.num_channels, stats.num_channels + 1)
+
+        params = self.update_params_shape(params=self.get_params(), data=data)
+        params.update(self.get_params_dependent_on_data(params=params, data=data))
+        return params, self.get_color_matrix(params, stats)
+
     @property
     def targets(self) -> dict[str, Callable[..., Any]]:
         # mapping for targets and methods for which they depend
@@ -329,7 +419,12 @@ class DualTransform(BasicTransform):
             Applies the transform specifically to a single mask.
 
         apply_to_masks(masks: Sequence[np.ndarray], **params: Any) -> list[np.ndarray]:
-            Applies the transform to a list of masks. Delegates to `apply_to_mask` for each mask.
+            Applies the transform to a list of masks. Delegates to `apply_to_mask` for each mask, or for
+            chunks of masks stacked along the channel axis if the transform sets `_stack_channels`.
+
+        apply_to_instance_masks(instance_masks: InstanceMasks, **params: Any) -> InstanceMasks:
+            Applies the transform to sparse instance masks. Delegates to `apply_to_masks` on dense masks
+            unless overridden.
 
     Note:
         This class is intended to be subclassed and should not be used directly. Subclasses are expected to
@@ -345,6 +440,7 @@ class DualTransform(BasicTransform):
             "images": self.apply_to_images,
             "mask": self.apply_to_mask,
             "masks": self.apply_to_masks,
+            "instance_masks": self.apply_to_instance_masks,
             "bboxes": self.apply_to_bboxes,
             "keypoints": self.apply_to_keypoints,
         }
@@ -364,11 +460,26 @@ class DualTransform(BasicTransform):
         return self.apply(mask, **{k: cv2.INTER_NEAREST if k == "interpolation" else v for k, v in params.items()})
 
     def apply_to_masks(self, masks: Sequence[np.ndarray], **params: Any) -> list[np.ndarray]:
+        if self._can_stack_channels():
+            return process_stacked(lambda mask: self.apply_to_mask(mask, **params), masks)
         return [self.apply_to_mask(mask, **params) for mask in masks]
 
     def apply_to_global_labels(self, labels: Sequence[np.ndarray], **params: Any) -> list[np.ndarray]:
         return [self.apply_to_global_label(label, **params) for label in labels]
 
+    def apply_to_instance_masks(self, instance_masks: InstanceMasks, **params: Any) -> InstanceMasks:
+        """Apply transform on sparse instance masks.
+
+        This generic implementation materializes dense masks, so transforms that can process the regions
+        of the instances directly should override it.
+        """
+        if not len(instance_masks):
+            shape = self.apply_to_mask(np.zeros(instance_masks.shape, dtype=np.uint8), **params).shape[:2]
+            return InstanceMasks([], np.zeros((0, 4), dtype=np.int32), shape, instance_masks.ids)
+
+        masks = self.apply_to_masks(list(instance_masks.to_dense()), **params)
+        return InstanceMasks.from_dense(masks, instance_masks.ids)
+
 
 class ImageOnlyTransform(BasicTransform):
     """Transform applied to image only."""
@@ -2,19 +2,23 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from collections import defaultdict
-from typing import TYPE_CHECKING, Any, Literal, Sequence
+from typing import TYPE_CHECKING, Any, Callable, Literal, Sequence
 
 import numpy as np
 
+from .image_source import ImageSource
 from .serialization import Serializable
-from .types import PAIR, ScalarType, ScaleType
+from .types import MONO_CHANNEL_DIMENSIONS, PAIR, TWO, ScalarType, ScaleType
 
 if TYPE_CHECKING:
     import torch
 
+# OpenCV processes up to 4 channels in a single call
+MAX_STACKED_CHANNELS = 4
 
-def get_shape(img: np.ndarray | torch.Tensor) -> tuple[int, int]:
-    if isinstance(img, np.ndarray):
+
+def get_shape(img: np.ndarray | ImageSource | torch.Tensor) -> tuple[int, int]:
+    if isinstance(img, (np.ndarray, ImageSource)):
         return img.shape[:2]
 
     try:
@@ -261,3 +265,81 @@ def to_tuple(
         return (bias + min_val, bias + max_val)
 
     return min_val, max_val
+
+
+def process_stacked(
+    process_fn: Callable[[np.ndarray], np.ndarray],
+    arrays: Sequence[np.ndarray],
+    max_channels: int = MAX_STACKED_CHANNELS,
+) -> list[np.ndarray]:
+    """Apply a channel-independent function to several arrays at once by stacking them along the channel axis.
+
+    Arrays with the same height, width and dtype are packed into chunks of up to `max_channels` channels,
+    so that OpenCV computes interpolation coefficients once per chunk instead of once per array.
+    Results are split back and returned as views into the processed chunks, in the input order.
+
+    Args:
+        process_fn: Function that processes every channel independently, with the same parameters,
+            and preserves the number of channels (e.g. a geometric warp with a scalar fill value).
+        arrays: Sequence of 2D (H, W) or 3D (H, W, C) arrays.
+        max_channels: Maximum number of channels processed in a single call.
+
+    Returns:
+        list[np.ndarray]: Processed arrays, each with the same number of dimensions as its input.
+
+    """
+    results: list[np.ndarray | None] = [None] * len(arrays)
+    groups: defaultdict[tuple[Any, ...], list[int]] = defaultdict(list)
+
+    for idx, array in enumerate(arrays):
+        num_channels = 1 if array.ndim == MONO_CHANNEL_DIMENSIONS else array.shape[-1]
+        if num_channels >= max_channels:
+            results[idx] = process_fn(array)
+        else:
+            groups[(array.shape[:2], array.dtype)].append(idx)
+
+    for indices in groups.values():
+        chunk: list[int] = []
+        chunk_channels = 0
+        for idx in indices:
+            array = arrays[idx]
+            num_channels = 1 if array.ndim == MONO_CHANNEL_DIMENSIONS else array.shape[-1]
+            if chunk_channels + num_channels > max_channels:
+                _process_chunk(process_fn, arrays, chunk, results)
+                chunk, chunk_channels = [], 0
+            chunk.append(idx)
+            chunk_channels += num_channels
+        _process_chunk(process_fn, arrays, chunk, results)
+
+    return results  # type: ignore[return-value]
+
+
+def _process_chunk(
+    process_fn: Callable[[np.ndarray], np.ndarray],
+    arrays: Sequence[np.ndarray],
+    chunk: list[int],
+    results: list[np.ndarray | None],
+) -> None:
+    num_channels = [1 if arrays[idx].ndim == MONO_CHANNEL_DIMENSIONS else arrays[idx].shape[-1] for idx in chunk]
+
+    # Many OpenCV functions cannot work with 2-channel images
+    if len(chunk) == 1 or sum(num_channels) == TWO:
+        for idx in chunk:
+            results[idx] = process_fn(arrays[idx])
+        return
+
+    stacked = np.empty((*arrays[chunk[0]].shape[:2], sum(num_channels)), dtype=arrays[chunk[0]].dtype)
+    start = 0
+    for idx, channels in zip(chunk, num_channels):
+        stacked[..., start : start + channels] = arrays[idx].reshape(*stacked.shape[:2], channels)
+        start += channels
+
+    processed = process_fn(stacked)
+
+    start = 0
+    for idx, channels in zip(chunk, num_channels):
+        if arrays[idx].ndim == MONO_CHANNEL_DIMENSIONS:
+            results[idx] = processed[..., start]
+        else:
+            results[idx] = processed[..., start : start + channels]
+        start += channels
@@ -0,0 +1,186 @@
+"""Fast image reading: batched decoding on a thread pool with prefetching, and packed shard files."""
+
+from __future__ import annotations
+
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence, Union
+
+import cv2
+import numpy as np
+from typing_extensions import Self
+
+from albumentations.augmentations.utils import REDUCED_COLOR_FLAGS, REDUCED_GRAYSCALE_FLAGS
+
+__all__ = ["ImageReader", "ShardReader", "decode_image", "write_shard"]
+
+ImageSourceType = Union[str, Path, bytes, bytearray, memoryview, np.ndarray]
+
+SHARD_FOOTER_DTYPE = np.dtype("<i8")
+DEFAULT_PREFETCH = 16
+
+
+def decode_image(source: ImageSourceType, grayscale: bool = False, reduction: int = 1) -> np.ndarray:
+    """Decode an image from a path or an encoded buffer into an RGB or grayscale array.
+
+    The BGR to RGB conversion is done in place, so no second copy of the image is made.
+
+    Args:
+        source: Path to the image, or the encoded image as bytes, a memoryview or a uint8 array.
+        grayscale: If True, decode into a single channel image.
+        reduction: Factor of 1, 2, 4 or 8 to downscale JPEG images by while decoding.
+
+    """
+    flags = (REDUCED_GRAYSCALE_FLAGS if grayscale else REDUCED_COLOR_FLAGS)[reduction]
+    if isinstance(source, (str, Path)):
+        image = cv2.imread(os.fspath(source), flags)
+    else:
+        image = cv2.imdecode(np.frombuffer(source, dtype=np.uint8), flags)
+
+    if image is None:
+        msg = f"Failed to decode image from {source if isinstance(source, (str, Path)) else type(source).__name__}."
+        raise ValueError(msg)
+    if not grayscale:
+        cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image)
+    return image
+
+
+class ImageReader:
+    """Decode images on a thread pool, reading ahead of the consumer.
+
+    OpenCV releases the GIL while decoding, so threads decode images in parallel. `iter_images` keeps at most
+    `prefetch` images decoded or in flight, which bounds memory usage while the consumer applies transforms.
+
+    The reader is callable, so it can be passed as `read_fn` to reference-based transforms such as `FDA`.
+
+    Args:
+        num_workers (int): Number of decoding threads. Default: number of CPUs.
+        prefetch (int): Maximum number of images decoded ahead of the consumer. Default: 16.
+        grayscale (bool): If True, decode images into a single channel. Default: False.
+        reduction (int): Factor of 1, 2, 4 or 8 to downscale JPEG images by while decoding,
+            see `get_decode_reduction`. Default: 1.
+
+    Example:
+        >>> reader = ImageReader(num_workers=8)
+        >>> transform = A.Compose([A.RandomCrop(256, 256), A.HorizontalFlip()])
+        >>> for image in reader.iter_images(paths):
+        ...     augmented = transform(image=image)["image"]
+        >>> shard = ShardReader("train-00000.shard")
+        >>> batch = reader.read_batch(shard[:32])
+
+    """
+
+    def __init__(
+        self,
+        num_workers: int | None = None,
+        prefetch: int = DEFAULT_PREFETCH,
+        grayscale: bool = False,
+        reduction: int = 1,
+    ):
+        if prefetch < 1:
+            msg = f"prefetch should be positive, got {prefetch}."
+            raise ValueError(msg)
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.prefetch = prefetch
+        self.grayscale = grayscale
+        self.reduction = reduction
+        self._executor: ThreadPoolExecutor | None = None
+
+    def __call__(self, source: ImageSourceType) -> np.ndarray:
+        return decode_image(source, self.grayscale, self.reduction)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.num_workers, thread_name_prefix="albumentations-io")
+        return self._executor
+
+    def read_batch(self, sources: Sequence[ImageSourceType]) -> list[np.ndarray]:
+        """Decode a batch of images in parallel, keeping their order."""
+        return list(self.executor.map(self, sources))
+
+    def iter_images(self, sources: Iterable[ImageSourceType]) -> Iterator[np.ndarray]:
+        """Decode images in order, keeping up to `prefetch` of them decoded ahead of the consumer."""
+        pending: deque[Future[np.ndarray]] = deque()
+        try:
+            for source in sources:
+                pending.append(self.executor.submit(self, source))
+                if len(pending) >= self.prefetch:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def close(self) -> None:
+        """Shut the decoding threads down."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def __getstate__(self) -> dict[str, object]:
+        # Thread pools can not be pickled, every process, e.g. a DataLoader worker, starts its own one
+        return {**self.__dict__, "_executor": None}
+
+
+def write_shard(path: str | Path, buffers: Iterable[bytes | ImageSourceType]) -> int:
+    """Pack encoded images into a single shard file that is read with `ShardReader`.
+
+    Paths are read as they are, without decoding, so packing keeps the original compression.
+    The shard stores the encoded images back to back, followed by their int64 offsets and their number.
+
+    Returns:
+        int: Number of images in the shard.
+
+    """
+    offsets = [0]
+    with open(path, "wb") as file:
+        for buffer in buffers:
+            data = Path(buffer).read_bytes() if isinstance(buffer, (str, Path)) else bytes(buffer)
+            file.write(data)
+            offsets.append(offsets[-1] + len(data))
+        file.write(np.array(offsets, dtype=SHARD_FOOTER_DTYPE).tobytes())
+        file.write(np.array([len(offsets) - 1], dtype=SHARD_FOOTER_DTYPE).tobytes())
+    return len(offsets) - 1
+
+
+class ShardReader(Sequence[np.ndarray]):
+    """Random access to encoded images packed by `write_shard`.
+
+    The shard is memory-mapped, so only the requested images are read from disk. Items are uint8 arrays with
+    the encoded images that `ImageReader` and `decode_image` accept.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = path
+        self._data = np.memmap(path, dtype=np.uint8, mode="r")
+
+        itemsize = SHARD_FOOTER_DTYPE.itemsize
+        num_images = int(self._data[-itemsize:].view(SHARD_FOOTER_DTYPE)[0])
+        offsets_start = len(self._data) - itemsize * (num_images + 2)
+        self._offsets = np.array(self._data[offsets_start:-itemsize].view(SHARD_FOOTER_DTYPE))
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int | slice) -> np.ndarray | list[np.ndarray]:  # type: ignore[override]
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            msg = f"Index {index} is out of range for a shard of {len(self)} images."
+            raise IndexError(msg)
+        return self._data[self._offsets[index] : self._offsets[index + 1]]
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self.path!r}, num_images={len(self)})"
@@ -1,3 +1,4 @@
+import cv2
 import numpy as np
 import pytest
 import skimage
@@ -129,6 +130,67 @@ def test_generate_distorted_grid_polygons_consistent_shared_points(image_shape,
             assert np.allclose(top_right, bottom_left)
 
 
+@pytest.mark.parametrize("image_shape, num_grid_xy", [
+    ((100, 100), (3, 3)),
+    ((101, 151), (4, 2)),
+    ((64, 64), (1, 1)),
+])
+def test_generate_distortion_maps_identity(image_shape, num_grid_xy):
+    dimensions = calculate_grid_dimensions(image_shape, num_grid_xy)
+    polygons = fgeometric.generate_distorted_grid_polygons(dimensions, magnitude=0)
+    mesh = np.hstack((dimensions.reshape(-1, 4), polygons))
+
+    map_x, map_y = fgeometric.generate_distortion_maps(mesh, image_shape)
+
+    expected_x, expected_y = np.meshgrid(np.arange(image_shape[1]), np.arange(image_shape[0]))
+    assert map_x.dtype == map_y.dtype == np.float32
+    np.testing.assert_allclose(map_x, expected_x, atol=1e-3)
+    np.testing.assert_allclose(map_y, expected_y, atol=1e-3)
+
+
+@pytest.mark.parametrize("interpolation", [
+    cv2.INTER_NEAREST, cv2.INTER_LINEAR, cv2.INTER_CUBIC, cv2.INTER_AREA, cv2.INTER_LANCZOS4,
+])
+def test_generate_distortion_maps_uncovered_pixels(interpolation):
+    mesh = np.array([[0, 0, 50, 50, 5, 5, 45, 5, 45, 45, 5, 45]], dtype=np.float32)
+    image = np.full((100, 100, 3), 255, dtype=np.uint8)
+
+    distorted = fgeometric.distort_image(image, mesh, interpolation)
+
+    assert np.all(distorted[:5] == 0)
+    assert np.all(distorted[50:] == 0)
+    assert np.all(distorted[10:40, 10:40] == 255)
+
+
+@pytest.mark.parametrize("num_channels", [1, 3, 5])
+def test_distort_image_matches_per_cell_warp(num_channels):
+    set_seed(42)
+    image_shape = (120, 160)
+    image = np.random.randint(0, 256, (*image_shape, num_channels), dtype=np.uint8)
+
+    dimensions = calculate_grid_dimensions(image_shape, (4, 3))
+    polygons = fgeometric.generate_distorted_grid_polygons(dimensions, magnitude=8)
+    mesh = np.hstack((dimensions.reshape(-1, 4), polygons))
+
+    expected = np.zeros_like(image)
+    for cell in mesh:
+        x1, y1, x2, y2 = cell[:4]
+        dst_quad = cell[4:].reshape(4, 2)
+        src_quad = np.array([[x1, y1], [x2, y1], [x2, y2], [x1, y2]], dtype=np.float32)
+        matrix = cv2.getPerspectiveTransform(src_quad, dst_quad)
+        cell_mask = np.zeros(image_shape, dtype=np.uint8)
+        cv2.fillConvexPoly(cell_mask, np.int32(dst_quad), 255)
+        for channel in range(num_channels):
+            warped = cv2.warpPerspective(image[..., channel], matrix, image_shape[::-1], flags=cv2.INTER_NEAREST)
+            expected[..., channel][cell_mask > 0] = warped[cell_mask > 0]
+
+    distorted = fgeometric.distort_image(image, mesh, cv2.INTER_NEAREST)
+
+    assert distorted.shape == image.shape
+    # Rounding of the sampling coordinates may differ on a handful of pixels
+    assert np.mean(distorted != expected) < 0.001
+
+
 @pytest.mark.parametrize("image_shape, keypoints, inverted", [
     ((100, 100), [(50, 50), (25, 75)], False),
     ((100, 100), [(50, 50), (25, 75)], True),
@@ -198,3 +260,13 @@ def test_to_distance_maps_extra_columns(image_shape, keypoints, inverted):
             assert np.isclose(distance_maps[int(y), int(x), i], 1.0)
         else:
             assert np.isclose(distance_maps[int(y), int(x), i], 0.0)
+
+
+@pytest.mark.parametrize("first", ["e", "r90", "r180", "r270", "v", "hvt", "h", "t"])
+@pytest.mark.parametrize("second", ["e", "r90", "r180", "r270", "v", "hvt", "h", "t"])
+def test_compose_d4(first, second):
+    image = np.arange(12 * 3).reshape(3, 4, 3)
+
+    expected = fgeometric.d4(fgeometric.d4(image, first), second)
+
+    np.testing.assert_array_equal(fgeometric.d4(image, fgeometric.compose_d4(first, second)), expected)
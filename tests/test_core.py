@@ -1225,3 +1225,107 @@ def test_non_contiguous_input_with_compose(augmentation_cls, params, bboxes):
     # Check if the augmentation is not an ImageOnlyTransform and mask is in the output
     if not issubclass(augmentation_cls, ImageOnlyTransform) and "mask" in transformed:
         assert transformed["mask"].flags["C_CONTIGUOUS"], f"{augmentation_cls.__name__} did not return a C_CONTIGUOUS mask"
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_compose_merges_d4_transforms(seed):
+    transforms = [
+        A.HorizontalFlip(p=0.7),
+        A.VerticalFlip(p=0.5),
+        A.RandomRotate90(p=0.8),
+        A.Transpose(p=0.5),
+        A.D4(p=1),
+        A.RandomCrop(50, 40, p=1),
+        A.HorizontalFlip(p=0.5),
+    ]
+    image = RECTANGULAR_UINT8_IMAGE
+    mask = image[:, :, 0].copy()
+    data = {"image": image, "image2": image[::-1].copy(), "mask": mask, "masks": [mask, mask[::-1].copy()],
+            "bboxes": [[5, 5, 20, 30, 1], [30, 10, 55, 35, 2]]}
+    compose_args = {"bbox_params": A.BboxParams("pascal_voc"), "additional_targets": {"image2": "image"}}
+
+    set_seed(seed)
+    merged = A.Compose(transforms, **compose_args)(**data)
+    # ReplayCompose records params of every transform, so it applies them one by one
+    set_seed(seed)
+    expected = A.ReplayCompose(transforms, **compose_args)(**data)
+
+    for key in ["image", "image2", "mask"]:
+        np.testing.assert_array_equal(merged[key], expected[key])
+    for merged_mask, expected_mask in zip(merged["masks"], expected["masks"]):
+        np.testing.assert_array_equal(merged_mask, expected_mask)
+    np.testing.assert_allclose(merged["bboxes"], expected["bboxes"], atol=1e-6)
+
+
+def test_compose_applies_merged_d4_once():
+    aug = A.Compose([A.HorizontalFlip(p=1), A.VerticalFlip(p=1), A.Transpose(p=1), A.Transpose(p=1)])
+    image = RECTANGULAR_UINT8_IMAGE
+    fgeometric = A.augmentations.geometric.functional
+
+    with patch.object(fgeometric, "hflip_cv2") as hflip, patch.object(fgeometric, "d4", wraps=fgeometric.d4) as d4:
+        result = aug(image=image)
+
+    hflip.assert_not_called()
+    d4.assert_called_once_with(image, "r180")
+    np.testing.assert_array_equal(result["image"], image[::-1, ::-1])
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("dtype", [np.uint8, np.float32])
+def test_compose_fuses_color_transforms(seed, dtype):
+    transforms = [
+        A.RandomBrightnessContrast(brightness_limit=0.1, contrast_limit=0.1, p=0.8),
+        A.RGBShift(r_shift_limit=0.02, g_shift_limit=0.02, b_shift_limit=0.02, p=0.8),
+        A.HorizontalFlip(p=0.5),
+        A.ChannelShuffle(p=0.5),
+        A.ColorJitter(brightness=0.1, contrast=0.1, saturation=0.1, hue=0, p=0.8),
+        A.Blur(p=0.5),
+        A.ToGray(p=0.3),
+        A.ColorJitter(brightness=0.1, contrast=0.1, saturation=0.1, hue=0.05, p=0.5),
+        A.RandomBrightnessContrast(brightness_limit=0.1, contrast_limit=0.1, brightness_by_max=False, p=0.8),
+    ]
+    if dtype == np.float32:
+        # FancyPCA and PlanckianJitter do not support uint8 images
+        transforms += [A.FancyPCA(alpha=0.5, p=0.8), A.PlanckianJitter(temperature_limit=(5500, 7000), p=0.8)]
+    rng = np.random.default_rng(seed)
+    image = rng.integers(64, 192, size=(50, 60, 3)).astype(np.uint8)
+    if dtype == np.float32:
+        image = image.astype(np.float32) / 255
+    mask = image[:, :, 0].copy()
+
+    set_seed(seed)
+    expected = A.Compose(transforms)(image=image, mask=mask)
+    set_seed(seed)
+    fused = A.Compose(transforms, fuse_color=True)(image=image, mask=mask)
+
+    assert fused["image"].dtype == expected["image"].dtype
+    np.testing.assert_allclose(fused["image"], expected["image"], atol=6 if dtype == np.uint8 else 4 / 255)
+    np.testing.assert_array_equal(fused["mask"], expected["mask"])
+
+
+def test_compose_applies_fused_color_matrix_once():
+    transforms = [A.RandomBrightnessContrast(p=1), A.ToSepia(p=1), A.RGBShift(p=1), A.ChannelShuffle(p=1)]
+    image = RECTANGULAR_UINT8_IMAGE // 2 + 32
+    fmain = A.augmentations.functional
+
+    with patch.object(fmain, "brightness_contrast_adjust") as brightness_contrast_adjust, patch.object(
+        fmain, "apply_color_matrix", wraps=fmain.apply_color_matrix,
+    ) as apply_color_matrix:
+        A.Compose(transforms, fuse_color=True)(image=image)
+
+    brightness_contrast_adjust.assert_not_called()
+    apply_color_matrix.assert_called_once()
+
+
+def test_compose_does_not_fuse_color_of_several_images():
+    transforms = [A.RandomBrightnessContrast(brightness_by_max=False, p=1), A.FancyPCA(p=1)]
+    image = RECTANGULAR_FLOAT_IMAGE
+    data = {"image": image, "image2": image[::-1].copy()}
+
+    set_seed(0)
+    expected = A.Compose(transforms, additional_targets={"image2": "image"})(**data)
+    set_seed(0)
+    result = A.Compose(transforms, additional_targets={"image2": "image"}, fuse_color=True)(**data)
+
+    for key in data:
+        np.testing.assert_array_equal(result[key], expected[key])
@@ -1,6 +1,10 @@
 import pytest
 import numpy as np
-from albumentations.core.utils import LabelEncoder
+import cv2
+
+import albumentations as A
+from albucore.utils import maybe_process_in_chunks
+from albumentations.core.utils import LabelEncoder, process_stacked
 
 @pytest.mark.parametrize("input_labels, expected_encoded, expected_decoded", [
     (["a", "b", "c", "a", "b"], [0, 1, 2, 0, 1], ["a", "b", "c", "a", "b"]),
@@ -65,3 +69,67 @@ def test_label_encoder_unknown_code():
 
     with pytest.raises(KeyError):
         encoder.inverse_transform([3])
+
+
+@pytest.mark.parametrize("shapes", [
+    [(32, 48)] * 7,
+    [(32, 48), (32, 48, 3), (32, 48, 1), (32, 48), (32, 48, 5)],
+    [(32, 48), (16, 16), (32, 48), (16, 16, 2)],
+    [(32, 48)] * 2,
+])
+def test_process_stacked_matches_per_array(shapes):
+    arrays = [np.random.randint(0, 256, shape, dtype=np.uint8) for shape in shapes]
+    matrix = cv2.getRotationMatrix2D((10, 12), 23, 0.9)
+
+    warp = maybe_process_in_chunks(cv2.warpAffine, M=matrix, dsize=(48, 32), flags=cv2.INTER_LINEAR)
+
+    results = process_stacked(warp, arrays)
+
+    assert len(results) == len(arrays)
+    for array, result in zip(arrays, results):
+        np.testing.assert_array_equal(result, warp(array))
+
+
+def test_process_stacked_groups_by_dtype():
+    arrays = [np.ones((8, 8), dtype=np.uint8), np.ones((8, 8), dtype=np.float32)] + [np.ones((8, 8), dtype=np.uint8)] * 2
+    calls = []
+
+    def identity(array):
+        calls.append(array.shape)
+        return array
+
+    results = process_stacked(identity, arrays)
+
+    assert [result.dtype for result in results] == [np.uint8, np.float32, np.uint8, np.uint8]
+    assert [result.shape for result in results] == [(8, 8)] * 4
+    assert sorted(calls) == [(8, 8), (8, 8, 3)]
+
+
+@pytest.mark.parametrize("augmentation", [
+    A.Affine(rotate=(10, 30), scale=(0.8, 1.2), p=1),
+    A.ElasticTransform(p=1),
+    A.GridDistortion(p=1),
+    A.GridElasticDeform(num_grid_xy=(4, 4), magnitude=5, p=1),
+    A.Perspective(p=1),
+    A.Rotate(p=1),
+    A.LongestMaxSize(max_size=40, p=1),
+])
+def test_stacked_masks_match_per_mask(augmentation):
+    image = np.random.randint(0, 256, (64, 80, 3), dtype=np.uint8)
+    masks = [np.random.randint(0, 2, (64, 80), dtype=np.uint8) for _ in range(9)]
+
+    replay = A.ReplayCompose([augmentation])
+    result = replay(image=image, masks=masks)
+
+    transform = replay.transforms[0]
+    params = result["replay"]["transforms"][0]["params"]
+    expected = [transform.apply_with_params(params, image=image, mask=mask)["mask"] for mask in masks]
+
+    for mask, expected_mask in zip(result["masks"], expected):
+        np.testing.assert_array_equal(mask, expected_mask)
+
+
+def test_per_channel_fill_disables_stacking():
+    transform = A.Rotate(value=(1, 2, 3), mask_value=(1, 2), p=1)
+    assert not transform._can_stack_channels()
+    assert A.Rotate(p=1)._can_stack_channels()
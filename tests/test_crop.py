@@ -57,7 +57,7 @@ def test_crop_near_bbox(image, bboxes, keypoints):
 
     aug(image=image, bboxes=bboxes, target_bbox=[0, 5, 10, 20], keypoints=keypoints)
 
-    target_keys = {'image', "images", 'bboxes', "labels", "mask", "masks", "keypoints", bbox_key}
+    target_keys = {'image', "images", 'bboxes', "labels", "mask", "masks", "instance_masks", "keypoints", bbox_key}
 
     assert aug._available_keys == target_keys
 
@@ -112,3 +112,34 @@ def test_bbox_params_edges(
     res = aug(image=image, bboxes=bboxes)["bboxes"]
 
     np.testing.assert_array_equal(res, expected_bboxes)
+
+
+@pytest.mark.parametrize("mask_id_key", [None, "sample_id"])
+def test_crop_non_empty_mask_foreground_cache(mask_id_key):
+    masks = [(np.random.rand(100, 80) < 0.01).astype(np.uint8) for _ in range(3)]
+    image = np.random.randint(0, 256, (100, 80, 3), dtype=np.uint8)
+    expected_transform = A.Compose([A.CropNonEmptyMaskIfExists(20, 30)])
+    cached_crop = A.CropNonEmptyMaskIfExists(20, 30, foreground_cache_size=2, mask_id_key=mask_id_key)
+    cached_transform = A.Compose([cached_crop])
+
+    for _ in range(2):
+        for sample_id, mask in enumerate(masks):
+            extra = {} if mask_id_key is None else {"sample_id": sample_id}
+            set_seed(sample_id)
+            expected = expected_transform(image=image, mask=mask)
+            set_seed(sample_id)
+            result = cached_transform(image=image, mask=mask, **extra)
+            np.testing.assert_array_equal(result["image"], expected["image"])
+            np.testing.assert_array_equal(result["mask"], expected["mask"])
+
+    assert len(cached_crop._foreground_cache) == 2
+
+
+def test_get_foreground_indices():
+    mask = np.zeros((5, 7, 2), dtype=np.uint8)
+    mask[1, 2, 0] = mask[3, 6, 1] = 1
+
+    indices = A.augmentations.crops.functional.get_foreground_indices(mask)
+
+    assert indices.dtype == np.uint32
+    np.testing.assert_array_equal(np.stack(np.divmod(indices, 7), axis=-1), np.argwhere(mask.sum(axis=-1)))
@@ -1,8 +1,14 @@
+import pickle
+
 import pytest
 import numpy as np
 import cv2
+
+import albumentations as A
 from albumentations.augmentations.domain_adaptation_functional import MinMaxScaler, StandardScaler, PCA, apply_histogram
 
+from .utils import set_seed
+
 
 @pytest.mark.parametrize("feature_range, data, expected", [
     ((0.0, 1.0), np.array([[1, 2], [3, 4], [5, 6]]), np.array([[0.0, 0.0], [0.5, 0.5], [1.0, 1.0]])),
@@ -186,3 +192,237 @@ def test_apply_histogram_identity():
     result = apply_histogram(img, img, blend_ratio)
 
     np.testing.assert_array_almost_equal(result, img)
+
+
+@pytest.mark.parametrize(
+    "transform_cls, params",
+    [
+        (A.HistogramMatching, {}),
+        (A.FDA, {}),
+        (A.PixelDistributionAdaptation, {"transform_type": "standard"}),
+    ],
+)
+def test_reference_images_are_decoded_once(transform_cls, params):
+    references = {name: create_reference_image((60, 70, 3)) for name in ["a", "b", "c"]}
+    calls = []
+
+    def read_fn(name):
+        calls.append(name)
+        return references[name].copy()
+
+    image = create_reference_image((50, 50, 3))
+    cache = A.ReferenceCache()
+    cached = transform_cls(list(references), read_fn=read_fn, reference_cache=cache, p=1, **params)
+    uncached = transform_cls(list(references), read_fn=read_fn, reference_cache=None, p=1, **params)
+
+    for seed in range(20):
+        set_seed(seed)
+        expected = uncached(image=image)["image"]
+        set_seed(seed)
+        np.testing.assert_array_equal(cached(image=image)["image"], expected)
+
+    assert sorted(set(calls)) == ["a", "b", "c"]
+    assert len(calls) == 20 + 3
+    assert cache.stats["fingerprint_misses"] == 3
+    assert cache.stats["fingerprint_hits"] == 20 - 3
+
+
+def test_reference_cache_evicts_least_recently_used():
+    image = np.zeros((10, 10, 3), dtype=np.uint8)
+    cache = A.ReferenceCache(max_bytes=2 * image.nbytes)
+
+    def read_fn(_):
+        return image.copy()
+
+    for name in ["a", "b", "a", "c"]:
+        cache.get(name, read_fn)
+
+    assert cache.stats == {
+        "hits": 1,
+        "misses": 3,
+        "prefetched": 0,
+        "evictions": 1,
+        "fingerprint_hits": 0,
+        "fingerprint_misses": 0,
+        "num_images": 2,
+        "nbytes": 600,
+    }
+    assert not cache.get("a", read_fn).flags.writeable
+    assert cache.stats["hits"] == 2
+
+
+def test_reference_cache_resizes_and_prefetches():
+    cache = A.ReferenceCache(size=(20, 30), num_workers=2)
+    references = [f"image_{i}" for i in range(10)]
+
+    def read_fn(_):
+        return create_reference_image((100, 100, 3))
+
+    cache.prefetch(references, read_fn, num_samples=4)
+    images = [cache.get(reference, read_fn) for reference in references]
+
+    assert all(image.shape == (20, 30, 3) for image in images)
+    assert cache.stats["hits"] == 4
+    assert cache.stats["misses"] == 6
+
+
+def test_reference_cache_skips_unhashable_references():
+    cache = A.ReferenceCache()
+    reference = create_reference_image((10, 10, 3))
+
+    assert cache.get(reference, lambda x: x) is reference
+    assert cache.stats["num_images"] == 0
+
+
+def test_reference_cache_pickles_empty():
+    cache = A.ReferenceCache(max_bytes=1000, size=(5, 5))
+    cache.get("a", lambda _: np.zeros((5, 5), dtype=np.uint8))
+
+    restored = pickle.loads(pickle.dumps(cache))
+
+    assert (restored.max_bytes, restored.size) == (1000, (5, 5))
+    assert restored.stats["num_images"] == 0
+
+
+class ListReader:
+    def __init__(self, images):
+        self.images = images
+        self.calls = []
+
+    def __call__(self, index):
+        self.calls.append(index)
+        return self.images[index]
+
+
+@pytest.mark.parametrize(
+    "transforms",
+    [
+        [A.HistogramMatching],
+        [A.FDA],
+        [A.PixelDistributionAdaptation],
+        [A.HistogramMatching, A.FDA, A.PixelDistributionAdaptation],
+    ],
+)
+def test_write_reference_fingerprints(transforms, tmp_path):
+    read_fn = ListReader([create_reference_image((60, 70, 3)) for _ in range(3)])
+    image = create_reference_image((50, 40, 3))
+    transform = A.Compose([transform_cls(list(range(3)), read_fn=read_fn, reference_cache=None, p=1) for transform_cls in transforms])
+    set_seed(0)
+    expected = transform(image=image)["image"]
+
+    cache = A.ReferenceCache()
+    for t in transform.transforms:
+        t.reference_cache = cache
+    num_fingerprints = A.write_reference_fingerprints(tmp_path / "fingerprints.bin", transform.transforms, image.shape[:2])
+    assert num_fingerprints == 3 * len(transforms)
+
+    cache.load_fingerprints(tmp_path / "fingerprints.bin")
+    read_fn.calls.clear()
+    set_seed(0)
+    np.testing.assert_array_equal(transform(image=image)["image"], expected)
+    restored = pickle.loads(pickle.dumps(transform))
+    set_seed(0)
+    np.testing.assert_array_equal(restored(image=image)["image"], expected)
+
+    assert read_fn.calls == []
+    assert restored.transforms[0].read_fn.calls == []
+    assert cache.stats["fingerprint_hits"] == len(transforms)
+
+
+@pytest.mark.parametrize("transform_cls", [A.HistogramMatching, A.FDA, A.PixelDistributionAdaptation])
+def test_reference_bank(transform_cls, tmp_path):
+    references = [create_reference_image((60, 70, 3)) for _ in range(3)]
+    bank = A.ReferenceBank.write(tmp_path / "references.bank", references)
+    image = create_reference_image((50, 40, 3))
+
+    set_seed(0)
+    expected = transform_cls(references, read_fn=lambda x: x, reference_cache=None, p=1)(image=image)["image"]
+    transform = transform_cls(bank, reference_cache=A.ReferenceCache(), p=1)
+    set_seed(0)
+    np.testing.assert_array_equal(transform(image=image)["image"], expected)
+
+    restored = pickle.loads(pickle.dumps(transform))
+    assert len(pickle.dumps(transform)) < references[0].nbytes
+    set_seed(0)
+    np.testing.assert_array_equal(restored(image=image)["image"], expected)
+
+    A.write_reference_fingerprints(tmp_path / "fingerprints.bin", [transform], image.shape[:2])
+    assert len(A.read_fingerprints(tmp_path / "fingerprints.bin")) == len(references)
+
+
+def test_reference_bank_items(tmp_path):
+    samples = [
+        {"image": create_reference_image((20, 30, 3)), "mask": None, "global_label": np.array([0.0, 1.0])},
+        {"image": create_reference_image((10, 10, 3)), "mask": np.ones((10, 10), dtype=np.uint8), "global_label": 1},
+    ]
+    bank = A.ReferenceBank.write(tmp_path / "samples.bank", samples)
+
+    assert len(bank) == 2
+    for sample, item in zip(samples, bank):
+        assert item.keys() == sample.keys()
+        for key, value in sample.items():
+            if value is None:
+                assert item[key] is None
+            else:
+                np.testing.assert_array_equal(item[key], value)
+    assert not bank[0]["image"].flags.writeable
+    assert len(bank[:1]) == 1
+    assert bank[-1]["global_label"] == 1
+
+
+@pytest.mark.parametrize("img_shape, ref_shape", [((50, 60, 3), (70, 40, 3)), ((50, 60, 4), (50, 60, 4))])
+@pytest.mark.parametrize("dtype", [np.uint8, np.float32])
+def test_histogram_fingerprint(img_shape, ref_shape, dtype):
+    from skimage.exposure import match_histograms
+
+    img = create_reference_image(img_shape, dtype)
+    reference_image = create_reference_image(ref_shape, dtype)
+    resized = cv2.resize(reference_image, img_shape[1::-1]).reshape(img_shape)
+
+    expected = match_histograms(img, resized, channel_axis=2)
+    result = A.apply_histogram_with_fingerprint(img, A.get_histogram_fingerprint(reference_image, img_shape), 1)
+
+    np.testing.assert_allclose(result, expected, atol=1e-6)
+
+
+def test_fda_fingerprint_beta():
+    img = create_reference_image((40, 50, 3))
+    fingerprint = A.get_fda_fingerprint(create_reference_image((40, 50, 3)), img.shape, 0.1)
+
+    A.fourier_domain_adaptation_with_fingerprint(img, fingerprint, 0.05)
+    with pytest.raises(ValueError, match="smaller beta"):
+        A.fourier_domain_adaptation_with_fingerprint(img, fingerprint, 0.2)
+    with pytest.raises(ValueError, match="computed for images of shape"):
+        A.fourier_domain_adaptation_with_fingerprint(img[:30], fingerprint, 0.05)
+
+
+def fourier_domain_adaptation_reference(img, target_img, beta):
+    # Per-channel complex FFT with a shifted spectrum, as in the original implementation of FDA
+    src_img = img.astype(np.float64).reshape(*img.shape[:2], -1)
+    trg_img = target_img.astype(np.float64).reshape(*img.shape[:2], -1)
+    height, width = img.shape[:2]
+    border = int(np.floor(min(height, width) * beta))
+    center_x, center_y = width / 2 - 0.5, height / 2 - 0.5
+    h1, h2 = max(0, int(center_y - border)), min(int(center_y + border), height)
+    w1, w2 = max(0, int(center_x - border)), min(int(center_x + border), width)
+
+    result = np.empty_like(src_img)
+    for channel in range(src_img.shape[-1]):
+        fft_src = np.fft.fftshift(np.fft.fft2(src_img[..., channel]))
+        amp_src, pha_src = np.abs(fft_src), np.angle(fft_src)
+        amp_src[h1:h2, w1:w2] = np.abs(np.fft.fftshift(np.fft.fft2(trg_img[..., channel])))[h1:h2, w1:w2]
+        result[..., channel] = np.real(np.fft.ifft2(np.fft.ifftshift(amp_src * np.exp(1j * pha_src))))
+    return result.reshape(img.shape)
+
+
+@pytest.mark.parametrize("shape", [(100, 100, 3), (101, 99, 3), (64, 80), (33, 47, 1), (50, 50, 5), (7, 9, 3)])
+@pytest.mark.parametrize("beta", [0, 0.01, 0.1, 0.3, 0.5])
+def test_fourier_domain_adaptation_matches_reference(shape, beta):
+    img = create_reference_image(shape, np.float32)
+    target_img = create_reference_image(shape, np.float32)
+
+    result = A.fourier_domain_adaptation(img, target_img, beta)
+
+    assert result.shape == img.shape
+    assert result.dtype == np.float32
+    np.testing.assert_allclose(result, np.clip(fourier_domain_adaptation_reference(img, target_img, beta), 0, 1), atol=1e-5)
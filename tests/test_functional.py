@@ -5,11 +5,19 @@ import pytest
 from numpy.testing import assert_array_almost_equal_nulp, assert_almost_equal
 import skimage
 
+import albumentations as A
 import albumentations.augmentations.functional as F
 import albumentations.augmentations.geometric.functional as fgeometric
 from albucore.utils import is_multispectral_image, MAX_VALUES_BY_DTYPE, get_num_channels, clip
 from albucore.functions import to_float
 
+from albumentations.augmentations.utils import (
+    get_decode_reduction,
+    read_grayscale,
+    read_jpeg_shape,
+    read_reduced_rgb_image,
+    read_rgb_image,
+)
 from albumentations.core.types import d4_group_elements
 from tests.conftest import IMAGES, RECTANGULAR_FLOAT_IMAGE, RECTANGULAR_IMAGES, RECTANGULAR_UINT8_IMAGE, SQUARE_UINT8_IMAGE, UINT8_IMAGES
 from tests.utils import convert_2d_to_target_format, set_seed
@@ -1048,3 +1056,61 @@ def test_fancy_pca_zero_alpha(shape, dtype):
     result = F.fancy_pca(image, alpha_vector)
 
     np.testing.assert_array_equal(image, result)
+
+
+@pytest.fixture
+def jpeg_path(tmp_path):
+    image = cv2.GaussianBlur(np.random.randint(0, 256, (600, 800, 3), dtype=np.uint8), (0, 0), 3)
+    path = tmp_path / "image.jpg"
+    cv2.imwrite(str(path), image)
+    return path
+
+
+@pytest.mark.parametrize("progressive", [False, True])
+def test_read_jpeg_shape(tmp_path, progressive):
+    path = tmp_path / "image.jpg"
+    cv2.imwrite(str(path), np.zeros((123, 456, 3), dtype=np.uint8), [cv2.IMWRITE_JPEG_PROGRESSIVE, int(progressive)])
+
+    assert read_jpeg_shape(path) == (123, 456)
+
+
+def test_read_jpeg_shape_not_jpeg(tmp_path):
+    path = tmp_path / "image.png"
+    cv2.imwrite(str(path), np.zeros((10, 10, 3), dtype=np.uint8))
+
+    assert read_jpeg_shape(path) is None
+
+
+@pytest.mark.parametrize(
+    "transforms, expected",
+    [
+        (A.Compose([A.LongestMaxSize(200)]), 4),
+        (A.Compose([A.LongestMaxSize([100, 150])]), 4),
+        (A.Compose([A.SmallestMaxSize(160)]), 2),
+        (A.Compose([A.Resize(70, 50)]), 8),
+        (A.Compose([A.Resize(700, 50)]), 1),
+        ([A.RandomResizedCrop((64, 64), scale=(0.5, 1), p=1)], 4),
+        (A.Compose([A.LongestMaxSize(200, p=0.5)]), 1),
+        (A.Compose([A.Sequential([A.LongestMaxSize(200)], p=1), A.Blur()]), 4),
+        (A.Compose([A.HorizontalFlip(), A.LongestMaxSize(200)]), 1),
+        (A.Compose([]), 1),
+    ],
+)
+def test_get_decode_reduction(transforms, expected):
+    assert get_decode_reduction(transforms, (600, 800)) == expected
+
+
+def test_read_reduced_rgb_image(jpeg_path):
+    transform = A.Compose([A.LongestMaxSize(200)])
+
+    image = read_reduced_rgb_image(jpeg_path, transform)
+
+    assert image.shape == (150, 200, 3)
+    full_resolution = transform(image=read_rgb_image(jpeg_path))["image"]
+    assert transform(image=image)["image"].shape == full_resolution.shape
+    assert np.abs(transform(image=image)["image"].astype(int) - full_resolution).mean() < 3
+
+
+@pytest.mark.parametrize("reduction", [1, 2, 4, 8])
+def test_read_grayscale_reduction(jpeg_path, reduction):
+    assert read_grayscale(jpeg_path, reduction).shape == (600 // reduction, 800 // reduction)
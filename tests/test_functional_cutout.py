@@ -94,3 +94,34 @@ def test_cutout_various_types_and_fills(dtype, max_value, shape, fill_type):
         else:
             for channel_index in range(result_img.shape[-1]):
                 assert np.all(result_img[10:50, 10:50, channel_index] == expected_fill_value[channel_index])
+
+
+@pytest.mark.parametrize("num_values", [1, 3])
+@pytest.mark.parametrize("dtype", [np.uint8, np.int32, bool])
+def test_label_mask_matches_skimage(num_values, dtype):
+    from skimage.measure import label
+
+    from albumentations.augmentations.dropout.functional import label_mask
+
+    rng = np.random.default_rng(0)
+    mask = (rng.random((40, 50)) < 0.3) * rng.integers(1, num_values + 1, (40, 50))
+    mask = mask.astype(dtype)
+
+    label_image, boxes = label_mask(mask)
+
+    np.testing.assert_array_equal(label_image, label(mask))
+    for index, (x_min, y_min, x_max, y_max) in enumerate(boxes, start=1):
+        ys, xs = np.nonzero(label_image == index)
+        assert (x_min, y_min, x_max, y_max) == (xs.min(), ys.min(), xs.max() + 1, ys.max() + 1)
+
+
+@pytest.mark.parametrize("labels", [[1], [2, 5], [1, 2, 3, 4, 5, 6]])
+def test_get_dropout_mask(labels):
+    from albumentations.augmentations.dropout.functional import get_dropout_mask, label_mask
+
+    mask = np.zeros((30, 30), dtype=np.uint8)
+    for i in range(6):
+        mask[i * 5 : i * 5 + 3, i * 4 : i * 4 + 10] = 1
+    label_image, boxes = label_mask(mask)
+
+    np.testing.assert_array_equal(get_dropout_mask(label_image, boxes, labels), np.isin(label_image, labels))
@@ -0,0 +1,89 @@
+import cv2
+import numpy as np
+import pytest
+
+import albumentations as A
+
+from .utils import set_seed
+
+
+@pytest.fixture
+def image():
+    return np.random.randint(0, 256, (300, 410, 3), dtype=np.uint8)
+
+
+@pytest.fixture
+def npy_source(image, tmp_path):
+    np.save(tmp_path / "image.npy", image)
+    return A.ImageSource.from_file(tmp_path / "image.npy")
+
+
+@pytest.mark.parametrize(
+    "crop",
+    [
+        A.RandomCrop(64, 80, p=1),
+        A.CenterCrop(64, 80, p=1),
+        A.Crop(10, 20, 110, 220, p=1),
+        A.RandomResizedCrop((64, 64), p=1),
+        A.RandomSizedBBoxSafeCrop(64, 64, p=1),
+    ],
+)
+def test_crop_image_source(image, npy_source, crop):
+    transform = A.Compose([crop, A.HorizontalFlip(p=1), A.RandomBrightnessContrast(p=1)], bbox_params=A.BboxParams("pascal_voc"))
+    data = {"mask": image[:, :, 0].copy(), "bboxes": [[50, 60, 150, 160, 1]]}
+
+    set_seed(0)
+    expected = transform(image=image, **data)
+    set_seed(0)
+    result = transform(image=npy_source, **data)
+
+    assert isinstance(result["image"], np.ndarray)
+    np.testing.assert_array_equal(result["image"], expected["image"])
+    np.testing.assert_array_equal(result["mask"], expected["mask"])
+    np.testing.assert_allclose(result["bboxes"], expected["bboxes"])
+
+
+def test_crop_reads_only_region(image):
+    regions = []
+
+    def read_region(x_min, y_min, x_max, y_max):
+        regions.append((x_min, y_min, x_max, y_max))
+        return image[y_min:y_max, x_min:x_max]
+
+    source = A.ImageSource(read_region, image.shape)
+    result = A.Compose([A.CenterCrop(50, 60, p=1)])(image=source)
+
+    assert regions == [(175, 125, 235, 175)]
+    np.testing.assert_array_equal(result["image"], image[125:175, 175:235])
+
+
+@pytest.mark.parametrize("transforms", [[A.Blur(p=1)], [A.Blur(p=0)], [A.HorizontalFlip(p=1), A.CenterCrop(10, 10, p=1)]])
+def test_image_source_is_read_for_other_transforms(image, npy_source, transforms):
+    set_seed(0)
+    expected = A.Compose(transforms)(image=image)["image"]
+    set_seed(0)
+    result = A.Compose(transforms)(image=npy_source)["image"]
+
+    assert isinstance(result, np.ndarray)
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_image_source_from_bytes(image):
+    buffer = cv2.imencode(".png", cv2.cvtColor(image, cv2.COLOR_RGB2BGR))[1].tobytes()
+    source = A.ImageSource.from_bytes(buffer, image.shape)
+
+    np.testing.assert_array_equal(source.read_region(10, 20, 30, 40), image[20:40, 10:30])
+    np.testing.assert_array_equal(source.read(), image)
+
+
+def test_image_source_shape_mismatch(image):
+    buffer = cv2.imencode(".png", image)[1].tobytes()
+    source = A.ImageSource.from_bytes(buffer, (100, 100, 3))
+
+    with pytest.raises(ValueError, match="does not match"):
+        source.read()
+
+
+def test_image_source_from_encoded_file_requires_shape(tmp_path):
+    with pytest.raises(ValueError, match="shape is required"):
+        A.ImageSource.from_file(tmp_path / "image.jpg")
@@ -0,0 +1,146 @@
+import cv2
+import numpy as np
+import pytest
+
+import albumentations as A
+from albumentations.augmentations.crops import functional as fcrops
+from albumentations.augmentations.geometric import functional as fgeometric
+
+
+def generate_instance_masks(num_instances=20, image_shape=(120, 160), seed=0):
+    rng = np.random.default_rng(seed)
+    masks = np.zeros((num_instances, *image_shape), dtype=np.uint8)
+    for mask in masks:
+        center = (int(rng.integers(0, image_shape[1])), int(rng.integers(0, image_shape[0])))
+        cv2.circle(mask, center, int(rng.integers(2, 20)), 1, -1)
+    return masks
+
+
+def densify(instance_masks, num_instances):
+    dense = np.zeros((num_instances, *instance_masks.shape), dtype=np.uint8)
+    dense[instance_masks.ids] = instance_masks.to_dense()
+    return dense
+
+
+def test_from_dense_to_dense_roundtrip():
+    masks = generate_instance_masks()
+    masks[3] = 0
+
+    instance_masks = A.InstanceMasks.from_dense(masks)
+
+    assert len(instance_masks) == len(masks) - 1
+    assert 3 not in instance_masks.ids
+    assert instance_masks.shape == masks.shape[1:]
+    np.testing.assert_array_equal(densify(instance_masks, len(masks)), masks)
+
+    for mask, (x_min, y_min, x_max, y_max) in zip(instance_masks.masks, instance_masks.bboxes):
+        assert mask.shape == (y_max - y_min, x_max - x_min)
+        assert mask[0].any() and mask[-1].any() and mask[:, 0].any() and mask[:, -1].any()
+
+
+def test_instance_masks_validation():
+    with pytest.raises(ValueError, match="does not match its bbox"):
+        A.InstanceMasks([np.ones((3, 3), dtype=np.uint8)], np.array([[0, 0, 4, 3]]), (10, 10))
+
+    with pytest.raises(ValueError, match="should be equal"):
+        A.InstanceMasks([np.ones((3, 3), dtype=np.uint8)], np.zeros((2, 4)), (10, 10))
+
+    with pytest.raises(ValueError, match="shape is required"):
+        A.InstanceMasks.from_dense([])
+
+
+@pytest.mark.parametrize("crop_coords", [(0, 0, 160, 120), (10, 20, 90, 70), (100, 100, 160, 120), (0, 0, 1, 1)])
+def test_crop_instance_masks(crop_coords):
+    masks = generate_instance_masks()
+    instance_masks = A.InstanceMasks.from_dense(masks)
+
+    cropped = fcrops.crop_instance_masks(instance_masks, crop_coords)
+
+    x_min, y_min, x_max, y_max = crop_coords
+    np.testing.assert_array_equal(densify(cropped, len(masks)), masks[:, y_min:y_max, x_min:x_max])
+
+
+@pytest.mark.parametrize("group_member", ["e", "r90", "r180", "r270", "v", "hvt", "h", "t"])
+def test_instance_masks_d4(group_member):
+    masks = generate_instance_masks()
+    instance_masks = A.InstanceMasks.from_dense(masks)
+
+    transformed = fgeometric.instance_masks_d4(instance_masks, group_member)
+
+    expected = np.stack([fgeometric.d4(mask, group_member) for mask in masks])
+    np.testing.assert_array_equal(densify(transformed, len(masks)), expected)
+
+
+@pytest.mark.parametrize("interpolation", [cv2.INTER_NEAREST, cv2.INTER_LINEAR])
+def test_warp_instance_masks_matches_full_frame_warp(interpolation):
+    masks = generate_instance_masks()
+    instance_masks = A.InstanceMasks.from_dense(masks)
+    matrix = np.vstack([cv2.getRotationMatrix2D((80, 60), 33, 1.2), [0, 0, 1]])
+    output_shape = (100, 140)
+
+    warped = fgeometric.warp_instance_masks(instance_masks, matrix, output_shape, interpolation)
+
+    expected = np.stack([cv2.warpAffine(mask, matrix[:2], output_shape[::-1], flags=interpolation) for mask in masks])
+    # Fixed point rounding of the shifted matrices may differ on a handful of pixels
+    assert np.mean(densify(warped, len(masks)) != expected) < 1e-3
+
+
+@pytest.mark.parametrize(
+    "augmentation, max_difference",
+    [
+        (A.HorizontalFlip(p=1), 0),
+        (A.VerticalFlip(p=1), 0),
+        (A.Transpose(p=1), 0),
+        (A.RandomRotate90(p=1), 0),
+        (A.D4(p=1), 0),
+        (A.RandomCrop(64, 80, p=1), 0),
+        (A.CenterCrop(50, 50, p=1), 0),
+        (A.Crop(10, 10, 100, 90, p=1), 0),
+        (A.RandomResizedCrop((64, 64), p=1), 0.01),
+        (A.Resize(60, 80, p=1), 0.01),
+        (A.Affine(rotate=(10, 40), scale=(0.8, 1.2), p=1), 1e-3),
+        (A.ShiftScaleRotate(p=1), 1e-3),
+        (A.SafeRotate(p=1), 1e-3),
+        (A.Perspective(p=1), 0.01),
+        (A.Perspective(keep_size=False, p=1), 1e-3),
+        # Transforms without a sparse implementation go through dense masks
+        (A.GridDistortion(p=1), 0),
+        (A.ElasticTransform(p=1), 0),
+        (A.Affine(rotate=(10, 40), mode=cv2.BORDER_REFLECT_101, p=1), 0),
+        (A.CoarseDropout(p=1), 0),
+    ],
+)
+def test_instance_masks_match_dense_masks(augmentation, max_difference):
+    image = np.zeros((120, 160, 3), dtype=np.uint8)
+    masks = generate_instance_masks()
+    instance_masks = A.InstanceMasks.from_dense(masks)
+
+    result = A.Compose([augmentation])(image=image, masks=list(masks), instance_masks=instance_masks)
+
+    assert isinstance(result["instance_masks"], A.InstanceMasks)
+    assert result["instance_masks"].shape == result["image"].shape[:2]
+    assert np.mean(densify(result["instance_masks"], len(masks)) != np.stack(result["masks"])) <= max_difference
+
+
+def test_empty_instance_masks():
+    image = np.zeros((120, 160, 3), dtype=np.uint8)
+    instance_masks = A.InstanceMasks.from_dense([], shape=(120, 160))
+
+    result = A.Compose([A.RandomCrop(64, 80, p=1), A.GridDistortion(p=1), A.Resize(32, 32, p=1)])(
+        image=image,
+        instance_masks=instance_masks,
+    )
+
+    assert len(result["instance_masks"]) == 0
+    assert result["instance_masks"].shape == (32, 32)
+
+
+def test_compose_checks_instance_masks():
+    transform = A.Compose([A.HorizontalFlip(p=1)])
+    image = np.zeros((120, 160, 3), dtype=np.uint8)
+
+    with pytest.raises(TypeError, match="InstanceMasks"):
+        transform(image=image, instance_masks=list(generate_instance_masks()))
+
+    with pytest.raises(ValueError, match="Height and Width"):
+        transform(image=image, instance_masks=A.InstanceMasks.from_dense(generate_instance_masks(image_shape=(10, 10))))
@@ -0,0 +1,78 @@
+import pickle
+
+import cv2
+import numpy as np
+import pytest
+
+from albumentations.augmentations.utils import read_rgb_image
+from albumentations.io import ImageReader, ShardReader, decode_image, write_shard
+
+
+@pytest.fixture
+def image_paths(tmp_path):
+    paths = []
+    for i in range(7):
+        path = tmp_path / f"{i}.png"
+        cv2.imwrite(str(path), np.random.randint(0, 256, (30 + i, 40, 3), dtype=np.uint8))
+        paths.append(path)
+    return paths
+
+
+def test_read_rgb_image(image_paths):
+    expected = cv2.cvtColor(cv2.imread(str(image_paths[0])), cv2.COLOR_BGR2RGB)
+
+    np.testing.assert_array_equal(read_rgb_image(image_paths[0]), expected)
+    np.testing.assert_array_equal(decode_image(image_paths[0]), expected)
+    np.testing.assert_array_equal(decode_image(image_paths[0].read_bytes()), expected)
+    np.testing.assert_array_equal(decode_image(image_paths[0], grayscale=True), cv2.imread(str(image_paths[0]), 0))
+
+
+def test_decode_image_error():
+    with pytest.raises(ValueError, match="Failed to decode"):
+        decode_image(b"not an image")
+
+
+@pytest.mark.parametrize("prefetch", [1, 3, 16])
+def test_image_reader_keeps_order(image_paths, prefetch):
+    expected = [read_rgb_image(path) for path in image_paths]
+
+    with ImageReader(num_workers=3, prefetch=prefetch) as reader:
+        batch = reader.read_batch(image_paths)
+        streamed = list(reader.iter_images(iter(image_paths)))
+
+    for images in [batch, streamed]:
+        assert len(images) == len(expected)
+        for image, expected_image in zip(images, expected):
+            np.testing.assert_array_equal(image, expected_image)
+
+
+def test_image_reader_is_picklable(image_paths):
+    reader = ImageReader(num_workers=2)
+    reader.read_batch(image_paths[:2])
+
+    restored = pickle.loads(pickle.dumps(reader))
+
+    np.testing.assert_array_equal(restored(image_paths[0]), read_rgb_image(image_paths[0]))
+    reader.close()
+
+
+def test_shard(image_paths, tmp_path):
+    shard_path = tmp_path / "images.shard"
+
+    assert write_shard(shard_path, [image_paths[0], *[path.read_bytes() for path in image_paths[1:]]]) == 7
+
+    shard = ShardReader(shard_path)
+    assert len(shard) == 7
+    np.testing.assert_array_equal(shard[-1], np.frombuffer(image_paths[-1].read_bytes(), dtype=np.uint8))
+    with pytest.raises(IndexError):
+        shard[7]
+
+    with ImageReader(num_workers=2) as reader:
+        for image, path in zip(reader.read_batch(shard[:]), image_paths):
+            np.testing.assert_array_equal(image, read_rgb_image(path))
+
+
+def test_empty_shard(tmp_path):
+    write_shard(tmp_path / "empty.shard", [])
+
+    assert len(ShardReader(tmp_path / "empty.shard")) == 0
@@ -1,3 +1,4 @@
+import pickle
 from typing import Any, Dict, Tuple
 import numpy as np
 import pytest
@@ -380,3 +381,77 @@ def test_end_to_end(metadata, expected_output):
     expected_img[y_min:y_max, x_min:x_max] = expected_output["expected_overlay"]
 
     np.testing.assert_array_equal(transformed["image"], expected_img)
+
+
+def reference_read_fn(x):
+    return {"image": x, "mask": None, "global_label": None}
+
+
+def test_mixup_reference_prefetcher():
+    reference_data = [np.full((50, 50, 3), i, dtype=np.uint8) for i in range(5)]
+    prefetcher = A.ReferencePrefetcher(prefetch=3, num_workers=2, size=(100, 100))
+    transform = A.MixUp(reference_data=reference_data, read_fn=reference_read_fn, reference_prefetcher=prefetcher, p=1)
+
+    params = transform.get_params()
+
+    assert params["mix_data"]["image"].shape == (100, 100, 3)
+    assert len(prefetcher._pending) == 2
+    assert transform(image=np.zeros((100, 100, 3), dtype=np.uint8))["image"].shape == (100, 100, 3)
+
+
+def test_mixup_reference_prefetcher_exhausted_generator():
+    reference_data = (np.full((100, 100, 3), i, dtype=np.uint8) for i in range(3))
+    transform = A.MixUp(
+        reference_data=reference_data,
+        read_fn=reference_read_fn,
+        reference_prefetcher=A.ReferencePrefetcher(prefetch=8),
+        p=1,
+    )
+
+    images = [transform.get_params()["mix_data"]["image"][0, 0, 0] for _ in range(3)]
+    assert images == [0, 1, 2]
+
+    with pytest.warns(RuntimeWarning, match="exhausted"):
+        assert transform.get_params() == {"mix_data": {}, "mix_coef": 1}
+
+
+def test_overlay_elements_resize_cache():
+    metadata = {"image": np.random.randint(0, 256, (40, 40, 3), dtype=np.uint8), "bbox": [0.1, 0.2, 0.4, 0.6]}
+    transform = A.OverlayElements(p=1)
+    image = np.zeros((100, 100, 3), dtype=np.uint8)
+
+    first = transform(image=image, overlay_metadata=metadata)["image"]
+    cached = A.OverlayElements.preprocess_metadata(metadata, (100, 100), transform._overlay_cache)
+    second = transform(image=image, overlay_metadata=metadata)["image"]
+
+    assert len(transform._overlay_cache) == 1
+    assert cached["overlay_image"] is next(iter(transform._overlay_cache.values()))[1]
+    np.testing.assert_array_equal(cached["overlay_image"], A.OverlayElements.preprocess_metadata(metadata, (100, 100))["overlay_image"])
+    np.testing.assert_array_equal(first, second)
+
+
+def test_reference_prefetcher_pickle():
+    prefetcher = A.ReferencePrefetcher(prefetch=2, size=(10, 10))
+    assert prefetcher.get(lambda: np.zeros((20, 20), dtype=np.uint8), lambda x: x).shape == (10, 10)
+
+    restored = pickle.loads(pickle.dumps(prefetcher))
+
+    assert restored.size == (10, 10)
+    assert len(restored._pending) == 0
+
+
+def test_mixup_reference_bank(tmp_path):
+    reference_data = [
+        {"image": np.full((100, 100, 3), i, dtype=np.uint8), "mask": None, "global_label": np.array([i, 1 - i])}
+        for i in range(2)
+    ]
+    bank = A.ReferenceBank.write(tmp_path / "mixup.bank", reference_data)
+    image = np.zeros((100, 100, 3), dtype=np.uint8)
+
+    set_seed(0)
+    expected = A.MixUp(reference_data=reference_data, read_fn=lambda x: x, p=1)(image=image, global_label=np.array([1, 0]))
+    set_seed(0)
+    result = A.MixUp(reference_data=bank, p=1)(image=image, global_label=np.array([1, 0]))
+
+    np.testing.assert_array_equal(result["image"], expected["image"])
+    np.testing.assert_array_equal(result["global_label"], expected["global_label"])
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+import albumentations as A
+from albumentations.core.tiling import get_tile_size
+
+from .utils import set_seed
+
+
+@pytest.mark.parametrize(
+    "transform",
+    [
+        A.GaussianBlur(blur_limit=(7, 7), p=1),
+        A.Sharpen(p=1),
+        A.ToGray(p=1),
+        A.Compose([A.MedianBlur(blur_limit=(5, 5), p=1), A.RandomBrightnessContrast(p=1), A.GaussNoise(p=1)]),
+    ],
+)
+@pytest.mark.parametrize("tile_size", [64, 100, 512])
+def test_process_tiled_matches_whole_image(transform, tile_size):
+    image = np.random.randint(0, 256, (300, 410, 3), dtype=np.uint8)
+
+    set_seed(0)
+    expected = transform(image=image)["image"]
+    set_seed(0)
+    result = A.process_tiled(transform, image, tile_size=tile_size, halo=4)
+
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_process_tiled_memmap(tmp_path):
+    image = np.random.randint(0, 256, (300, 410, 3), dtype=np.uint8)
+    np.save(tmp_path / "image.npy", image)
+    source = np.load(tmp_path / "image.npy", mmap_mode="r")
+    output = np.lib.format.open_memmap(tmp_path / "output.npy", mode="w+", dtype=np.uint8, shape=image.shape)
+    transform = A.Blur(blur_limit=(5, 5), p=1)
+
+    result = A.process_tiled(transform, source, output=output, halo=2, memory_budget=2**18)
+
+    assert result is output
+    np.testing.assert_array_equal(result, transform(image=image)["image"])
+
+
+def test_process_tiled_region_reader():
+    image = np.random.randint(0, 256, (300, 410), dtype=np.uint8)
+    regions = []
+
+    def read_region(x_min, y_min, x_max, y_max):
+        regions.append((x_min, y_min, x_max, y_max))
+        return image[y_min:y_max, x_min:x_max]
+
+    transform = A.Blur(blur_limit=(5, 5), p=1)
+    result = A.process_tiled(transform, read_region, image_shape=image.shape, dtype=np.uint8, tile_size=128, halo=2)
+
+    np.testing.assert_array_equal(result, transform(image=image)["image"])
+    assert len(regions) == 3 * 4
+    assert all((x_max - x_min) * (y_max - y_min) <= 132 * 132 for x_min, y_min, x_max, y_max in regions)
+
+
+def test_get_tile_size():
+    tile_size = get_tile_size((20000, 20000, 3), np.dtype(np.uint8), halo=8, memory_budget=2**24)
+
+    assert (tile_size + 16) ** 2 * 3 * 4 * 4 <= 2**24
+
+    with pytest.raises(ValueError, match="too small"):
+        get_tile_size((20000, 20000, 3), np.dtype(np.uint8), halo=100, memory_budget=2**10)
+
+
+@pytest.mark.parametrize("transform", [A.HorizontalFlip(p=1), A.OneOf([A.Blur(p=1)])])
+def test_process_tiled_unsupported_transforms(transform):
+    with pytest.raises(TypeError, match="can not be applied tile by tile"):
+        A.process_tiled(transform, np.zeros((10, 10), dtype=np.uint8))
+
+
+def test_process_tiled_requires_shape_for_region_reader():
+    with pytest.raises(ValueError, match="image_shape and dtype are required"):
+        A.process_tiled(A.Blur(p=1), lambda *region: np.zeros((10, 10), dtype=np.uint8))
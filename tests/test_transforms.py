@@ -651,6 +651,26 @@ def test_mask_dropout():
     assert np.all(result["mask"] == 0)
 
 
+@pytest.mark.parametrize("mask_id_key", [None, "sample_id"])
+def test_mask_dropout_label_cache(mask_id_key):
+    masks = [(np.random.rand(40, 50) < 0.2).astype(np.uint8) for _ in range(3)]
+    image = np.random.randint(0, 256, (40, 50, 3), dtype=np.uint8)
+    aug = A.MaskDropout(max_objects=(1, 5), p=1)
+    cached_aug = A.MaskDropout(max_objects=(1, 5), label_cache_size=2, mask_id_key=mask_id_key, p=1)
+
+    for _ in range(2):
+        for sample_id, mask in enumerate(masks):
+            extra = {} if mask_id_key is None else {"sample_id": sample_id}
+            set_seed(sample_id)
+            expected = A.Compose([aug])(image=image, mask=mask)
+            set_seed(sample_id)
+            result = A.Compose([cached_aug])(image=image, mask=mask, **extra)
+            np.testing.assert_array_equal(result["image"], expected["image"])
+            np.testing.assert_array_equal(result["mask"], expected["mask"])
+
+    assert len(cached_aug._label_cache) == 2
+
+
 @pytest.mark.parametrize( "image", IMAGES )
 def test_grid_dropout_mask(image):
     height, width = image.shape[:2]